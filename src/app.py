@@ -28,7 +28,7 @@ from penn_chime.body_charts import display_body_charts
 from penn_chime.empirical_charts import display_forecast_charts, display_daily_cases_forecast_chart
 from penn_chime.population import display_population_widgets
 from penn_chime.settings import get_defaults
-from penn_chime.penn_model import PennModel
+from penn_chime.model_cache import cached_model
 from penn_chime.empirical_model import EmpiricalModel
 from penn_chime.parameters import Mode
 from penn_chime.national_data import get_national_data
@@ -124,7 +124,7 @@ if mode == Mode.EMPIRICAL:
 
 else:
     # Mode is classic Penn
-    m = PennModel(p)
+    m = cached_model(p)
     display_parameter_text(m, p)
     if st.checkbox("Show more info about this tool"):
         notes = "The total size of the susceptible population will be the entire catchment area for our hospitals."
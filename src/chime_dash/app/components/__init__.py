@@ -14,7 +14,7 @@ from dash_bootstrap_components.themes import BOOTSTRAP
 from dash_html_components import Script, Div
 
 from penn_chime.defaults import Constants
-from penn_chime.models import SimSirModel
+from penn_chime.model_cache import cached_model
 
 
 from chime_dash.app.components.base import Component, HTMLComponentError
@@ -96,7 +96,7 @@ class Body(Component):
         """
         kwargs = dict(zip(self.callback_inputs, args))
         pars = self.components["sidebar"].parse_form_parameters(**kwargs)
-        kwargs["model"] = SimSirModel(pars)
+        kwargs["model"] = cached_model(pars)
         kwargs["pars"] = pars
 
         callback_returns = []
@@ -18,17 +18,34 @@ from flask_cors import CORS
 app = Flask(__name__)
 CORS(app)
 
+# Sourced once at import: under gunicorn's preload_app (see
+# model_runner_config.py) that is in the parent, and every worker forks with R
+# and its packages already loaded.
 r.source("./src/jason_model.R")
+R_PACKAGES = dict(zip(r(".pkgs"), r(".pkgsLoaded")))
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness: 200 once R and every package are loaded in this worker."""
+    missing = [name for name, loaded in R_PACKAGES.items() if not loaded]
+    if missing:
+        return jsonify({"ready": False, "missing_packages": missing, "pid": os.getpid()}), 503
+    return jsonify({"ready": True, "pid": os.getpid()})
+
 
 @app.route("/", methods=["POST"])
 def listener():
-    method = request.args.get("method", None)
-    metric = request.args.get("metric", None)
+    # Growth estimates and forecasts do not depend on the method, metric or
+    # infectious days, which only pick R's own SIR projection; penn_chime
+    # recomputes that locally, so they are optional.
+    method = request.args.get("method", "ets")
+    metric = request.args.get("metric", "dbT")
     n_days = request.args.get("n_days", None)
-    inf_days = request.args.get("inf_days", None)
+    inf_days = request.args.get("inf_days", 10)
     model_input_dict = request.get_json()
-    if method is None or metric is None or model_input_dict is None or n_days is None or inf_days is None:
-        return "Must supply 'method', 'metric', n_days, inf_days, and 'df'.", 400
+    if model_input_dict is None or n_days is None:
+        return "Must supply n_days and 'df'.", 400
     model_input_df = pd.DataFrame(model_input_dict).assign(date=lambda d: pd.to_datetime(d.date))
     out_df = run_model(model_input_df, method, metric, n_days, inf_days)
     if isinstance(out_df, str):
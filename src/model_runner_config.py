@@ -0,0 +1,30 @@
+"""Gunicorn settings of the model runner.
+
+    gunicorn --config src/model_runner_config.py src.model_runner:app
+
+The app is loaded once in the parent, which sources `jason_model.R` and
+attaches its R packages, and the workers fork from it sharing that memory.
+Each worker is single-threaded, as one embedded R is, so requests run in
+parallel across workers; the listen backlog bounds how many more may wait.
+
+    MODEL_RUNNER_BIND     address to listen on (default localhost:8765)
+    MODEL_RUNNER_WORKERS  worker processes (default: one per core)
+    MODEL_RUNNER_BACKLOG  connections allowed to wait (default 64)
+    MODEL_RUNNER_TIMEOUT  seconds before a busy worker is restarted (default 120)
+"""
+
+import multiprocessing
+import os
+
+
+bind = os.environ.get("MODEL_RUNNER_BIND", "localhost:8765")
+workers = int(os.environ.get("MODEL_RUNNER_WORKERS", multiprocessing.cpu_count()))
+threads = 1
+worker_class = "sync"
+preload_app = True
+backlog = int(os.environ.get("MODEL_RUNNER_BACKLOG", 64))
+timeout = int(os.environ.get("MODEL_RUNNER_TIMEOUT", 120))
+
+
+def when_ready(server):
+    server.log.info("Model runner ready: R loaded, forking %s workers", workers)
@@ -205,6 +205,17 @@ def non_date_columns_to_int(df):
     return df
 
 
+def zero_first_row(df):
+    """Copy of `df` with the first row's non-date columns set to 0.
+
+    The model's frames are shared across reruns, so they are never
+    modified in place.
+    """
+    df = df.copy()
+    df.loc[0, df.columns != 'date'] = 0
+    return df
+
+
 def build_data_and_params(projection_admits, census_df, beds_df, ppe_df, staffing_df, model, parameters):
     # taken from admissions table function:
     admits_table = projection_admits[np.mod(projection_admits.index, 1) == 0].copy()
@@ -217,7 +228,7 @@ def build_data_and_params(projection_admits, census_df, beds_df, ppe_df, staffin
     # taken from census table function:
     census_table = census_df[np.mod(census_df.index, 1) == 0].copy()
     census_table.index = range(census_table.shape[0])
-    census_table.loc[0, :] = 0
+    census_table = zero_first_row(census_table)
     census_table = census_table.dropna()
     census_table = non_date_columns_to_int(census_table)
     census_table.rename(parameters.labels)
@@ -338,7 +349,7 @@ def build_data_and_params(projection_admits, census_df, beds_df, ppe_df, staffin
     df["Ventilators"] = bed_table["ventilators"]
 
     # PPE
-    ppe_df.loc[0, :] = 0
+    ppe_df = zero_first_row(ppe_df)
     df["MasksN95Total"] = ppe_df.masks_n95_total
     df["MasksN95NonICU"] = ppe_df.masks_n95_non_icu
     df["MasksN95ICU"] = ppe_df.masks_n95_icu
@@ -364,7 +375,7 @@ def build_data_and_params(projection_admits, census_df, beds_df, ppe_df, staffin
     df["OtherPPEICU"] = ppe_df.other_ppe_icu
     
     # Staffing
-    staffing_df.loc[0, :] = 0
+    staffing_df = zero_first_row(staffing_df)
     df["NursesTotal"] = staffing_df.nurses_total
     df["NursesNonICU"] = staffing_df.nurses_non_icu
     df["NursesICU"] = staffing_df.nurses_icu
@@ -0,0 +1,256 @@
+"""Least-squares calibration of the Penn model to actuals.
+
+Fits the doubling time, the contact rate after each change (every change
+of `contact_rate_schedule`, or `relative_contact_rate` after
+`mitigation_date`) and disposition rates jointly against every day of the
+uploaded actuals (see `hc_actuals.parse_actuals`), rather than against
+`covid_census_value` alone.
+
+The start day `i_day` is that of the usual fit of `PennModel(p)`. Every
+series in the actuals is weighted equally: residuals are scaled by the
+series mean and length. Candidate parameter vectors are projected in one
+batch, so a finite-difference Jacobian costs one batched projection.
+"""
+
+from collections import namedtuple
+import copy
+from logging import getLogger
+from time import perf_counter
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from .constants import EPSILON
+from .contact_schedule import schedule_days
+from .parameters import Parameters
+from .penn_model import DOUBLING_TIME_BOUNDS, PennModel
+from .sweep import set_parameter
+
+
+logger = getLogger(__name__)
+
+# Actuals columns and the model series they are compared with. Model series
+# are summed without the flooring of `census_total` and `admits_total`,
+# which would leave the residuals flat between integers.
+CALIBRATION_SERIES = {
+    "total_census_actual": ("census_non_icu", "census_icu"),
+    "non_icu_census_actual": ("census_non_icu",),
+    "icu_census_actual": ("census_icu",),
+    "ventilators_in_use_actual": ("census_ventilators",),
+    "total_admissions_actual": ("admits_non_icu", "admits_icu"),
+    "non_icu_admissions_actual": ("admits_non_icu",),
+    "icu_admissions_actual": ("admits_icu",),
+    "intubated_actual": ("admits_ventilators",),
+}
+
+# Fitted values, their standard errors and fit diagnostics. `rmse` is by
+# actuals column; `fit_df` holds each column next to its fitted values.
+CalibrationResult = namedtuple("CalibrationResult", (
+    "names", "values", "standard_errors", "parameters", "i_day", "cost", "rmse", "fit_df",
+    "success", "message", "evaluations", "projections", "seconds",
+))
+
+
+class Calibration:
+    """Residuals of batches of parameter vectors against `actuals`."""
+
+    def __init__(
+        self,
+        model: PennModel,
+        actuals: pd.DataFrame,
+        rate_keys: Sequence[str] = ("non_icu",),
+    ):
+        p = model.p
+        self.model = model
+        self.p = p
+        self.i_day = model.i_day
+        self.rate_keys = tuple(rate_keys)
+        self.projections = 0
+
+        # Changes whose contact rate is fitted
+        if p.contact_rate_schedule is not None:
+            self.change_days, rates = schedule_days(p.contact_rate_schedule, p.covid_census_date)
+        elif p.mitigation_date is not None:
+            self.change_days, rates = np.array([model.get_mitigation_day(p)]), np.array([p.relative_contact_rate])
+        else:
+            self.change_days, rates = np.array([], dtype="int"), np.array([])
+
+        self.names = (
+            ("doubling_time",)
+            + tuple(f"contact_rate_{index}" for index in range(len(rates)))
+            + tuple(key + ".rate" for key in self.rate_keys)
+        )
+        self.x0 = np.concatenate([
+            [p.doubling_time],
+            rates,
+            [p.dispositions[key].rate for key in self.rate_keys],
+        ])
+        self.bounds = (
+            np.array([DOUBLING_TIME_BOUNDS[0]] + [0.0] * len(rates) + [EPSILON] * len(self.rate_keys)),
+            np.array([DOUBLING_TIME_BOUNDS[1]] + [1.0] * len(rates) + [1.0] * len(self.rate_keys)),
+        )
+
+        self.columns = [
+            column for column in CALIBRATION_SERIES
+            if column in actuals.columns and actuals[column].notna().any()
+        ]
+        if not self.columns:
+            raise ValueError(f"Actuals need one or more of the columns {list(CALIBRATION_SERIES)}.")
+        days = (actuals.date - pd.Timestamp(p.covid_census_date)).dt.days.to_numpy()
+        self.n_steps = self.i_day + max(p.n_days, int(days.max()))
+        self.observations = {}
+        for column in self.columns:
+            values = actuals[column].to_numpy(dtype="float")
+            keep = np.isfinite(values) & (days >= -self.i_day)
+            scale = max(np.abs(values[keep]).mean(), 1.0) * np.sqrt(keep.sum())
+            self.observations[column] = (days[keep] + self.i_day, values[keep], scale)
+
+    def project(self, x: np.ndarray) -> Dict[str, np.ndarray]:
+        """Project each row of the (scenario x input) array `x` at once."""
+        x = np.atleast_2d(x)
+        n_rates = len(self.change_days)
+        doubling_time = x[:, 0]
+        reductions = x[:, 1:1 + n_rates]
+        rates = dict(self.model.rates)
+        for index, key in enumerate(self.rate_keys):
+            rates[key] = x[:, 1 + n_rates + index]
+        rates["total"] = rates["non_icu"]
+
+        p, model = self.p, self.model
+        infected = 1.0 / p.market_share / rates["non_icu"]
+        susceptible = p.population - infected
+        growth_rate = model.get_growth_rate(doubling_time)
+        beta = model.get_beta(growth_rate, model.gamma, susceptible, 0.0)
+
+        days = np.arange(self.n_steps) - self.i_day
+        changes = np.searchsorted(self.change_days, days, side="right")
+        reduction = np.concatenate([np.zeros((len(x), 1)), reductions], axis=1)[:, changes]
+        betas = beta[:, np.newaxis] * (1.0 - reduction)
+
+        self.projections += len(x)
+        raw = model.sim_sir_batch(susceptible, infected, p.recovered, model.gamma, -self.i_day, betas)
+        model.calculate_dispositions(raw, rates, p.market_share)
+        model.calculate_admits(raw, rates, p)
+        model.calculate_census(raw, model.days)
+        return raw
+
+    def fitted(self, raw: Dict[str, np.ndarray], column: str) -> np.ndarray:
+        """(scenario x day) model values compared with actuals `column`."""
+        return sum(raw[key] for key in CALIBRATION_SERIES[column])
+
+    def residuals(self, x: np.ndarray) -> np.ndarray:
+        """(scenario x observation) scaled residuals of each row of `x`."""
+        raw = self.project(x)
+        return np.concatenate(
+            [
+                (self.fitted(raw, column)[:, index] - values) / scale
+                for column, (index, values, scale) in self.observations.items()
+            ],
+            axis=1,
+        )
+
+    def jacobian(self, x: np.ndarray) -> np.ndarray:
+        """Forward-difference Jacobian, from one batch of perturbed vectors.
+
+        Steps point inward at an upper bound.
+        """
+        step = np.sqrt(np.finfo("float").eps) * np.maximum(1.0, np.abs(x))
+        step = np.where(x + step > self.bounds[1], -step, step)
+        batch = np.vstack([x, x + np.diag(step)])
+        residuals = self.residuals(batch)
+        return ((residuals[1:] - residuals[0]) / step[:, np.newaxis]).T
+
+    def parameters(self, x: np.ndarray) -> Parameters:
+        """Copy of `p` with the fitted values of `x`."""
+        p = copy.copy(self.p)
+        p.doubling_time = float(x[0])
+        n_rates = len(self.change_days)
+        if p.contact_rate_schedule is not None:
+            p.contact_rate_schedule = [
+                change._replace(relative_contact_rate=float(rate))
+                for change, rate in zip(p.contact_rate_schedule, x[1:1 + n_rates])
+            ]
+        elif n_rates:
+            p.relative_contact_rate = float(x[1])
+        for index, key in enumerate(self.rate_keys):
+            set_parameter(p, key + ".rate", float(x[1 + n_rates + index]))
+        return p
+
+    def fit_df(self, x: np.ndarray) -> pd.DataFrame:
+        """Each actuals column and its fitted values, by day of the projection."""
+        raw = self.project(x)
+        day = np.arange(self.n_steps + 1) - self.i_day
+        df = pd.DataFrame({
+            "day": day,
+            "date": day.astype("timedelta64[D]") + np.datetime64(self.p.covid_census_date),
+        })
+        for column, (index, values, _) in self.observations.items():
+            actual = np.full(len(day), np.nan)
+            actual[index] = values
+            df[column] = actual
+            df[column + "_fitted"] = self.fitted(raw, column)[0]
+        return df
+
+
+def calibrate(
+    p: Parameters,
+    actuals: pd.DataFrame,
+    rate_keys: Sequence[str] = ("non_icu",),
+    max_evaluations: int = 200,
+    model: Optional[PennModel] = None,
+) -> CalibrationResult:
+    """Fit the doubling time, contact rates and `rate_keys` disposition rates to `actuals`.
+
+    Starts from the usual fit of `p` (or `model`), whose `i_day` is kept.
+    `max_evaluations` bounds the number of residual evaluations.
+    """
+    start = perf_counter()
+    model = PennModel(copy.copy(p)) if model is None else model
+    calibration = Calibration(model, actuals, rate_keys)
+
+    result = least_squares(
+        lambda x: calibration.residuals(x)[0],
+        np.clip(calibration.x0, *calibration.bounds),
+        jac=calibration.jacobian,
+        bounds=calibration.bounds,
+        max_nfev=max_evaluations,
+    )
+
+    # Standard errors from the Gauss-Newton covariance of the scaled residuals
+    n_observations, n_inputs = result.jac.shape
+    variance = 2.0 * result.cost / max(n_observations - n_inputs, 1)
+    covariance = np.linalg.pinv(result.jac.T @ result.jac) * variance
+    standard_errors = np.sqrt(np.diag(covariance))
+
+    fit_df = calibration.fit_df(result.x)
+    rmse = {
+        column: float(np.sqrt(np.nanmean((fit_df[column] - fit_df[column + "_fitted"]) ** 2)))
+        for column in calibration.columns
+    }
+
+    calibration_result = CalibrationResult(
+        calibration.names,
+        result.x,
+        standard_errors,
+        calibration.parameters(result.x),
+        calibration.i_day,
+        float(result.cost),
+        rmse,
+        fit_df,
+        bool(result.success),
+        result.message,
+        int(result.nfev + (result.njev or 0)),
+        calibration.projections,
+        perf_counter() - start,
+    )
+    logger.info(
+        'Calibrated %s to %s in %.2fs (%s projections): %s',
+        calibration.names,
+        calibration.columns,
+        calibration_result.seconds,
+        calibration_result.projections,
+        {name: round(float(value), 4) for name, value in zip(calibration.names, result.x)},
+    )
+    return calibration_result
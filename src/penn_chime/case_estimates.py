@@ -0,0 +1,104 @@
+"""Growth estimates and forecasts of the empirical model.
+
+A port of `.fncCaseEst` in `modeling/jason_model.R` up to its SIR
+projection, which `empirical_sir` computes for the chosen metric and
+method. Daily cases are cleaned as in `.fncPreProcess`, R(t) and the
+doubling time are estimated (`growth_rates`) and both are forecast with
+every method to `n_days` after the last day (`forecasting`). As in R, a
+step that fails leaves the frame as it was and the failures are reported
+together at the end. Unlike R, the "ets" forecast always fits a damped
+additive trend instead of selecting the model automatically.
+"""
+
+from logging import getLogger
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from .forecasting import FORECAST_METHODS, TROUGH, add_forecasts
+from .growth_rates import add_doubling_time, add_rt
+
+
+logger = getLogger(__name__)
+
+
+def preprocess_cases(
+    data: pd.DataFrame,
+    date: str = "date",
+    cases: str = "cases",
+    cumulative: str = "cumCases",
+) -> pd.DataFrame:
+    """`data` on every day from its first to its last, as `.fncPreProcess`.
+
+    Daily cases are recomputed from the cumulative ones and days with
+    negative cases dropped. Missing days get no cases, cumulative cases
+    are summed again and other single-valued columns are carried to every
+    day.
+    """
+    single = [
+        column for column in data.columns
+        if column not in (date, cases, cumulative) and data[column].nunique(dropna=False) == 1
+    ]
+    frame = data.sort_values(date).reset_index(drop=True)
+    frame[cases] = frame[cumulative].diff().fillna(frame[cumulative])
+    frame = frame[frame[cases] >= 0]
+
+    days = pd.DataFrame({date: pd.date_range(frame[date].min(), frame[date].max())})
+    frame = days.merge(frame, how="left", on=date)[list(data.columns)]
+    frame[cases] = frame[cases].fillna(0)
+    frame[cumulative] = frame[cases].cumsum()
+    for column in single:
+        frame[column] = data[column].iloc[0]
+    return frame
+
+
+def estimate_errors(data: pd.DataFrame) -> List[str]:
+    """Steps of `case_estimates` that left no estimates, as `.fncChk`."""
+    def estimated(column):
+        return column in data.columns and data[column].notna().any()
+
+    errors = []
+    if not estimated("Rt"):
+        errors.append("R(t) couldn't be calculated")
+    if not estimated("dbT"):
+        errors.append("Doubling Time couldn't be calculated")
+    if not any(column.startswith("Rt_prd") for column in data.columns):
+        errors.append("R(t) couldn't be forecasted")
+    if not any(column.startswith("dbT_prd") for column in data.columns):
+        errors.append("Doubling Time couldn't be forecasted")
+    return errors
+
+
+def case_estimates(
+    data: pd.DataFrame,
+    n_days: int,
+    date: str = "date",
+    cases: str = "cases",
+    cumulative: str = "cumCases",
+    methods: Sequence[str] = FORECAST_METHODS,
+    trough: Optional[float] = TROUGH,
+) -> pd.DataFrame:
+    """Daily cases of one region with their growth estimates and forecasts.
+
+    `data` holds the dates and cumulative cases; its other single-valued
+    columns are kept. Raises ValueError, with R's message, when a growth
+    metric cannot be estimated or forecast.
+    """
+    horizon = data[date].max() + pd.Timedelta(days=n_days)
+    estimates = preprocess_cases(data, date, cases, cumulative)
+    steps = (
+        lambda frame: add_rt(frame, date, cases),
+        lambda frame: add_doubling_time(frame, date, cumulative),
+        lambda frame: add_forecasts(frame, "Rt", cumulative, date, horizon, methods, trough=trough),
+        lambda frame: add_forecasts(frame, "dbT", cumulative, date, horizon, methods, trough=trough),
+    )
+    for step in steps:
+        try:
+            estimates = step(estimates)
+        except (KeyError, ValueError, ArithmeticError) as error:
+            logger.info('Case estimates: step failed: %s', error)
+
+    errors = estimate_errors(estimates)
+    if errors:
+        raise ValueError("ERROR: " + ", ".join(errors))
+    return estimates.drop(columns="mthd")
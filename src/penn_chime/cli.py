@@ -10,7 +10,7 @@ from pandas import DataFrame
 
 from .constants import CHANGE_DATE
 from .parameters import Parameters, Disposition
-from .models import SimSirModel as Model
+from .model_cache import cached_model
 
 
 class FromFile(Action):
@@ -134,7 +134,7 @@ def main():
         ventilated=Disposition(a.ventilated_rate, a.ventilated_days),
     )
 
-    m = Model(p)
+    m = cached_model(p)
 
     for df, name in (
         (m.sim_sir_w_date_df, "sim_sir_w_date"),
@@ -0,0 +1,61 @@
+"""Contact rate schedules.
+
+A schedule is a list of dated changes in the relative contact rate, such
+as a policy timeline or smoothed mobility data. Each rate is in effect from
+its date until the next change; before the first change contact is not
+reduced. A schedule replaces `mitigation_date` and `relative_contact_rate`,
+which amount to a schedule of one change.
+"""
+
+from collections import namedtuple
+import datetime
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .validators import OptionalSchedule
+
+
+ContactRateChange = namedtuple("ContactRateChange", ("date", "relative_contact_rate"))
+
+SCHEDULE_COLUMNS = ("date", "relative_contact_rate")
+
+
+def read_contact_rate_schedule(file) -> Sequence[ContactRateChange]:
+    """Schedule from a CSV file with `date` and `relative_contact_rate` columns.
+
+    Rows may come in any order; consecutive days with the same rate are
+    merged into one change. Raises ValueError for a malformed file.
+    """
+    frame = pd.read_csv(file, header=0)
+    missing = set(SCHEDULE_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"Contact rate schedule needs the columns {list(SCHEDULE_COLUMNS)}.")
+    frame = (
+        frame[list(SCHEDULE_COLUMNS)]
+        .assign(date=lambda d: pd.to_datetime(d.date).dt.date)
+        .sort_values("date")
+    )
+    changed = frame.relative_contact_rate.diff().ne(0.0)
+    return OptionalSchedule(value=[
+        ContactRateChange(date, float(rate))
+        for date, rate in frame[changed].itertuples(index=False)
+    ])
+
+
+def schedule_days(
+    schedule: Sequence[ContactRateChange],
+    covid_census_date: datetime.date,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Change days, counted from `covid_census_date`, and their contact rates."""
+    return (
+        np.array([(change.date - covid_census_date).days for change in schedule], dtype="int"),
+        np.array([change.relative_contact_rate for change in schedule], dtype="float"),
+    )
+
+
+def contact_rates(days: np.ndarray, change_days: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """Relative contact rate in effect on each of `days`, an array of any shape."""
+    rates = np.concatenate([[0.0], rates])
+    return rates[np.searchsorted(change_days, days, side="right")]
@@ -1,16 +1,54 @@
 import datetime
+from io import StringIO
 from typing import List
 import json
+import os
 
 import pandas as pd
 import numpy as np
 import requests
 import streamlit as st
 
+from .case_estimates import case_estimates
+from .empirical_sir import add_empirical_sir
 from .model_base import SimSirModelBase
 from .parameters import Parameters, ForecastMethod, ForecastedMetric
+from .result_store import ResultStore
 
 EPOCH_START = datetime.datetime(1970, 1, 1)
+# "r" posts regions to the model runner; "python" estimates them in process
+# with `case_estimates`, whose "ets" forecasts are a damped additive trend
+# rather than R's automatically selected model.
+CASE_ESTIMATES = os.environ.get("CHIME_CASE_ESTIMATES", "r")
+
+
+def fetch_case_estimates(cases: pd.DataFrame, n_days: int) -> pd.DataFrame:
+    """The model runner's growth estimates and forecasts of `cases`.
+
+    Raises ValueError with R's message when they cannot be estimated.
+    """
+    response = requests.post(
+        "http://localhost:8765/",
+        data=cases.to_json(orient="records", date_format='iso'),
+        headers={"Content-Type": "application/json"},
+        params={"n_days": n_days},
+    )
+    if response.status_code == 400:
+        raise ValueError(response.text)
+    response.raise_for_status()
+    return pd.read_json(StringIO(json.loads(response.text)))
+
+
+@st.cache(show_spinner=False)
+def cached_case_estimates(cases: pd.DataFrame, n_days: int) -> pd.DataFrame:
+    """Growth estimates and forecasts of `cases`, from R or `case_estimates`.
+
+    They do not depend on the forecast method, growth metric or infectious
+    days, so switching those reuses the cached frame.
+    """
+    if CASE_ESTIMATES == "python":
+        return case_estimates(cases, n_days)
+    return fetch_case_estimates(cases, n_days)
 
 class EmpiricalModel(SimSirModelBase):
     min_cases = 5
@@ -35,16 +73,12 @@ class EmpiricalModel(SimSirModelBase):
         n_days = p.n_days
         inf_days = p.infectious_days
         py_in_df = self.r_input_from_actuals(actuals, states, counties, population)
-        payload = json.loads(py_in_df.to_json(orient="records", date_format='iso'))
-        response = requests.post(
-            "http://localhost:8765/", 
-            json=payload, 
-            params={"method": method, "metric": metric, "n_days": n_days, "inf_days":inf_days}
-        )
-        if response.status_code == 400:
+        try:
+            estimates = cached_case_estimates(py_in_df, n_days)
+        except ValueError as error:
             st.markdown(f"""
             <span style="color:red;"><strong>
-            {response.text} <br>
+            {error} <br>
             This can usually be fixed by aggregating more counties together 
             to increase the number of cases.
             </strong></span>
@@ -52,10 +86,12 @@ class EmpiricalModel(SimSirModelBase):
             self.fail_flag = True
         else:
             self.fail_flag = False
-            response.raise_for_status()
-            self.r_df = out_py_df = self.py_df_from_json_response(response.json())
+            # Growth is estimated and forecast once per region; the SIR
+            # projection for the chosen metric and method is recomputed here.
+            self.r_df = out_py_df = self.mark_actuals(
+                add_empirical_sir(estimates, population, inf_days, metric, method))
 
-            self.raw = raw = self.raw_from_r_output(out_py_df, p)
+            self.raw = raw = ResultStore.from_arrays(self.raw_from_r_output(out_py_df, p))
 
             self.calculate_dispositions(raw, self.rates, self.p.market_share)
             self.calculate_admits(raw, self.rates, p)
@@ -64,9 +100,8 @@ class EmpiricalModel(SimSirModelBase):
             # Add day number to R dataframe
             self.r_df["day"] = self.admits_df.day
 
-    def py_df_from_json_response(self, response_json):
-        df = pd.read_json(response_json)
-        df.rst.iloc[0] = 1
+    def mark_actuals(self, df):
+        df.loc[0, "rst"] = 1
         rst_is_zero = df.rst == 0
         columns = ['cases', 'cumCases']
         for column in columns:
@@ -0,0 +1,137 @@
+"""SIR projection of the empirical model.
+
+A port of `.fncSIR` in `modeling/jason_model.R`. Beta changes daily: it is
+derived from each day's estimated growth metric, either the doubling time
+(`dbT`) or the reproduction number (`Rt`), or from its forecast on days
+without an estimate. With `use_actuals`, every day with reported cases is
+reset to them: infected are the cases of the last `infectious_days` days,
+recovered the cumulative cases before those, and `rst` flags the day.
+
+Reset days depend only on the cases, so they are computed at once; only
+the days in between, in practice the forecast horizon, are stepped.
+Recomputing for another metric, forecast method or infectious period takes
+milliseconds and needs no R.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+# Growth metrics, as named by `ForecastedMetric.to_r_metric`
+DOUBLING_TIME = "dbT"
+REPRODUCTION_NUMBER = "Rt"
+
+# Forecast methods, as named by `ForecastMethod.to_r_method`, and their labels
+METHOD_LABELS = {
+    "lin": "Linear",
+    "spln": "Log-Spline",
+    "loess": "Loess",
+    "ets": "ETS",
+}
+
+# Columns added (or replaced) by `add_empirical_sir`
+SIR_COLUMNS = ("b", "s", "i", "r", "n", "rst", "mSIR")
+
+
+def forecast_column(metric: str, method: str) -> str:
+    return f"{metric}_prd_{method}"
+
+
+def sir_label(metric: str, method: str, use_actuals: bool) -> str:
+    """Description of the projection, the `mSIR` column."""
+    return ", ".join((
+        "Doubling Time" if metric.lower() == DOUBLING_TIME.lower() else "Reproduction Number",
+        METHOD_LABELS.get(method.lower(), method),
+        "Actual Reset" if use_actuals else "Theoretic",
+    ))
+
+
+def growth_betas(growth: np.ndarray, metric: str, gamma: float, susceptible: float) -> np.ndarray:
+    """Daily beta from doubling times or reproduction numbers."""
+    growth = np.asarray(growth, dtype="float")
+    if metric.lower() == DOUBLING_TIME.lower():
+        return (2.0 ** (1.0 / growth) - 1.0 + gamma) / susceptible
+    return growth * gamma / susceptible
+
+
+def empirical_sir(
+    cases: np.ndarray,
+    growth: np.ndarray,
+    population: float,
+    infectious_days: int,
+    metric: str = DOUBLING_TIME,
+    use_actuals: bool = True,
+) -> Dict[str, np.ndarray]:
+    """Daily beta, susceptible, infected, recovered, new infections and reset flags.
+
+    `cases` are daily new cases, NaN where not reported; `growth` the
+    metric on each day. Missing values propagate as in R.
+    """
+    cases = np.array(cases, dtype="float")
+    growth = np.asarray(growth, dtype="float")
+    n_days = len(cases)
+    if np.isnan(cases).all():
+        cases[0] = 1.0
+    cumulative = np.cumsum(cases)
+    gamma = 1.0 / infectious_days
+    beta = growth_betas(growth, metric, gamma, population - cumulative[0])
+
+    s = np.full(n_days, population - cumulative[0])
+    i = np.full(n_days, cases[0])
+    r = np.zeros(n_days)
+    reset = np.zeros(n_days, dtype="bool")
+    if use_actuals:
+        reset[1:] = ~np.isnan(cases[1:])
+        rows = np.flatnonzero(reset)
+        # Cases of the last `infectious_days` days, fewer at the start
+        padded = np.concatenate([np.zeros(infectious_days - 1), cases])
+        infected = np.lib.stride_tricks.sliding_window_view(padded, infectious_days).sum(axis=1)
+        recovered = np.where(
+            np.arange(n_days) >= infectious_days,
+            cumulative[np.maximum(np.arange(n_days) - infectious_days, 0)],
+            0.0,
+        )
+        i[rows] = infected[rows]
+        r[rows] = recovered[rows]
+        s[rows] = population - (infected[rows] + recovered[rows])
+
+    # Step the days in between from the day before, on plain floats
+    s_list, i_list, r_list, beta_list = s.tolist(), i.tolist(), r.tolist(), beta.tolist()
+    for day in np.flatnonzero(~reset[1:]) + 1:
+        s_p, i_p, r_p, b = s_list[day - 1], i_list[day - 1], r_list[day - 1], beta_list[day]
+        s_list[day] = -b * s_p * i_p + s_p
+        i_list[day] = (b * s_p * i_p - gamma * i_p) + i_p
+        r_list[day] = gamma * i_p + r_p
+    s, i, r = np.array(s_list), np.array(i_list), np.array(r_list)
+
+    # New infections are the daily change of infected plus recovered, which
+    # starts from 1 as in R
+    total = i + r
+    total[0] = 1.0
+    new = np.diff(total, prepend=np.nan)
+    new[0] = i[0]
+    return {"b": beta, "s": s, "i": i, "r": r, "n": new, "rst": reset.astype("int")}
+
+
+def add_empirical_sir(
+    df: pd.DataFrame,
+    population: float,
+    infectious_days: int,
+    metric: str = DOUBLING_TIME,
+    method: str = "ets",
+    use_actuals: bool = True,
+) -> pd.DataFrame:
+    """`df` of daily cases, growth metrics and forecasts, with the SIR columns.
+
+    The metric column is used where estimated and its `method` forecast
+    elsewhere. Raises ValueError when the forecast column is missing.
+    """
+    column = forecast_column(metric, method)
+    if column not in df.columns:
+        raise ValueError(f"Forecast column {column} not found")
+    df = df.drop(columns=[c for c in SIR_COLUMNS if c in df.columns]).sort_values("date")
+    growth = df[metric].fillna(df[column]) if metric in df.columns else df[column]
+    sir = empirical_sir(df.cases.to_numpy(), growth.to_numpy(), population, infectious_days, metric, use_actuals)
+    return df.assign(**sir, mSIR=sir_label(metric, method, use_actuals)).reset_index(drop=True)
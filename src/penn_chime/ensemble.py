@@ -0,0 +1,342 @@
+"""Monte Carlo ensembles of Penn model projections.
+
+Replicates vary the doubling time, contact rate reduction, market share,
+disposition rates and lengths of stay of one `PennModel`, each drawn from a
+user-specified distribution. Like the model, every replicate is seeded
+with one non-ICU patient and fitted to the current census: its `i_day` is
+searched as in `PennModel.get_argmin_i_day`, with all candidates of many
+replicates projected in one batch. The fitted replicates of a chunk are
+then projected in one batch and aligned on the model's days.
+
+A distribution is a number (held fixed), a frozen `scipy.stats`
+distribution, or a callable taking a `numpy.random.Generator` and a size.
+Inputs not given keep their value in `Parameters`. Use picklable
+distributions (not lambdas) with more than one worker.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .model_base import ScenarioDays
+from .parameters import Disposition, Parameters
+from .penn_model import FIT_KEYS, I_DAY_CANDIDATES, PennModel
+
+
+logger = getLogger(__name__)
+
+ENSEMBLE_INPUTS = (
+    "doubling_time",
+    "relative_contact_rate",
+    "market_share",
+    "non_icu_rate",
+    "icu_rate",
+    "ventilators_rate",
+    "non_icu_days",
+    "icu_days",
+    "ventilators_days",
+)
+
+ENSEMBLE_KEYS = ("non_icu", "icu", "ventilators")
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# (row x day) cells projected at once when fitting replicates' i_day, and
+# the spacing of the first i_day candidates searched
+FIT_CELLS = 2 ** 21
+I_DAY_STEP = 10
+
+# Days after the census date within which `PennModel` locates the peak of
+# a candidate i_day, as it fits with n_days = 1000.
+FIT_HORIZON = 1000
+
+# Percentile bands, one frame per metric with a column per percentile.
+EnsembleResult = namedtuple("EnsembleResult", ("bands", "n_replicates", "seed", "seconds"))
+
+
+def sample(distribution: Any, rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draw `size` values of one input."""
+    if hasattr(distribution, "rvs"):
+        return np.asarray(distribution.rvs(size=size, random_state=rng), dtype="float")
+    if callable(distribution):
+        return np.asarray(distribution(rng, size), dtype="float")
+    return np.full(size, distribution, dtype="float")
+
+
+def get_inputs(p: Parameters, distributions: Dict[str, Any]) -> Dict[str, Any]:
+    """Distribution of every ensemble input, defaulting to the point estimates of `p`."""
+    unknown = set(distributions) - set(ENSEMBLE_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown ensemble inputs: {sorted(unknown)}")
+    if p.contact_rate_schedule is not None and "relative_contact_rate" in distributions:
+        raise ValueError("relative_contact_rate cannot vary with a contact rate schedule.")
+    inputs = {
+        "doubling_time": p.doubling_time,
+        "relative_contact_rate": p.relative_contact_rate,
+        "market_share": p.market_share,
+        **{
+            key + "_rate": p.dispositions[key].rate
+            for key in ENSEMBLE_KEYS
+        },
+        **{
+            key + "_days": p.dispositions[key].days
+            for key in ENSEMBLE_KEYS
+        },
+    }
+    inputs.update(distributions)
+    return inputs
+
+
+def project_replicates(
+    model: PennModel,
+    p: Parameters,
+    values: Dict[str, np.ndarray],
+    rows: np.ndarray,
+    i_days: np.ndarray,
+    n_steps: int,
+    keys: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Project replicates `rows` of `values`, each seeded `i_days` before the census date.
+
+    Every row starts from its replicate's seed state and is simulated for
+    `n_steps` days, so columns count days from the seed. `keys` limits
+    post-processing to those dispositions, as in `PennModel.run_projection`.
+    """
+    drawn = {key: value[rows] for key, value in values.items()}
+    infected = 1.0 / drawn["market_share"] / drawn["non_icu_rate"]
+    susceptible = p.population - infected
+    growth_rate = 2.0 ** (1.0 / drawn["doubling_time"]) - 1.0
+    beta = model.get_beta(growth_rate, model.gamma, susceptible, 0.0)
+    beta_t = model.get_beta(growth_rate, model.gamma, susceptible, drawn["relative_contact_rate"])
+    days = np.arange(n_steps)[np.newaxis, :] - i_days[:, np.newaxis]
+    raw = model.sim_sir_batch(susceptible, infected, p.recovered, model.gamma, 0, model.get_betas(p, days, beta, beta_t))
+
+    p = copy.copy(p)
+    p.icu = Disposition(drawn["icu_rate"], drawn["icu_days"])
+    rates = dict(model.rates)
+    lengths_of_stay = dict(model.days)
+    rates["total"] = drawn["non_icu_rate"]
+    lengths_of_stay["total"] = ScenarioDays(drawn["non_icu_days"])
+    for key in ENSEMBLE_KEYS:
+        rates[key] = drawn[key + "_rate"]
+        if not np.ndim(lengths_of_stay[key]):  # LOS distributions are kept
+            lengths_of_stay[key] = ScenarioDays(drawn[key + "_days"])
+    if keys is not None:
+        rates = {key: rates[key] for key in keys}
+        lengths_of_stay = {key: lengths_of_stay[key] for key in keys}
+
+    model.calculate_dispositions(raw, rates, drawn["market_share"])
+    model.calculate_admits(raw, rates, p)
+    model.calculate_census(raw, lengths_of_stay)
+    return raw
+
+
+def peaks_before_today(
+    model: PennModel,
+    p: Parameters,
+    values: Dict[str, np.ndarray],
+    rows: np.ndarray,
+    i_days: np.ndarray,
+) -> np.ndarray:
+    """Whether the census of replicates `rows`, seeded `i_days` before the census date, peaks before it.
+
+    Peaks are located within `FIT_HORIZON` days, in sub-batches of
+    `FIT_CELLS`.
+    """
+    n_steps = int(i_days.max()) + FIT_HORIZON
+    per_batch = max(FIT_CELLS // (n_steps + 1), 1)
+    before = np.empty(len(rows), dtype="bool")
+    for start in range(0, len(rows), per_batch):
+        batch = slice(start, start + per_batch)
+        census = project_replicates(model, p, values, rows[batch], i_days[batch], n_steps, FIT_KEYS)["census_non_icu"]
+        horizon = np.arange(n_steps + 1) <= (i_days[batch] + FIT_HORIZON)[:, np.newaxis]
+        before[batch] = np.where(horizon, census, -np.inf).argmax(axis=1) < i_days[batch]
+    return before
+
+
+def best_i_days(
+    model: PennModel,
+    p: Parameters,
+    values: Dict[str, np.ndarray],
+    replicates: np.ndarray,
+    candidates: np.ndarray,
+) -> np.ndarray:
+    """The i_day of each of `replicates`, among its row of (replicate x candidate) `candidates`.
+
+    As `PennModel.get_argmin_i_day`, candidates whose census peaks before
+    the present day are ruled out; a replicate with no candidate left
+    keeps the closest one. Candidates are projected `p.n_days` ahead, and
+    those ruled out that would otherwise win are checked again over
+    `FIT_HORIZON` days, where the census may rise again.
+    """
+    n_steps = int(candidates.max()) + p.n_days
+    raw = project_replicates(
+        model,
+        p,
+        values,
+        np.repeat(replicates, candidates.shape[1]),
+        candidates.ravel(),
+        n_steps,
+        FIT_KEYS,
+    )
+    census = raw["census_non_icu"].reshape(candidates.shape + (n_steps + 1,))
+    horizon = np.arange(n_steps + 1) <= (candidates + p.n_days)[..., np.newaxis]
+    peak_days = np.where(horizon, census, -np.inf).argmax(axis=-1)
+    current = np.take_along_axis(census, candidates[..., np.newaxis], axis=-1)[..., 0]
+    losses = model.get_loss(current, p.covid_census_value)
+    ruled_out = peak_days < candidates
+    recheck = np.nonzero(ruled_out & (losses < np.where(ruled_out, np.inf, losses).min(axis=1, keepdims=True)))
+    if len(recheck[0]):
+        ruled_out[recheck] = peaks_before_today(model, p, values, replicates[recheck[0]], candidates[recheck])
+    fitted = np.where(ruled_out, np.inf, losses)
+    fitted = np.where(np.isfinite(fitted).any(axis=1, keepdims=True), fitted, losses)
+    return np.take_along_axis(candidates, fitted.argmin(axis=1)[:, np.newaxis], axis=1)[:, 0]
+
+
+def fit_i_days(model: PennModel, p: Parameters, values: Dict[str, np.ndarray], size: int) -> np.ndarray:
+    """The i_day of each replicate whose census best matches the current census.
+
+    Candidates are searched every `I_DAY_STEP` days, then day by day around
+    the best of those. Before the peak the census grows with i_day, so
+    this finds the best of all `I_DAY_CANDIDATES`.
+    """
+    coarse = np.arange(0, I_DAY_CANDIDATES, I_DAY_STEP)
+    offsets = np.arange(1 - I_DAY_STEP, I_DAY_STEP)
+    per_batch = max(FIT_CELLS // (len(offsets) * (I_DAY_CANDIDATES + p.n_days)), 1)
+
+    i_days = np.empty(size, dtype="int")
+    for start in range(0, size, per_batch):
+        replicates = np.arange(start, min(start + per_batch, size))
+        best = best_i_days(model, p, values, replicates, np.tile(coarse, (len(replicates), 1)))
+        fine = np.clip(best[:, np.newaxis] + offsets, 0, I_DAY_CANDIDATES - 1)
+        i_days[replicates] = best_i_days(model, p, values, replicates, fine)
+    return i_days
+
+
+def run_replicates(
+    model: PennModel,
+    inputs: Dict[str, Any],
+    seed: np.random.SeedSequence,
+    size: int,
+) -> Dict[str, np.ndarray]:
+    """Fit and project `size` replicates; returns (replicate x day) admits, census and bed shortfall."""
+    rng = np.random.default_rng(seed)
+    values = {
+        key: sample(inputs[key], rng, size)
+        for key in ENSEMBLE_INPUTS
+    }
+    if (values["doubling_time"] <= 0.0).any():
+        raise ValueError("Doubling time draws need to be positive; use a distribution bounded below by 0.")
+    # Draws outside the ranges allowed in `Parameters` are held at the bounds.
+    for key in ENSEMBLE_INPUTS:
+        if key.endswith("_rate") or key == "market_share":
+            values[key] = np.clip(values[key], 0.0, 1.0)
+    # Replicates are seeded with one non-ICU patient, as the model is.
+    if (values["market_share"] <= 0.0).any() or (values["non_icu_rate"] <= 0.0).any():
+        raise ValueError("Market share and non-ICU rate draws need to be positive.")
+    for key in ENSEMBLE_KEYS:
+        values[key + "_days"] = np.maximum(np.rint(values[key + "_days"]), 1).astype("int")
+
+    return {
+        metric: metric_values.astype("float32")
+        for metric, metric_values in project_values(model, values, size).items()
+    }
+
+
+def project_values(model: PennModel, values: Dict[str, np.ndarray], size: int) -> Dict[str, np.ndarray]:
+    """Fit and project `size` replicates with the given `values` of every ensemble input.
+
+    Returns (replicate x day) admits, census and bed shortfall on the
+    model's days.
+    """
+    p = model.p
+    i_days = fit_i_days(model, p, values, size)
+    raw = project_replicates(model, p, values, np.arange(size), i_days, int(i_days.max()) + p.n_days)
+
+    # Align replicates on the model's days; before its seed day a replicate has no patients.
+    columns = i_days[:, np.newaxis] + np.arange(-model.i_day, p.n_days + 1)[np.newaxis, :]
+
+    def aligned(values):
+        return np.where(columns >= 0, np.take_along_axis(values, np.maximum(columns, 0), axis=1), 0.0)
+
+    counts = {
+        f"{kind}_{key}": aligned(raw[f"{kind}_{key}"])
+        for kind in ("admits", "census")
+        for key in ENSEMBLE_KEYS + ("total",)
+    }
+    beds = model.calculate_beds({key: counts["census_" + key] for key in ENSEMBLE_KEYS}, p)
+
+    return {
+        **counts,
+        **{
+            "shortfall_" + key: np.maximum(-beds[key], 0.0)
+            for key in ENSEMBLE_KEYS
+        },
+    }
+
+
+def percentile_bands(
+    values: Dict[str, np.ndarray],
+    day: np.ndarray,
+    covid_census_date,
+    percentiles: Sequence[float] = PERCENTILES,
+) -> Dict[str, pd.DataFrame]:
+    """One frame per metric of (replicate x day) `values`, with a column per percentile."""
+    date = day.astype("timedelta64[D]") + np.datetime64(covid_census_date)
+    bands = {}
+    for metric, metric_values in values.items():
+        band = np.percentile(metric_values, percentiles, axis=0)
+        bands[metric] = pd.DataFrame({
+            "day": day,
+            "date": date,
+            **{f"p{q:g}": band[i] for i, q in enumerate(percentiles)},
+        })
+    return bands
+
+
+def run_ensemble(
+    p: Parameters,
+    distributions: Dict[str, Any],
+    n_replicates: int = 10000,
+    seed: int = 0,
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+    percentiles: Sequence[float] = PERCENTILES,
+    model: Optional[PennModel] = None,
+) -> EnsembleResult:
+    """Percentile bands of admits, census and bed shortfall over `n_replicates`.
+
+    Replicates are projected in chunks of `chunk_size`, each with its own
+    random stream spawned from `seed`, so results do not depend on
+    `workers`, the number of processes (default: run in this process).
+    """
+    start = perf_counter()
+    model = PennModel(p) if model is None else model
+    inputs = get_inputs(model.p, distributions)
+    sizes = [min(chunk_size, n_replicates - offset) for offset in range(0, n_replicates, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = ([model] * len(sizes), [inputs] * len(sizes), seeds, sizes)
+
+    if workers is None or workers <= 1:
+        chunks = list(map(run_replicates, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(run_replicates, *args))
+
+    day = np.arange(model.i_day + model.p.n_days + 1) - model.i_day
+    bands = percentile_bands(
+        {metric: np.concatenate([chunk[metric] for chunk in chunks]) for metric in chunks[0]},
+        day,
+        model.p.covid_census_date,
+        percentiles,
+    )
+
+    result = EnsembleResult(bands, n_replicates, seed, perf_counter() - start)
+    logger.info('Ensemble of %s replicates in %.2fs', n_replicates, result.seconds)
+    return result
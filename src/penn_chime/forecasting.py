@@ -0,0 +1,251 @@
+"""Forecasts of the empirical model's growth metrics.
+
+A port of `.fncFcst` in `modeling/jason_model.R`, which extends R(t) or the
+doubling time to the horizon with the four methods of `ForecastMethod`,
+all computed in one call, so switching methods needs no refit:
+
+    lin     linear regression on the day
+    spln    log(y + 1) against a natural spline (df 2) of the log day
+    ets     exponential smoothing with a damped additive trend
+    loess   local quadratic regression with a span of 2
+
+Only days with at least `min_cases` cumulative cases are fitted. Projected
+values above `peak` (default twice the highest value) or below `trough`
+are smoothed towards the limit with a natural spline (df 3) and held at it
+from the first day they cross it, as in R.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+
+FORECAST_METHODS = ("lin", "spln", "ets", "loess")
+
+MIN_CASES = 20
+TROUGH = 0.5
+LOESS_SPAN = 2.0
+
+# forecast::ets bounds on the smoothing and damping parameters
+ETS_SMOOTHING_BOUNDS = (1e-4, 0.9999)
+ETS_DAMPING_BOUNDS = (0.8, 0.98)
+# Observations used for the initial level and trend
+ETS_INITIAL_DAYS = 10
+
+
+def natural_spline_basis(x: np.ndarray, knots: np.ndarray) -> np.ndarray:
+    """Basis, with intercept, of natural cubic splines with `knots`.
+
+    The first and last knots are the boundary: beyond them the splines are
+    linear. The span is that of R's `ns` with an intercept, so least-squares
+    fits and predictions match.
+    """
+    lower, upper = knots[0], knots[-1]
+    scale = upper - lower if upper > lower else 1.0
+    x = (np.asarray(x, dtype="float") - lower) / scale
+    knots = (np.asarray(knots, dtype="float") - lower) / scale
+
+    def truncated(k):
+        return (np.maximum(x - knots[k], 0.0) ** 3 - np.maximum(x - knots[-1], 0.0) ** 3) / (knots[-1] - knots[k])
+
+    columns = [np.ones_like(x), x] + [truncated(k) - truncated(len(knots) - 2) for k in range(len(knots) - 2)]
+    return np.stack(columns, axis=-1)
+
+
+def spline_knots(x: np.ndarray, df: int) -> np.ndarray:
+    """Boundary and interior knots of R's `ns(x, df)`, at quantiles of `x`."""
+    return np.percentile(x, np.linspace(0.0, 100.0, df + 1))
+
+
+def natural_spline_fit(x: np.ndarray, y: np.ndarray, new_x: np.ndarray, df: int) -> np.ndarray:
+    """Predictions at `new_x` of `lm(y ~ ns(x, df))`."""
+    knots = spline_knots(x, df)
+    coefficients = np.linalg.lstsq(natural_spline_basis(x, knots), y, rcond=None)[0]
+    return natural_spline_basis(new_x, knots) @ coefficients
+
+
+def linear_forecast(x: np.ndarray, y: np.ndarray, new_x: np.ndarray) -> np.ndarray:
+    slope, intercept = np.polyfit(x, y, 1)
+    return intercept + slope * new_x
+
+
+def spline_forecast(x: np.ndarray, y: np.ndarray, new_x: np.ndarray) -> np.ndarray:
+    keep = y + 1.0 > 0.0
+    return np.exp(natural_spline_fit(np.log(x[keep]), np.log(y[keep] + 1.0), np.log(new_x), 2)) - 1.0
+
+
+def loess_forecast(x: np.ndarray, y: np.ndarray, new_x: np.ndarray, span: float = LOESS_SPAN) -> np.ndarray:
+    """Local quadratic fit at each of `new_x`, R's `loess` with `surface="direct"`.
+
+    Points have tricube weights in their distance. With a span over 1 all
+    points are used and the bandwidth is `span` times the largest distance.
+    """
+    distance = np.abs(new_x[:, np.newaxis] - x[np.newaxis, :])
+    if span > 1.0:
+        bandwidth = span * distance.max(axis=1)
+    else:
+        bandwidth = np.sort(distance, axis=1)[:, max(int(np.floor(len(x) * span)), 1) - 1]
+    bandwidth = np.where(bandwidth > 0.0, bandwidth, 1.0)[:, np.newaxis]
+    weights = np.clip(1.0 - (distance / bandwidth) ** 3, 0.0, None) ** 3
+
+    # Weighted normal equations of (1, dx, dx^2), with dx in bandwidths
+    dx = (x[np.newaxis, :] - new_x[:, np.newaxis]) / bandwidth
+    design = np.stack([np.ones_like(dx), dx, dx * dx], axis=-1)
+    weighted = design * weights[..., np.newaxis]
+    normal = np.einsum("mnj,mnk->mjk", weighted, design)
+    moments = np.einsum("mnj,n->mj", weighted, y)
+    return np.linalg.solve(normal, moments[..., np.newaxis])[:, 0, 0]
+
+
+def damped_trend_states(y: np.ndarray, alpha: float, beta: float, phi: float, level: float, trend: float):
+    """One-step fits of ETS(A,Ad,N) and the final level and trend."""
+    fitted = np.empty(len(y))
+    for t, value in enumerate(y.tolist()):
+        forecast = level + phi * trend
+        fitted[t] = forecast
+        error = value - forecast
+        level, trend = forecast + alpha * error, phi * trend + beta * error
+    return fitted, level, trend
+
+
+def ets_forecast(y: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fitted values and `horizon` forecasts of a damped additive-trend ETS model.
+
+    Smoothing, damping and initial states are estimated by maximum
+    likelihood (least squares) within the bounds of `forecast::ets`, with
+    the trend smoothing no larger than the level's. Starting states come
+    from a regression on the first days, as in `forecast`.
+    """
+    y = np.asarray(y, dtype="float")
+    first = y[:min(ETS_INITIAL_DAYS, len(y))]
+    trend0, level0 = np.polyfit(np.arange(1, len(first) + 1), first, 1) if len(first) > 1 else (0.0, first[0])
+    low, high = ETS_SMOOTHING_BOUNDS
+
+    def unpack(theta):
+        alpha, share, phi, level, trend = theta
+        return alpha, max(alpha * share, low), phi, level, trend
+
+    def sse(theta):
+        fitted, _, _ = damped_trend_states(y, *unpack(theta))
+        return float(((y - fitted) ** 2).sum())
+
+    scale = max(np.abs(y).max(), 1.0)
+    result = minimize(
+        sse,
+        np.array([0.5, 0.2, 0.9, level0, trend0]),
+        method="L-BFGS-B",
+        bounds=[(low, high), (low, 1.0), ETS_DAMPING_BOUNDS, (None, None), (None, None)],
+        options={"eps": 1e-8 * scale},
+    )
+    alpha, beta, phi, level, trend = unpack(result.x)
+    fitted, level, trend = damped_trend_states(y, alpha, beta, phi, level, trend)
+    forecast = level + np.cumsum(phi ** np.arange(1, horizon + 1)) * trend
+    return fitted, forecast
+
+
+def clamp_forecast(x: np.ndarray, values: np.ndarray, limit: float, upper: bool) -> np.ndarray:
+    """R's peak (`upper`) or trough constraint on projected `values`.
+
+    When any value crosses `limit`, values are capped at it (in R, from
+    above for the trough as well), smoothed with a natural spline and held
+    at the limit from the first smoothed value across it.
+    """
+    crosses = values > limit if upper else values < limit
+    if not crosses.any():
+        return values
+    known = ~np.isnan(values)
+    smoothed = natural_spline_fit(x[known], np.minimum(values[known], limit), x, 3)
+    across = np.flatnonzero(smoothed > limit if upper else smoothed < limit)
+    if len(across):
+        smoothed[across[0]:] = limit
+    return smoothed
+
+
+def forecast_values(
+    x: np.ndarray,
+    y: np.ndarray,
+    use: np.ndarray,
+    methods: Sequence[str] = FORECAST_METHODS,
+) -> Dict[str, np.ndarray]:
+    """Each method's values on every day `x`, fitted to the days in `use`."""
+    fit_x, fit_y = x[use], y[use]
+    if len(fit_x) < 3:
+        raise ValueError("Too few days with enough cases to forecast")
+    values = {}
+    for method in methods:
+        if method == "lin":
+            values[method] = linear_forecast(fit_x, fit_y, x)
+        elif method == "spln":
+            values[method] = spline_forecast(fit_x, fit_y, x)
+        elif method == "loess":
+            values[method] = loess_forecast(fit_x, fit_y, x)
+        elif method == "ets":
+            # Placed from the first fitted day on, in order; the days before
+            # take the first fitted value.
+            horizon = int((x > x[~np.isnan(y)].max()).sum())
+            fitted, forecast = ets_forecast(fit_y, horizon)
+            ets = np.full(len(x), np.nan)
+            start = int(np.flatnonzero(use)[0])
+            placed = np.concatenate([fitted, forecast])[:len(x) - start]
+            ets[start:start + len(placed)] = placed
+            ets[:start] = fitted[0]
+            values[method] = ets
+        else:
+            raise ValueError(f"No forecast method called {method}")
+    return values
+
+
+def add_forecasts(
+    data: pd.DataFrame,
+    y: str,
+    n: Optional[str] = "cumCases",
+    date: str = "date",
+    horizon: Union[int, pd.Timestamp] = 30,
+    methods: Sequence[str] = FORECAST_METHODS,
+    min_cases: int = MIN_CASES,
+    peak: Optional[float] = None,
+    trough: Optional[float] = TROUGH,
+    prefix: Optional[str] = None,
+) -> pd.DataFrame:
+    """`data` extended to `horizon` with a `<prefix>_prd_<method>` column per method.
+
+    `horizon` is a number of days after the last date, or the last date
+    itself. `n` holds cumulative cases (None counts every day as enough).
+    Columns holding a single value are carried over to the new days.
+    Raises ValueError when too few days can be fitted.
+    """
+    prefix = y if prefix is None else prefix
+    if data[y].isna().all():
+        raise ValueError(f"No {y} values to forecast")
+    peak = np.nanmax(data[y].to_numpy(dtype="float")) * 2.0 if peak is None else peak
+    single = [
+        column for column in data.columns
+        if column not in (date, y) and data[column].nunique(dropna=False) == 1
+    ]
+
+    frame = data.sort_values(date)
+    last = frame[date].max()
+    end = last + pd.Timedelta(days=horizon) if isinstance(horizon, (int, np.integer)) else pd.Timestamp(horizon)
+    dates = pd.date_range(frame[date].min(), max(end, last))
+    observed = frame.set_index(date).reindex(dates)
+    values = observed[y].to_numpy(dtype="float")
+    cases = observed[n].to_numpy(dtype="float") if n is not None else np.full(len(dates), float(min_cases))
+    x = np.arange(1, len(dates) + 1, dtype="float")
+    use = ~np.isnan(values) & (cases >= min_cases)
+
+    forecasts = forecast_values(x, values, use, methods)
+    projected = slice(int(np.flatnonzero(~np.isnan(values)).max()), None)
+    for method, forecast in forecasts.items():
+        forecast[projected] = clamp_forecast(x[projected], forecast[projected], peak, upper=True)
+        if trough is not None:
+            forecast[projected] = clamp_forecast(x[projected], forecast[projected], trough, upper=False)
+
+    columns = {f"{prefix}_prd_{method}": forecast for method, forecast in forecasts.items()}
+    result = pd.DataFrame({date: dates, **columns})
+    data = data.drop(columns=[column for column in columns if column in data.columns])
+    merged = data.merge(result, how="outer", on=date).sort_values(date).reset_index(drop=True)
+    for column in single:
+        merged[column] = data[column].iloc[0]
+    return merged
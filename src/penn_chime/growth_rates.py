@@ -0,0 +1,401 @@
+"""Dynamic growth estimates of the empirical model.
+
+Ports of the growth-rate steps of `modeling/jason_model.R`, which the
+empirical model forecasts and projects from (see `empirical_sir`).
+
+R(t) follows `.fncDynRt`, the parametric serial-interval estimator of Cori
+et al. (2013) as in EpiEstim's `estimate_R`: the serial interval is a
+discretized gamma, R over each 7-day window has a gamma prior (mean 5,
+standard deviation 5) and a gamma posterior whose shape and rate add the
+window's cases and total infectivity. Window sums are cumulative-sum
+differences, so many regions are estimated at once as rows of one array.
+
+The doubling time follows `.fncDynDblTim`. The cumulative cases are split
+into segments, each fitted log-linearly: the longest run of days not yet
+fitted is handed to growthrates' `fit_easylinear` method, which keeps the
+span of 5-day windows whose growth rate is within 95% of the steepest,
+or, with fewer than two windows, to one regression over the run. Window
+slopes come from prefix sums of the whole series and go into a sparse
+table of range maxima; unfitted runs are kept in a heap by length. A pass
+then finds its run, steepest window and candidate span in O(log n) and
+only the regression over the fitted rows, which are fitted once, scans
+them, so the segmentation is O(n log n). Doubling times under a day or
+infinite are clamped, high outliers cut back to the upper IQR fence, and
+days left unfitted imputed from their neighbours.
+"""
+
+import heapq
+from collections import namedtuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import toeplitz
+from scipy.stats import gamma
+
+
+SERIAL_INTERVAL_MEAN = 7.5
+SERIAL_INTERVAL_STD = 3.4
+
+# EpiEstim defaults
+RT_PRIOR_MEAN = 5.0
+RT_PRIOR_STD = 5.0
+RT_WINDOW = 7
+
+# Columns of `add_rt` and the posterior quantiles they hold
+RT_QUANTILES = {"Rt": 0.5, "RtLCL": 0.025, "RtUCL": 0.975}
+
+# growthrates' `fit_easylinear` defaults: window length and slope quota
+EASYLINEAR_WINDOW = 5
+EASYLINEAR_QUOTA = 0.95
+DOUBLING_TIME_ATTEMPTS = 1000
+MIN_DOUBLING_TIME = 1.0
+OUTLIER_IQRS = 1.5
+
+# Columns of `add_doubling_time`
+DOUBLING_TIME_COLUMNS = ("seg", "b0", "gRt", "dbT", "mthd")
+
+# Sparse table of window slope maxima (flat windows are -inf) and the
+# count of non-flat windows before each window, for `fit_segment`.
+WindowIndex = namedtuple("WindowIndex", ("levels", "counts"))
+
+
+def discrete_serial_interval(k: np.ndarray, mean: float, std: float) -> np.ndarray:
+    """Probability of a serial interval of `k` days, EpiEstim's `discr_si`.
+
+    The interval is 1 plus a gamma variable with the given mean and
+    standard deviation, discretized by linear interpolation of its CDF.
+    """
+    k = np.asarray(k, dtype="float")
+    a = ((mean - 1.0) / std) ** 2
+    b = std ** 2 / (mean - 1.0)
+
+    def cdf(x, shape):
+        return gamma.cdf(x, shape, scale=b)
+
+    pmf = k * cdf(k, a) + (k - 2.0) * cdf(k - 2.0, a) - 2.0 * (k - 1.0) * cdf(k - 1.0, a)
+    pmf += a * b * (2.0 * cdf(k - 1.0, a + 1.0) - cdf(k - 2.0, a + 1.0) - cdf(k, a + 1.0))
+    return np.maximum(pmf, 0.0)
+
+
+def infectivity(incidence: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """(region x day) total infectivity: past cases weighted by serial interval.
+
+    `weights[k]` is the probability of an interval of `k` days; the first
+    day has no infectivity and is NaN.
+    """
+    n_days = incidence.shape[-1]
+    weights = np.concatenate([weights[:n_days], np.zeros(max(n_days - len(weights), 0))])
+    weights[0] = 0.0
+    lam = incidence @ toeplitz(np.zeros(n_days), weights).astype("float")
+    lam[..., 0] = np.nan
+    return lam
+
+
+def cori_posterior(
+    incidence: np.ndarray,
+    mean_si: float = SERIAL_INTERVAL_MEAN,
+    std_si: float = SERIAL_INTERVAL_STD,
+    window: int = RT_WINDOW,
+    mean_prior: float = RT_PRIOR_MEAN,
+    std_prior: float = RT_PRIOR_STD,
+) -> Dict[str, np.ndarray]:
+    """Gamma posterior shape and scale of R for each window of (region x day) `incidence`.
+
+    Windows start on every day but the first and run `window` days; the
+    result is (region x window start), starting from the second day.
+    """
+    incidence = np.atleast_2d(np.asarray(incidence, dtype="float"))
+    n_days = incidence.shape[-1]
+    lam = infectivity(incidence, discrete_serial_interval(np.arange(n_days), mean_si, std_si))
+    lam[..., 0] = 0.0
+
+    def window_sums(values):
+        cumulative = np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)], axis=-1)
+        return cumulative[..., 1 + window:] - cumulative[..., 1:-window]
+
+    prior_shape = (mean_prior / std_prior) ** 2
+    prior_scale = std_prior ** 2 / mean_prior
+    return {
+        "shape": prior_shape + window_sums(incidence),
+        "scale": 1.0 / (1.0 / prior_scale + window_sums(lam)),
+    }
+
+
+def cori_rt(
+    incidence: np.ndarray,
+    lengths: Optional[Sequence[int]] = None,
+    mean_si: float = SERIAL_INTERVAL_MEAN,
+    std_si: float = SERIAL_INTERVAL_STD,
+    window: int = RT_WINDOW,
+    quantiles: Dict[str, float] = RT_QUANTILES,
+) -> Dict[str, np.ndarray]:
+    """(region x day) posterior quantiles of R for the window starting on each day.
+
+    Regions are rows of `incidence`, each starting on its first day and
+    `lengths` days long (the rest is ignored). Days without a full window
+    are NaN.
+    """
+    incidence = np.atleast_2d(np.asarray(incidence, dtype="float"))
+    n_regions, n_days = incidence.shape
+    lengths = np.full(n_regions, n_days) if lengths is None else np.asarray(lengths)
+    if n_days <= window:
+        return {column: np.full((n_regions, n_days), np.nan) for column in quantiles}
+    incidence = np.where(np.arange(n_days) < lengths[:, np.newaxis], incidence, 0.0)
+    posterior = cori_posterior(incidence, mean_si, std_si, window)
+
+    starts = np.arange(1, n_days - window + 1)
+    inside = starts + window <= lengths[:, np.newaxis]
+    result = {}
+    for column, q in quantiles.items():
+        values = np.full((n_regions, n_days), np.nan)
+        values[:, starts] = np.where(inside, gamma.ppf(q, posterior["shape"], scale=posterior["scale"]), np.nan)
+        result[column] = values
+    return result
+
+
+def add_rt(
+    data: pd.DataFrame,
+    date: str = "date",
+    cases: str = "cases",
+    region: Optional[str] = None,
+    mean_si: float = SERIAL_INTERVAL_MEAN,
+    std_si: float = SERIAL_INTERVAL_STD,
+) -> pd.DataFrame:
+    """`data` with the `Rt`, `RtLCL` and `RtUCL` columns of `.fncDynRt`.
+
+    Each `region` (or the whole frame) is estimated over the days from its
+    first to its last day with cases, on the date each window starts. Rows
+    without an estimate are NaN.
+    """
+    keys = [region, date] if region is not None else [date]
+    frame = data[keys + [cases]].dropna()
+    frame = frame[frame[cases] > 0]
+    groups = list(frame.groupby(region)) if region is not None else [(None, frame)]
+
+    starts, lengths, series = [], [], []
+    for _, group in groups:
+        daily = group.groupby(date)[cases].sum()
+        days = pd.date_range(daily.index.min(), daily.index.max())
+        starts.append(days[0])
+        lengths.append(len(days))
+        series.append(daily.reindex(days, fill_value=0).to_numpy(dtype="float"))
+    incidence = np.zeros((len(series), max(lengths, default=0)))
+    for index, values in enumerate(series):
+        incidence[index, :len(values)] = values
+    rt = cori_rt(incidence, lengths, mean_si, std_si)
+
+    estimates = []
+    for index, (name, _) in enumerate(groups):
+        estimate = pd.DataFrame({
+            date: pd.date_range(starts[index], periods=lengths[index]),
+            **{column: values[index, :lengths[index]] for column, values in rt.items()},
+        }).dropna()
+        if region is not None:
+            estimate.insert(0, region, name)
+        estimates.append(estimate)
+    estimates = pd.concat(estimates, ignore_index=True) if estimates else pd.DataFrame(columns=keys + list(RT_QUANTILES))
+
+    data = data.drop(columns=[column for column in RT_QUANTILES if column in data.columns])
+    merged = data.merge(estimates, how="left", on=keys)
+    merged.index = data.index
+    return merged
+
+
+def log_linear_fit(x: np.ndarray, log_y: np.ndarray) -> Tuple[float, float]:
+    """Intercept and slope of the least-squares line through (x, log_y)."""
+    x_mean = x.mean()
+    # Relative to the first value, a flat series has a slope of exactly 0
+    relative = log_y - log_y[0]
+    slope = ((x - x_mean) * relative).sum() / ((x - x_mean) ** 2).sum()
+    return float(log_y[0] + relative.mean() - slope * x_mean), float(slope)
+
+
+def window_slopes(x: np.ndarray, log_y: np.ndarray, window: int) -> np.ndarray:
+    """Least-squares slope of every run of `window` points, from prefix sums."""
+    x = x - x[0]
+    log_y = log_y - log_y[0]
+    sums = np.concatenate([np.zeros((4, 1)), np.cumsum([x, log_y, x * x, x * log_y], axis=1)], axis=1)
+    sx, sy, sxx, sxy = sums[:, window:] - sums[:, :-window]
+    return (window * sxy - sx * sy) / (window * sxx - sx * sx)
+
+
+def window_index(log_y: np.ndarray, slopes: np.ndarray, window: int) -> WindowIndex:
+    """Range-maximum table and non-flat counts of the `window` slopes.
+
+    Flat windows, whose first and last values are equal, have an undefined
+    R squared in `fit_easylinear` and are left out.
+    """
+    flat = log_y[:len(slopes)] == log_y[window - 1:window - 1 + len(slopes)]
+    levels = [np.where(flat, -np.inf, slopes)]
+    while 2 ** len(levels) <= len(slopes):
+        half = 2 ** (len(levels) - 1)
+        previous = levels[-1]
+        levels.append(np.maximum(previous[:-half], previous[half:]))
+    return WindowIndex(levels, np.concatenate([[0], np.cumsum(~flat)]))
+
+
+def range_max(levels: List[np.ndarray], lo: int, hi: int) -> float:
+    """Largest value of rows `lo:hi` (not empty) of a sparse table."""
+    level = int(hi - lo).bit_length() - 1
+    return float(max(levels[level][lo], levels[level][hi - 2 ** level]))
+
+
+def first_at_least(levels: List[np.ndarray], lo: int, hi: int, threshold: float) -> int:
+    """First row of `lo:hi` whose value is at least `threshold`, which must exist."""
+    for level in range(len(levels) - 1, -1, -1):
+        if lo + 2 ** level <= hi and levels[level][lo] < threshold:
+            lo += 2 ** level
+    return lo
+
+
+def last_at_least(levels: List[np.ndarray], lo: int, hi: int, threshold: float) -> int:
+    """Last row of `lo:hi` whose value is at least `threshold`, which must exist."""
+    for level in range(len(levels) - 1, -1, -1):
+        if hi - 2 ** level >= lo and levels[level][hi - 2 ** level] < threshold:
+            hi -= 2 ** level
+    return hi - 1
+
+
+def fit_segment(
+    x: np.ndarray,
+    log_y: np.ndarray,
+    windows: WindowIndex,
+    start: int,
+    stop: int,
+    window: int = EASYLINEAR_WINDOW,
+    quota: float = EASYLINEAR_QUOTA,
+) -> Tuple[int, int, float, float, str]:
+    """Rows, intercept, slope and method of the fit to rows `start:stop`.
+
+    As `fit_easylinear`, windows start on every row but the last `window`
+    of the run; flat windows are ignored. With fewer than two windows
+    left, the whole run is fitted ("lm").
+    """
+    hi = stop - window
+    if hi > start and windows.counts[hi] - windows.counts[start] >= 2:
+        threshold = quota * range_max(windows.levels, start, hi)
+        first = first_at_least(windows.levels, start, hi, threshold)
+        last = last_at_least(windows.levels, start, hi, threshold) + window
+        return (first, last) + log_linear_fit(x[first:last], log_y[first:last]) + ("auto",)
+    return (start, stop) + log_linear_fit(x[start:stop], log_y[start:stop]) + ("lm",)
+
+
+def impute_doubling_times(doubling_time: np.ndarray) -> np.ndarray:
+    """Fill each missing day with the mean of the days before and after.
+
+    As in R, days are filled in order, so the day before may itself have
+    been imputed; the day after is the next estimated one.
+    """
+    doubling_time = doubling_time.copy()
+    missing = np.isnan(doubling_time)
+    index = np.where(missing, len(doubling_time), np.arange(len(doubling_time)))
+    following = np.minimum.accumulate(index[::-1])[::-1]
+    values = np.concatenate([doubling_time, [np.nan]])
+    for day in np.flatnonzero(missing):
+        neighbours = [values[following[day]]]
+        if day > 0:
+            neighbours.append(doubling_time[day - 1])
+        neighbours = [value for value in neighbours if not np.isnan(value)]
+        doubling_time[day] = np.mean(neighbours) if neighbours else np.nan
+    return doubling_time
+
+
+def dynamic_doubling_time(
+    dates: pd.DatetimeIndex,
+    cumulative: np.ndarray,
+    attempts: int = DOUBLING_TIME_ATTEMPTS,
+) -> Dict[str, np.ndarray]:
+    """Segment, intercept, growth rate, doubling time and method of each day.
+
+    `dates` are in order and `cumulative` are their cumulative cases.
+    Intercepts are of log cases against days since 1970-01-01, as R's
+    dates. Raises ValueError unless the cases are positive and
+    non-decreasing.
+    """
+    cumulative = np.asarray(cumulative, dtype="float")
+    if (np.diff(cumulative) < 0).any():
+        raise ValueError("Dynamic doubling time calculations require cumulative cases")
+    if (cumulative <= 0).any():
+        raise ValueError("Dynamic doubling time calculations require positive cases")
+    n_days = len(cumulative)
+    epoch_days = ((pd.DatetimeIndex(dates) - pd.Timestamp("1970-01-01")) / pd.Timedelta(days=1)).to_numpy()
+    x = epoch_days - epoch_days[0]
+    log_y = np.log(cumulative)
+    slopes = window_slopes(x, log_y, EASYLINEAR_WINDOW) if n_days >= EASYLINEAR_WINDOW else np.array([])
+    windows = window_index(log_y, slopes, EASYLINEAR_WINDOW)
+
+    segment = np.zeros(n_days, dtype="int")
+    intercept = np.full(n_days, np.nan)
+    growth_rate = np.full(n_days, np.nan)
+    method = np.full(n_days, None, dtype="object")
+    # Unfitted runs, longest first and the last of ties first, as in R
+    runs = [(-n_days, 0, n_days)]
+    n_unfitted = n_days
+    for attempt in range(attempts):
+        if n_unfitted < 2 or not runs:
+            break
+        _, negative_start, stop = heapq.heappop(runs)
+        start = -negative_start
+        if stop - start < 2:
+            break
+        first, last, b0, slope, how = fit_segment(x, log_y, windows, start, stop)
+        segment[first:last] = attempt + 1
+        intercept[first:last] = b0 - slope * epoch_days[0]
+        growth_rate[first:last] = slope
+        method[first:last] = how
+        n_unfitted -= last - first
+        for run_start, run_stop in ((start, first), (last, stop)):
+            if run_stop > run_start:
+                heapq.heappush(runs, (run_start - run_stop, -run_start, run_stop))
+
+    with np.errstate(divide="ignore"):
+        doubling_time = np.log(2.0) / growth_rate
+    low = doubling_time < MIN_DOUBLING_TIME
+    method[low] = "fixed"
+    doubling_time[low] = MIN_DOUBLING_TIME
+    infinite = np.isposinf(doubling_time)
+    if infinite.any():
+        method[infinite] = "fixed"
+        doubling_time[infinite] = np.nanmax(np.where(infinite, np.nan, doubling_time))
+
+    if (~np.isnan(doubling_time)).any():
+        lower, upper = np.nanpercentile(doubling_time, [25, 75])
+        fence = upper + OUTLIER_IQRS * (upper - lower)
+        outlier = doubling_time > fence
+        method[outlier] = "fixOutlier"
+        doubling_time[outlier] = fence
+
+    missing = np.isnan(doubling_time)
+    method[missing] = "impute"
+    doubling_time = impute_doubling_times(doubling_time)
+    return {"seg": segment, "b0": intercept, "gRt": growth_rate, "dbT": doubling_time, "mthd": method}
+
+
+def add_doubling_time(
+    data: pd.DataFrame,
+    date: str = "date",
+    cumulative: str = "cumCases",
+    region: Optional[str] = None,
+) -> pd.DataFrame:
+    """`data` with the `seg`, `b0`, `gRt`, `dbT` and `mthd` columns of `.fncDynDblTim`.
+
+    Each `region` (or the whole frame) is estimated separately. Days
+    before a region's first case have no logarithm and are left without
+    estimates.
+    """
+    groups = data.groupby(region) if region is not None else [(None, data)]
+    estimates = []
+    for name, group in groups:
+        group = group[group[cumulative] > 0].sort_values(date)
+        if group.empty:
+            continue
+        estimate = pd.DataFrame(
+            dynamic_doubling_time(group[date], group[cumulative].to_numpy()),
+            index=group.index,
+        )
+        estimates.append(estimate)
+
+    data = data.drop(columns=[column for column in DOUBLING_TIME_COLUMNS if column in data.columns])
+    estimates = pd.concat(estimates) if estimates else pd.DataFrame(columns=DOUBLING_TIME_COLUMNS)
+    return data.join(estimates)
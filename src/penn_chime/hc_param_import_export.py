@@ -12,12 +12,15 @@ import streamlit as st
 
 from .parameters import (
     Disposition,
+    FitMethod,
     ForecastMethod,
     ForecastedMetric,
     Mode,
     Parameters, 
     Regions, 
 )
+from .contact_schedule import ContactRateChange
+from .resources import Resource
 
 def constants_from_uploaded_file(file: io.StringIO) -> Tuple[Parameters, dict]:
     imported_params = json.loads(file.read())
@@ -70,6 +73,7 @@ def constants_from_uploaded_file(file: io.StringIO) -> Tuple[Parameters, dict]:
         # Model Settings
         forecast_method=imported_params.get("ForecastMethod", ForecastMethod.ETS),
         forecasted_metric=imported_params.get("ForecastedMetric", ForecastedMetric.DOUBLING_TIME),
+        fit_method=imported_params.get("FitMethod", FitMethod.GRID),
 
         # County Selections
         selected_states = imported_params.get("SelectedStates", []),
@@ -104,6 +108,19 @@ def constants_from_uploaded_file(file: io.StringIO) -> Tuple[Parameters, dict]:
         other_staff_icu=imported_params.get("PatientsPerOtherStaffICU", 10),
         # Shift Duration
         shift_duration=imported_params.get("ShiftDuration", 12),
+        # Resource catalog
+        resources=(
+            [Resource(**resource) for resource in imported_params["Resources"]]
+            if imported_params.get("Resources") is not None else None
+        ),
+        los_distributions=imported_params.get("LengthOfStayDistributions", None),
+        contact_rate_schedule=(
+            [
+                ContactRateChange(date.fromisoformat(change_date), float(rate))
+                for change_date, rate in imported_params["ContactRateSchedule"]
+            ]
+            if imported_params.get("ContactRateSchedule") is not None else None
+        ),
 
         # Population
         override_population=imported_params.get("OverridePopulation", False),
@@ -158,6 +175,7 @@ def param_download_widget(parameters):
         # Model Setting
         "ForecastMethod": parameters.forecast_method,
         "ForecastedMetric": parameters.forecasted_metric,
+        "FitMethod": parameters.fit_method,
 
         # County Selections
         "SelectedStates": parameters.selected_states,
@@ -192,6 +210,19 @@ def param_download_widget(parameters):
         "PatientsPerOtherStaffICU": parameters.other_staff_icu,
         # Shift Duration
         "ShiftDuration" : parameters.shift_duration,
+        # Resource catalog
+        "Resources": (
+            [resource._asdict() for resource in parameters.resources]
+            if parameters.resources is not None else None
+        ),
+        "LengthOfStayDistributions": (
+            {key: list(pmf) for key, pmf in parameters.los_distributions.items()}
+            if parameters.los_distributions is not None else None
+        ),
+        "ContactRateSchedule": (
+            [[change.date.isoformat(), change.relative_contact_rate] for change in parameters.contact_rate_schedule]
+            if parameters.contact_rate_schedule is not None else None
+        ),
 
         # Population
         "OverridePopulation": parameters.override_population,
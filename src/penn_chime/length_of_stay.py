@@ -0,0 +1,56 @@
+"""Length-of-stay distributions.
+
+A distribution is a discharge-probability vector `pmf`: pmf[k] is the
+probability that a patient admitted on day t is discharged on day t + k.
+A fixed length of stay L is the vector with all of its mass at k = L.
+"""
+
+from typing import Sequence
+
+import numpy as np
+from scipy.signal import fftconvolve
+
+
+# Kernels at least this many days long are convolved by FFT, which costs
+# O(n log n) per scenario instead of O(n * kernel).
+FFT_MIN_DAYS = 64
+
+
+def discharge_pmf(pmf: Sequence[float]) -> np.ndarray:
+    """`pmf` normalized to sum to one."""
+    pmf = np.asarray(pmf, dtype="float")
+    return pmf / pmf.sum()
+
+
+def survival(pmf: Sequence[float]) -> np.ndarray:
+    """Probability of still being in hospital k days after admission."""
+    remaining = 1.0 - np.cumsum(discharge_pmf(pmf))
+    return np.clip(remaining[:-1], 0.0, 1.0)
+
+
+def convolve_days(values: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """Causal convolution of `values` with `kernel` along the day axis.
+
+    `values` may be (day) or (scenario x day); the result has the same shape.
+    """
+    n_days = values.shape[-1]
+    kernel = kernel[:n_days]
+    if len(kernel) >= FFT_MIN_DAYS:
+        result = fftconvolve(values, kernel.reshape((1,) * (values.ndim - 1) + (-1,)), axes=-1)
+        # FFT round-off leaves tiny negatives where the result is zero
+        return np.maximum(result[..., :n_days], 0.0)
+    result = np.zeros_like(values)
+    for k, weight in enumerate(kernel):
+        if weight != 0.0:
+            result[..., k:] += weight * values[..., :n_days - k]
+    return result
+
+
+def census_from_admits(admits: np.ndarray, pmf: Sequence[float]) -> np.ndarray:
+    """Patients in hospital each day, given daily `admits` and their LOS distribution."""
+    return convolve_days(admits, survival(pmf))
+
+
+def discharges_from_admits(admits: np.ndarray, pmf: Sequence[float]) -> np.ndarray:
+    """Patients discharged each day, given daily `admits` and their LOS distribution."""
+    return convolve_days(admits, discharge_pmf(pmf))
@@ -1,32 +1,184 @@
 from __future__ import annotations
 
+import copy
 import logging
 import datetime
-from typing import Dict, Sequence, Tuple
+from collections import namedtuple
+from typing import Dict, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd 
 
+from .length_of_stay import census_from_admits, discharge_pmf, discharges_from_admits
 from .parameters import Parameters
+from .resources import ResourceKind, calculate_ppe, calculate_staffing, get_resources, resource_columns
+from .result_store import COUNT_KEYS, ResultStore
+
+
+# The model pipeline, in order, and the stage each one builds on. The SIR
+# stage produces the trajectory; the rest post-process it.
+STAGES = ("sir", "dispositions", "admits", "census", "beds", "ppe", "staffing")
+STAGE_PARENTS = {
+    "dispositions": "sir",
+    "admits": "dispositions",
+    "census": "admits",
+    "beds": "census",
+    "ppe": "census",
+    "staffing": "census",
+}
+
+# Stages that recompute arrays in `raw` rather than only building frames.
+RAW_STAGES = ("dispositions", "admits", "census")
+
+
+def per_scenario(value):
+    """Shape a per-scenario `value` so it broadcasts against (scenario x day) arrays.
+
+    Scalars are returned unchanged.
+    """
+    if np.ndim(value) == 0:
+        return value
+    return np.asarray(value, dtype="float")[..., np.newaxis]
+
+
+def shift_days(values: np.ndarray, n_days: Union[int, np.ndarray]) -> np.ndarray:
+    """Delay `values` by `n_days` along the day axis, padding with zeros.
+
+    `n_days` may hold one delay per scenario of (scenario x day) `values`.
+    """
+    if np.ndim(n_days):
+        source = np.arange(values.shape[-1]) - np.asarray(n_days)[..., np.newaxis]
+        shifted = np.take_along_axis(
+            values, np.broadcast_to(np.maximum(source, 0), values.shape), axis=-1)
+        return np.where(source < 0, 0.0, shifted)
+    if n_days == 0:
+        return values.copy()
+    shifted = np.zeros_like(values)
+    shifted[..., n_days:] = values[..., :-n_days]
+    return shifted
+
+
+# A length of stay of one number of days per scenario of a batched `raw`,
+# rounded to whole days. Bare arrays are discharge-probability vectors.
+ScenarioDays = namedtuple("ScenarioDays", ("days",))
+
+
+def sum_last_days(values: np.ndarray, n_days: np.ndarray) -> np.ndarray:
+    """Sum of each scenario's last `n_days` values, excluding the first day, on each day."""
+    cumsum = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    cumsum[..., 2:] = values[..., 1:].cumsum(axis=-1)
+    start = np.arange(1, values.shape[-1] + 1) - np.asarray(n_days)[..., np.newaxis]
+    start = np.broadcast_to(np.maximum(start, 0), values.shape)
+    return cumsum[..., 1:] - np.take_along_axis(cumsum, start, axis=-1)
+
+
+def borrow_beds(non_icu: np.ndarray, icu: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Shift free beds between non-ICU and ICU wherever one is short and the other is not.
+
+    `non_icu` and `icu` are bed availabilities of any matching shape.
+    """
+    to_non_icu = (non_icu < 0) & (icu > 0)
+    to_icu = (non_icu > 0) & (icu < 0)
+    # Beds moved from ICU to non-ICU; negative when moving the other way.
+    moved = np.where(
+        to_non_icu,
+        np.minimum(-non_icu, icu),
+        np.where(to_icu, -np.minimum(-icu, non_icu), 0.0),
+    )
+    return non_icu + moved, icu - moved
+
+
+class lazy_frame:
+    """A result frame built from `raw` on first access and memoized on the model.
+
+    `add_counts` drops the memoized frames of the stages it is given.
+    Every access returns the same frame, which `ModelCache` also shares
+    between reruns and restaged models, so callers must not modify it;
+    take a copy first, as `body_charts.build_data_and_params` does.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __call__(self, build):
+        self.build = build
+        self.__doc__ = build.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        frame = self.build(model)
+        model.__dict__[self.name] = frame
+        return frame
 
 
 class SimSirModelBase:
 
+    # Parameters fields read only by each post-processing stage. Every other
+    # field is assumed to affect the SIR stage.
+    STAGE_FIELDS = {
+        "dispositions": ("market_share", "dispositions", "non_icu", "icu", "ventilators", "non_icu_after_icu"),
+        "admits": ("los_distributions",),
+        "census": (),
+        "beds": ("total_covid_beds", "icu_covid_beds", "covid_ventilators", "beds_borrow"),
+        "ppe": (
+            "resources", "masks_n95", "masks_surgical", "face_shield", "gloves", "gowns", "other_ppe",
+            "masks_n95_icu", "masks_surgical_icu", "face_shield_icu", "gloves_icu", "gowns_icu", "other_ppe_icu",
+        ),
+        "staffing": (
+            "resources", "nurses", "physicians", "advanced_practice_providers", "healthcare_assistants", "other_staff",
+            "nurses_icu", "physicians_icu", "advanced_practice_providers_icu", "healthcare_assistants_icu",
+            "other_staff_icu", "shift_duration",
+        ),
+    }
+
     def __init__(self, p: Parameters):
+        self.set_parameters(p)
+        self.keys = ("susceptible", "infected", "recovered")
+        self.raw = ResultStore(np.arange(0)) # Placeholder to satisfy the linter, subclasses overwrite this
 
+    def set_parameters(self, p: Parameters):
         self.rates = {
             key: d.rate
             for key, d in p.dispositions.items()
         }
 
+        # A length of stay is either fixed (days) or a discharge-probability vector
+        los_distributions = p.los_distributions or {}
+        unknown = set(los_distributions) - set(p.dispositions)
+        if unknown:
+            raise ValueError(f"Unknown length of stay distributions: {sorted(unknown)}")
         self.days = {
-            key: d.days
+            key: discharge_pmf(los_distributions[key]) if key in los_distributions else d.days
             for key, d in p.dispositions.items()
         }
         self.p = p
         self.gamma = 1.0 / p.infectious_days
-        self.keys = ("susceptible", "infected", "recovered")
-        self.raw = pd.DataFrame() # Placeholder to satisfy the linter, subclasses overwrite this
+
+    def restage(self, p: Parameters, stages: Sequence[str]) -> SimSirModelBase:
+        """Copy of this model for `p`, recomputing only `stages`.
+
+        `p` may differ from this model's parameters only in fields read by
+        `stages`, so the SIR stage can never be recomputed this way.
+        """
+        assert "sir" not in stages, "The SIR stage cannot be recomputed in place."
+        model = copy.copy(self)
+        model.set_parameters(p)
+        if any(stage in RAW_STAGES for stage in stages):
+            model.raw = self.raw.copy()
+            model.calculate_counts(p)
+        model.add_counts(stages)
+        return model
+
+    def calculate_counts(self, p: Parameters):
+        """Adds dispositions, admits, and census to `raw`."""
+        self.calculate_dispositions(self.raw, self.rates, p.market_share)
+        self.calculate_admits(self.raw, self.rates, p)
+        self.calculate_census(self.raw, self.days)
 
     def sir(
         self, s: float, i: float, r: float, beta: float, gamma: float, n: float
@@ -38,65 +190,80 @@ class SimSirModelBase:
         scale = n / (s_n + i_n + r_n)
         return s_n * scale, i_n * scale, r_n * scale
 
-    def add_counts(self):
+    def add_counts(self, stages: Sequence[str] = STAGES):
         """
-        Adds the admits, census, beds, ppe, and staffing dataframes
-        to the model object, `model`.
+        Resets the admits, census, beds, ppe, and staffing dataframes
+        of the model object, `model`, for each of `stages`. Each one is
+        rebuilt from `raw` the first time it is read.
         """
-        self.dispositions_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'ever_non_icu': self.raw['ever_non_icu'],
-            'ever_icu': self.raw['ever_icu'],
-            'ever_ventilators': self.raw['ever_ventilators'],
-        })
-        self.admits_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'non_icu': self.raw['admits_non_icu'],
-            'non_icu_after_icu': self.raw['admits_non_icu_after_icu'],
-            'icu': self.raw['admits_icu'],
-            'ventilators': self.raw['admits_ventilators'],
-            'total': self.raw['admits_total']
-        })
-        self.census_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'non_icu': self.raw['census_non_icu'],
-            'non_icu_after_icu': self.raw['census_non_icu_after_icu'],
-            'icu': self.raw['census_icu'],
-            'ventilators': self.raw['census_ventilators'],
-            'total': self.raw['census_total'],
-        })
-        self.beds_df = self.build_beds_df(self.census_df, self.p)
-        self.ppe_df = self.build_ppe_df(self.census_df, self.p)
-        self.staffing_df = self.build_staffing_df(self.census_df, self.p)
+        for cls in type(self).__mro__:
+            for name, attr in vars(cls).items():
+                if isinstance(attr, lazy_frame) and attr.stage in stages:
+                    self.__dict__.pop(name, None)
+
+    @lazy_frame("sir")
+    def sim_sir_w_date_df(self) -> pd.DataFrame:
+        return self.build_sim_sir_w_date_df(self.raw, self.p.covid_census_date, self.keys)
+
+    @lazy_frame("sir")
+    def sim_sir_w_date_floor_df(self) -> pd.DataFrame:
+        return self.build_sim_sir_w_date_df(self.raw, self.p.covid_census_date, self.keys, floor=True)
 
-        self.sim_sir_w_date_df = self.build_sim_sir_w_date_df(self.raw, self.p.covid_census_date, self.keys)
+    @lazy_frame("dispositions")
+    def dispositions_df(self) -> pd.DataFrame:
+        return self.raw.frame(['ever_non_icu', 'ever_icu', 'ever_ventilators'])
 
-        self.sim_sir_w_date_floor_df = self.build_floor_df(self.sim_sir_w_date_df, self.keys)
-        self.admits_floor_df = self.build_floor_df(self.admits_df, self.p.dispositions.keys())
-        self.census_floor_df = self.build_floor_df(self.census_df, self.p.dispositions.keys())
-        self.beds_floor_df = self.build_floor_df(self.beds_df, self.beds_df.columns[2:])
-        self.ppe_floor_df = self.build_floor_df(self.ppe_df, self.ppe_df.columns[2:])
-        self.staffing_floor_df = self.build_floor_df(self.staffing_df, self.staffing_df.columns[2:])
+    @lazy_frame("admits")
+    def admits_df(self) -> pd.DataFrame:
+        return self.raw.frame(["admits_" + key for key in COUNT_KEYS], COUNT_KEYS)
 
+    @lazy_frame("admits")
+    def admits_floor_df(self) -> pd.DataFrame:
+        keys = self.p.dispositions.keys()
+        return self.raw.frame(["admits_" + key for key in keys], keys, floor=True)
+
+    @lazy_frame("census")
+    def census_df(self) -> pd.DataFrame:
+        return self.raw.frame(["census_" + key for key in COUNT_KEYS], COUNT_KEYS)
+
+    @lazy_frame("census")
+    def census_floor_df(self) -> pd.DataFrame:
+        keys = self.p.dispositions.keys()
+        return self.raw.frame(["census_" + key for key in keys], keys, floor=True)
+
+    @lazy_frame("beds")
+    def beds_df(self) -> pd.DataFrame:
+        return self.build_beds_df(self.census_df, self.p)
+
+    @lazy_frame("beds")
+    def beds_floor_df(self) -> pd.DataFrame:
+        return self.build_floor_df(self.beds_df, self.beds_df.columns[2:])
+
+    @lazy_frame("ppe")
+    def ppe_df(self) -> pd.DataFrame:
+        return self.build_ppe_df(self.census_df, self.p)
+
+    @lazy_frame("ppe")
+    def ppe_floor_df(self) -> pd.DataFrame:
+        return self.build_floor_df(self.ppe_df, self.ppe_df.columns[2:])
+
+    @lazy_frame("staffing")
+    def staffing_df(self) -> pd.DataFrame:
+        return self.build_staffing_df(self.census_df, self.p)
+
+    @lazy_frame("staffing")
+    def staffing_floor_df(self) -> pd.DataFrame:
+        return self.build_floor_df(self.staffing_df, self.staffing_df.columns[2:])
 
     def build_sim_sir_w_date_df(
         self,
-        raw: Dict,
+        raw: ResultStore,
         current_date: datetime.datetime,
         keys: Sequence[str],
+        floor: bool = False,
     ) -> pd.DataFrame:
-        day = pd.Series(raw['day'])
-        return pd.DataFrame({
-            "day": day,
-            "date": day.astype('timedelta64[D]') + np.datetime64(current_date),
-            **{
-                key: raw[key]
-                for key in keys
-            }
-        })
+        date = raw['day'].astype('timedelta64[D]') + np.datetime64(current_date)
+        return raw.frame(keys, floor=floor, date=date)
 
 
     def build_floor_df(self, df, keys):
@@ -117,39 +284,41 @@ class SimSirModelBase:
         p,
     ) -> pd.DataFrame:
         """ALOS for each category of COVID-19 case (total guesses)"""
+        beds = self.calculate_beds({
+            key: census_df[key].to_numpy()
+            for key in ("non_icu", "icu", "ventilators")
+        }, p)
         beds_df = pd.DataFrame()
         beds_df["day"] = census_df["day"]
         beds_df["date"] = census_df["date"]
+        columns = ("total", "non_icu", "icu", "ventilators") if p.beds_borrow else ("non_icu", "icu", "ventilators", "total")
+        for key in columns:
+            beds_df[key] = beds[key]
+        return beds_df
 
+    def calculate_beds(
+        self,
+        census: Dict[str, np.ndarray],
+        p,
+    ) -> Dict[str, np.ndarray]:
+        """Beds and ventilators left over from the non_icu, icu and ventilators census.
+
+        The census arrays may be (day) or (scenario x day).
+        """
         # If hospitalized < 0 and there's space in icu, start borrowing if possible
         # If ICU < 0, raise alarms. No changes.
-        beds_df["non_icu"] = p.total_covid_beds - p.icu_covid_beds - census_df["non_icu"]
-        beds_df["icu"] = p.icu_covid_beds - census_df["icu"]
-        beds_df["ventilators"] = p.covid_ventilators - census_df["ventilators"]
-        beds_df["total"] = p.total_covid_beds - census_df["non_icu"] - census_df["icu"]
-        # beds_df = beds_df.head(n_days)
+        beds = {
+            "non_icu": p.total_covid_beds - p.icu_covid_beds - census["non_icu"],
+            "icu": p.icu_covid_beds - census["icu"],
+            "ventilators": p.covid_ventilators - census["ventilators"],
+            "total": p.total_covid_beds - census["non_icu"] - census["icu"],
+        }
 
         # Shift people to ICU if main hospital is full and ICU is not.
         # And vice versa
         if p.beds_borrow:
-            new_hosp = []
-            new_icu = []
-            for row in beds_df.itertuples():
-                if row.non_icu < 0 and row.icu > 0: # ICU to Non-ICU
-                    needed = min(abs(row.non_icu), row.icu)
-                    new_hosp.append(row.non_icu + needed)
-                    new_icu.append(row.icu - needed)
-                elif row.non_icu > 0 and row.icu < 0: # Non-ICU to ICU
-                    needed = min(abs(row.icu), row.non_icu)
-                    new_hosp.append(row.non_icu - needed)
-                    new_icu.append(row.icu + needed)
-                else: 
-                    new_hosp.append(row.non_icu)
-                    new_icu.append(row.icu)
-            beds_df["non_icu"] = new_hosp
-            beds_df["icu"] = new_icu
-            beds_df = beds_df[["day", "date", "total", "non_icu", "icu", "ventilators"]]
-        return beds_df
+            beds["non_icu"], beds["icu"] = borrow_beds(beds["non_icu"], beds["icu"])
+        return beds
 
 
     def build_ppe_df(
@@ -157,35 +326,10 @@ class SimSirModelBase:
         census_df: pd.DataFrames,
         p,
     ) -> pd.DataFrame:
-        """ALOS for each category of COVID-19 case (total guesses)"""
-        ppe_df = pd.DataFrame()
-        ppe_df["day"] = census_df["day"]
-        ppe_df["date"] = census_df["date"]
-
-        fnic = np.floor(census_df.non_icu) # floored non-icu census
-        ppe_df["masks_n95_non_icu"] = p.masks_n95 * fnic
-        ppe_df["masks_surgical_non_icu"] = p.masks_surgical * fnic
-        ppe_df["face_shield_non_icu"] = p.face_shield * fnic
-        ppe_df["gloves_non_icu"] = p.gloves * fnic
-        ppe_df["gowns_non_icu"] = p.gowns * fnic
-        ppe_df["other_ppe_non_icu"] = p.other_ppe * fnic
-
-        fic = np.floor(census_df.icu) # floored icu census
-        ppe_df["masks_n95_icu"] = p.masks_n95_icu * fic
-        ppe_df["masks_surgical_icu"] = p.masks_surgical_icu * fic
-        ppe_df["face_shield_icu"] = p.face_shield_icu * fic
-        ppe_df["gloves_icu"] = p.gloves_icu * fic
-        ppe_df["gowns_icu"] = p.gowns_icu * fic
-        ppe_df["other_ppe_icu"] = p.other_ppe_icu * fic
-        
-        ppe_df["masks_n95_total"] = ppe_df["masks_n95_non_icu"] + ppe_df["masks_n95_icu"]
-        ppe_df["masks_surgical_total"] = ppe_df["masks_surgical_non_icu"] + ppe_df["masks_surgical_icu"]
-        ppe_df["face_shield_total"] = ppe_df["face_shield_non_icu"] + ppe_df["face_shield_icu"]
-        ppe_df["gloves_total"] = ppe_df["gloves_non_icu"] + ppe_df["gloves_icu"]
-        ppe_df["gowns_total"] = ppe_df["gowns_non_icu"] + ppe_df["gowns_icu"]
-        ppe_df["other_ppe_total"] = ppe_df["other_ppe_non_icu"] + ppe_df["other_ppe_icu"]
-
-        return ppe_df
+        """PPE used per day by each item of the PPE catalog."""
+        resources = get_resources(p, ResourceKind.PPE)
+        ppe = calculate_ppe(census_df.non_icu.to_numpy(), census_df.icu.to_numpy(), resources)
+        return self.build_resource_df(census_df, ppe, resources)
 
 
     def build_staffing_df(
@@ -193,43 +337,18 @@ class SimSirModelBase:
         census_df: pd.DataFrames,
         p,
     ) -> pd.DataFrame:
-        """ALOS for each category of COVID-19 case (total guesses)"""
-        staffing_df = pd.DataFrame()
-        staffing_df["day"] = census_df["day"]
-        staffing_df["date"] = census_df["date"]
-
-        stf_mul = 24.0 / p.shift_duration # Staffing Multiplier
-        fnic = np.floor(census_df.non_icu) # floored non-icu census
-        fic = np.floor(census_df.icu) # floored icu census
-
-        staffing_df["nurses_non_icu"] = np.ceil(np.ceil(
-            fnic / p.nurses) * stf_mul) if p.nurses !=0 else 0
-        staffing_df["physicians_non_icu"] = np.ceil(np.ceil(
-            fnic / p.physicians) * stf_mul) if p.physicians != 0 else 0
-        staffing_df["advanced_practice_providers_non_icu"] = np.ceil(np.ceil(
-            fnic / p.advanced_practice_providers) * stf_mul) if p.advanced_practice_providers != 0 else 0
-        staffing_df["healthcare_assistants_non_icu"] = np.ceil(np.ceil(
-            fnic / p.healthcare_assistants) * stf_mul) if p.healthcare_assistants != 0 else 0
-        staffing_df["other_staff_non_icu"] = np.ceil(np.ceil(
-        fnic / p.other_staff) * stf_mul) if p.other_staff != 0 else 0
-
-        staffing_df["nurses_icu"] = np.ceil(np.ceil(
-            fic / p.nurses_icu) * stf_mul) if p.nurses_icu !=0 else 0
-        staffing_df["physicians_icu"] = np.ceil(np.ceil(
-            fic / p.physicians_icu) * stf_mul) if p.physicians_icu !=0 else 0
-        staffing_df["advanced_practice_providers_icu"] = np.ceil(np.ceil(
-            fic / p.advanced_practice_providers_icu) * stf_mul) if p.advanced_practice_providers_icu !=0 else 0
-        staffing_df["healthcare_assistants_icu"] = np.ceil(np.ceil(
-            fic / p.healthcare_assistants_icu) * stf_mul) if p.healthcare_assistants_icu !=0 else 0
-        staffing_df["other_staff_icu"] = np.ceil(np.ceil(
-            fic / p.other_staff_icu) * stf_mul) if p.other_staff_icu != 0 else 0
-
-        staffing_df["nurses_total"] = np.ceil(staffing_df["nurses_non_icu"] + staffing_df["nurses_icu"])
-        staffing_df["physicians_total"] = np.ceil(staffing_df["physicians_non_icu"] + staffing_df["physicians_icu"])
-        staffing_df["advanced_practice_providers_total"] = np.ceil(staffing_df["advanced_practice_providers_non_icu"] + staffing_df["advanced_practice_providers_icu"])
-        staffing_df["healthcare_assistants_total"] = np.ceil(staffing_df["healthcare_assistants_non_icu"] + staffing_df["healthcare_assistants_icu"])
-        staffing_df["other_staff_total"] = np.ceil(staffing_df["other_staff_non_icu"] + staffing_df["other_staff_icu"])
-        return staffing_df
+        """Staff needed per day for each role of the staffing catalog."""
+        resources = get_resources(p, ResourceKind.STAFF)
+        staffing = calculate_staffing(
+            census_df.non_icu.to_numpy(), census_df.icu.to_numpy(), resources, p.shift_duration)
+        return self.build_resource_df(census_df, staffing, resources)
+
+
+    def build_resource_df(self, census_df: pd.DataFrame, values: np.ndarray, resources) -> pd.DataFrame:
+        df = pd.DataFrame(values, columns=resource_columns(resources), copy=False)
+        df.insert(0, "day", census_df["day"])
+        df.insert(1, "date", census_df["date"])
+        return df
 
 
     def calculate_dispositions(
@@ -238,10 +357,15 @@ class SimSirModelBase:
         rates: Dict[str, float],
         market_share: float,
     ):
-        """Build dispositions dataframe of patients adjusted by rate and market_share."""
+        """Build dispositions dataframe of patients adjusted by rate and market_share.
+
+        `rates` and `market_share` may hold one value per scenario when `raw`
+        comes from a batched simulation.
+        """
+        market_share = per_scenario(market_share)
         for key, rate in rates.items():
+            rate = per_scenario(rate)
             raw["ever_" + key] = raw["ever_infected"] * rate * market_share
-            raw[key] = raw["ever_infected"] * rate * market_share
 
 
     def calculate_admits(self, raw: Dict, rates, p,):
@@ -249,17 +373,18 @@ class SimSirModelBase:
         for key in rates.keys():
             ever = raw["ever_" + key]
             admit = np.empty_like(ever)
-            admit[0] = np.nan
-            admit[1:] = ever[1:] - ever[:-1]
+            admit[..., 0] = np.nan
+            admit[..., 1:] = ever[..., 1:] - ever[..., :-1]
             raw["admits_"+key] = admit
-            raw[key] = admit
         
         # Pad with icu LOS 0's then cut off icu LOS from end.
-        if p.non_icu_after_icu.days > 0:  # If non-ICU LOS > 0, shift by icu LOS
-            raw["admits_non_icu_after_icu"] = np.pad(
-                raw["admits_icu"], [p.icu.days, 0], mode="constant")[:-p.icu.days]
+        icu_los = (p.los_distributions or {}).get("icu")
+        if p.non_icu_after_icu.days > 0 and icu_los is not None:  # Transfers as ICU patients are discharged
+            raw["admits_non_icu_after_icu"] = discharges_from_admits(np.nan_to_num(raw["admits_icu"]), icu_los)
+        elif p.non_icu_after_icu.days > 0:  # If non-ICU LOS > 0, shift by icu LOS
+            raw["admits_non_icu_after_icu"] = shift_days(raw["admits_icu"], p.icu.days)
         else:
-            raw["admits_non_icu_after_icu"] = np.zeros(len(raw["admits_non_icu"]))
+            raw["admits_non_icu_after_icu"] = np.zeros_like(raw["admits_non_icu"])
         # Uncomment to count transfers as admissions to non-icu, though this double counts census.
         # Have to copy admits_non_icu before the addition to avoid double counting. When commented, census is correct. 
         # raw["admits_non_icu"] = raw["admits_non_icu"] + raw["admits_non_icu_after_icu"]
@@ -272,19 +397,30 @@ class SimSirModelBase:
     def calculate_census(
         self,
         raw: Dict,
-        lengths_of_stay: Dict[str, int],
+        lengths_of_stay: Dict[str, Union[int, Sequence[float]]],
     ):
-        """Average Length of Stay for each disposition of COVID-19 case (total guesses)"""
+        """Average Length of Stay for each disposition of COVID-19 case (total guesses)
+
+        A length of stay may also be a discharge-probability vector, which
+        convolves the admits with its survival curve, or `ScenarioDays`
+        holding days per scenario of a batched `raw`.
+        """
         n_days = raw["day"].shape[0]
         for key, los in lengths_of_stay.items():
-            if (key == "non_icu_after_icu") and (los == 0):
-                raw['census_non_icu_after_icu'] = np.zeros(len(raw["census_icu"]))
+            if isinstance(los, ScenarioDays):
+                days = np.rint(los.days).astype("int")
+                raw["census_" + key] = sum_last_days(raw["admits_" + key], days)
+            elif np.ndim(los):
+                raw["census_" + key] = census_from_admits(raw["admits_" + key], los)
+            elif (key == "non_icu_after_icu") and (los == 0):
+                raw['census_non_icu_after_icu'] = np.zeros_like(raw["census_icu"])
             else:
-                cumsum = np.empty(n_days + los)
-                cumsum[:los+1] = 0.0
-                cumsum[los+1:] = raw["admits_" + key][1:].cumsum()
+                admits = raw["admits_" + key]
+                cumsum = np.empty(admits.shape[:-1] + (n_days + los,))
+                cumsum[..., :los+1] = 0.0
+                cumsum[..., los+1:] = admits[..., 1:].cumsum(axis=-1)
 
-                census = cumsum[los:] - cumsum[:-los]
+                census = cumsum[..., los:] - cumsum[..., :-los]
                 raw["census_" + key] = census
         raw['census_non_icu'] = raw['census_non_icu'] + raw['census_non_icu_after_icu']
         raw['census_total'] = np.floor(raw['census_non_icu']) + np.floor(raw['census_icu'])
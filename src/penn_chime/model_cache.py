@@ -0,0 +1,345 @@
+"""Model cache.
+
+Models are keyed on a canonical hash of the Parameters fields that affect
+results, held in an in-memory LRU and optionally persisted to a
+size-bounded directory so repeated scenarios survive restarts.
+
+Each pipeline stage also gets its own key, chained from the stage it builds
+on, so a model that differs from a cached one only in, say, staffing ratios
+is derived from it by recomputing the staffing stage alone.
+
+    CHIME_CACHE_ENTRIES    in-memory models to keep (default 32)
+    CHIME_CACHE_DIR        directory for the on-disk store (default: none)
+    CHIME_CACHE_MAX_BYTES  size bound of the on-disk store (default 256 MiB)
+"""
+
+from collections import OrderedDict
+import datetime
+import hashlib
+import json
+from logging import getLogger
+import os
+import pickle
+import tempfile
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .constants import CHANGE_DATE
+from .model_base import STAGES, STAGE_PARENTS
+from .parameters import Parameters
+from .penn_model import PennModel
+
+
+logger = getLogger(__name__)
+
+# Bump when cached models would no longer match freshly built ones.
+CACHE_VERSION = 3
+
+# Parameters attributes that only change how results are presented.
+PRESENTATION_FIELDS = frozenset((
+    "author",
+    "scenario",
+    "max_y_axis",
+    "max_y_axis_set",
+    "show_forecast_methods",
+    "show_ppe_section",
+    "show_staffing_section",
+    "labels",
+    "actuals_labels",
+    "admits_patient_chart_desc",
+    "census_patient_chart_desc",
+    "beds_chart_desc",
+    "ppe_labels",
+    "staffing_labels",
+))
+
+
+# Parameters attributes a fit may differ in and still warm-start from
+# another model's fit; see `ModelCache._warm_start`.
+WARM_START_FIELDS = frozenset((
+    "covid_census_value",
+    "relative_contact_rate",
+))
+
+
+def canonical(value: Any) -> Any:
+    """Reduce `value` to plain JSON types with a single representation."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value))
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in value.items()}
+    if hasattr(value, "__dict__"):
+        return canonical(vars(value))
+    return repr(value)
+
+
+def result_fields(p: Parameters) -> Dict[str, Any]:
+    return {
+        key: value
+        for key, value in vars(p).items()
+        if key not in PRESENTATION_FIELDS
+    }
+
+
+def digest(model_class: type, payload: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {
+            "model": model_class.__name__,
+            "version": CACHE_VERSION,
+            "change_date": CHANGE_DATE.isoformat(),
+            **payload,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def parameters_key(p: Parameters, model_class: type = PennModel) -> str:
+    """Content address of the results `model_class` would build from `p`."""
+    return digest(model_class, {"parameters": canonical(result_fields(p))})
+
+
+def warm_start_key(p: Parameters, model_class: type = PennModel) -> str:
+    """Content address of `p` up to the fields in `WARM_START_FIELDS`."""
+    return digest(model_class, {
+        "warm_start": canonical({
+            key: value
+            for key, value in result_fields(p).items()
+            if key not in WARM_START_FIELDS
+        }),
+    })
+
+
+def stage_keys(p: Parameters, model_class: type = PennModel) -> Dict[str, str]:
+    """Content address of each stage of the results built from `p`.
+
+    A stage key covers the fields the stage reads and, through its parent's
+    key, everything upstream of it.
+    """
+    fields = result_fields(p)
+    downstream = {
+        field
+        for stage_fields in model_class.STAGE_FIELDS.values()
+        for field in stage_fields
+    }
+    keys = {
+        "sir": digest(model_class, {
+            "stage": "sir",
+            "parameters": canonical({
+                key: value
+                for key, value in fields.items()
+                if key not in downstream
+            }),
+        }),
+    }
+    for stage in STAGES[1:]:
+        keys[stage] = digest(model_class, {
+            "stage": stage,
+            "parent": keys[STAGE_PARENTS[stage]],
+            "parameters": canonical({
+                key: fields[key]
+                for key in model_class.STAGE_FIELDS[stage]
+                if key in fields
+            }),
+        })
+    return keys
+
+
+class ModelCache:
+    """LRU of built models, backed by an optional on-disk store."""
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        directory: Optional[str] = None,
+        max_bytes: int = 256 * 2 ** 20,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.stage_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._models = OrderedDict()
+        self._lock = Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "stage_hits": self.stage_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._models),
+        }
+
+    def get_model(self, p: Parameters, model_class: type = PennModel):
+        """Return the model for `p`, building it only on a miss.
+
+        When only post-processing stages differ from a cached model, the
+        new model is derived from it by recomputing those stages. Otherwise
+        the new model's fit is warm-started from the most recently used
+        model that differs only in the census or contact rate, usually the
+        one before the user's last edit.
+
+        Cached models are shared and must be treated as read-only. Values
+        the model fits into its parameters (doubling_time) are copied onto
+        `p` so callers see the same `p` as after a fresh build.
+        """
+        # Models update some fields of `p` while fitting, so key first.
+        key = parameters_key(p, model_class)
+        keys = stage_keys(p, model_class)
+        warm_key = warm_start_key(p, model_class)
+        model = self._get(key)
+        if model is None:
+            model = self._read(key)
+            if model is not None:
+                self.disk_hits += 1
+                self._put(key, model, keys, warm_key)
+        if model is not None:
+            self.hits += 1
+            p.doubling_time = model.p.doubling_time
+        else:
+            model = self._restage(p, keys)
+            if model is not None:
+                self.stage_hits += 1
+            else:
+                self.misses += 1
+                model = model_class(p, warm_start=self._warm_start(warm_key))
+            self._put(key, model, keys, warm_key)
+            self._write(key, model)
+        logger.info('Model cache: %s', self.stats)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            self._models.move_to_end(key)
+            return entry[0]
+
+    def _warm_start(self, warm_key: str):
+        """The most recently used model with the same `warm_start_key`, if any.
+
+        Its fit is a good start only when the rest of the inputs match.
+        """
+        with self._lock:
+            entries = list(self._models.values())
+        for model, _, model_warm_key in reversed(entries):
+            if model_warm_key == warm_key:
+                return model
+        return None
+
+    def _restage(self, p: Parameters, keys: Dict[str, str]):
+        """Derive the model for `p` from the cached one sharing most stages."""
+        with self._lock:
+            entries = list(self._models.values())
+        best, best_stale = None, None
+        for model, cached_keys, _ in entries:
+            if cached_keys is None or cached_keys["sir"] != keys["sir"]:
+                continue
+            stale = [stage for stage in STAGES if cached_keys[stage] != keys[stage]]
+            if best_stale is None or len(stale) < len(best_stale):
+                best, best_stale = model, stale
+        if best is None:
+            return None
+        logger.info('Model cache: recomputing stages %s', best_stale)
+        p.doubling_time = best.p.doubling_time
+        return best.restage(p, best_stale)
+
+    def _put(
+        self,
+        key: str,
+        model,
+        keys: Optional[Dict[str, str]] = None,
+        warm_key: Optional[str] = None,
+    ):
+        with self._lock:
+            self._models[key] = (model, keys, warm_key)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+                self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _read(self, key: str):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception('Discarding unreadable cache entry %s', path)
+            os.remove(path)
+            return None
+        os.utime(path)  # Mark as recently used
+        return model
+
+    def _write(self, key: str, model):
+        if self.directory is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self._trim()
+
+    def _trim(self):
+        """Drop least recently used files until the store fits `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.evictions += 1
+
+
+_cache = None
+
+
+def get_cache() -> ModelCache:
+    """The process-wide cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        _cache = ModelCache(
+            max_entries=int(os.environ.get("CHIME_CACHE_ENTRIES", 32)),
+            directory=os.environ.get("CHIME_CACHE_DIR"),
+            max_bytes=int(os.environ.get("CHIME_CACHE_MAX_BYTES", 256 * 2 ** 20)),
+        )
+    return _cache
+
+
+def cached_model(p: Parameters, model_class: type = PennModel):
+    """Build (or reuse) the model for `p` through the process-wide cache."""
+    return get_cache().get_model(p, model_class)
@@ -6,10 +6,14 @@ constants.py `change_date``.
 
 from collections import namedtuple
 import datetime
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Sequence, Union
+
+from .contact_schedule import ContactRateChange
+from .resources import Resource, ResourceKind, get_resources, resource_labels
 
 from .validators import (
-    Positive, OptionalStrictlyPositive, StrictlyPositive, Rate, Date, OptionalDate
+    Positive, OptionalStrictlyPositive, StrictlyPositive, Rate, Date, OptionalDate, OptionalDistributions,
+    OptionalSchedule,
     )
 
 # Parameters for each disposition (hospitalized, icu, ventilated)
@@ -68,6 +72,11 @@ class ForecastMethod:
         else:
             raise ValueError(f"No method called {method}")
 
+class FitMethod:
+    """How PennModel searches for the doubling time matching the census."""
+    GRID = "Grid Search"
+    BRENT = "Bounded Brent"
+
 class Regions:
     """Arbitrary regions to sum population."""
 
@@ -118,6 +127,7 @@ class Parameters:
         # Model settings
         forecasted_metric: str = ForecastedMetric.DOUBLING_TIME,
         forecast_method: str = ForecastMethod.ETS,
+        fit_method: str = FitMethod.GRID,
         # County selections
         selected_states: List[str] = None,
         selected_counties: List[str] = None,
@@ -150,6 +160,12 @@ class Parameters:
         other_staff_icu=10,
         # Shift Duration
         shift_duration: int = 12,
+        # Resource catalog, replacing the PPE and staffing ratios above
+        resources: Optional[Sequence[Resource]] = None,
+        # Length of stay distributions by disposition, replacing the fixed days
+        los_distributions: Optional[Dict[str, Sequence[float]]] = None,
+        # Dated contact rate changes, replacing mitigation_date and relative_contact_rate
+        contact_rate_schedule: Optional[Sequence[ContactRateChange]] = None,
 
         # Population
         override_population: bool = False,
@@ -220,6 +236,7 @@ class Parameters:
         # Model Settings
         self.forecasted_metric = forecasted_metric
         self.forecast_method = forecast_method
+        self.fit_method = fit_method
 
         # County Selections
         self.selected_states = selected_states if selected_states is not None else []
@@ -254,6 +271,9 @@ class Parameters:
         self.other_staff_icu = other_staff_icu
         # Shift Duration
         self.shift_duration = shift_duration
+        self.resources = resources
+        self.los_distributions = OptionalDistributions(value=los_distributions)
+        self.contact_rate_schedule = OptionalSchedule(value=contact_rate_schedule)
 
         # Population
         self.override_population = override_population
@@ -415,3 +435,7 @@ class Parameters:
                 "col3_name": "other_staff_icu",
             },
         }
+
+        if resources is not None:
+            self.ppe_labels = resource_labels(get_resources(self, ResourceKind.PPE))
+            self.staffing_labels = resource_labels(get_resources(self, ResourceKind.STAFF))
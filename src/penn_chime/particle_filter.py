@@ -0,0 +1,294 @@
+"""Sequential assimilation of daily actuals with a particle filter.
+
+Each particle carries an SIR state (s, i, r), its own beta, which follows a
+log-normal random walk, and the daily new infections of the last few
+weeks, from which census and admits are computed as in `PennModel`. A
+daily update advances every particle to the date of the new actuals,
+reweights it by the likelihood of those actuals and resamples when the
+effective sample size falls too low. The cost is linear in the number of
+particles, with no refit.
+
+Observations are normal with a variance of `dispersion` times their value
+(at least 1), as in `posterior`. A filter is saved to and loaded from a
+`.npz` file, so it can carry on in a later session.
+"""
+
+from __future__ import annotations
+
+import copy
+import datetime
+import json
+from logging import getLogger
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
+
+from .calibration import CALIBRATION_SERIES
+from .ensemble import PERCENTILES, percentile_bands
+from .length_of_stay import discharge_pmf, survival
+from .penn_model import PennModel
+
+
+logger = getLogger(__name__)
+
+DISPOSITION_KEYS = ("non_icu", "icu", "ventilators")
+
+STATE_ARRAYS = ("s", "i", "r", "beta", "history", "log_weights")
+
+
+def census_weights(los) -> np.ndarray:
+    """Share of the admits of each day `k` ago still in hospital today."""
+    if np.ndim(los):
+        return survival(los)
+    return np.ones(los)
+
+
+def after_icu_weights(icu_los, after_icu_los) -> np.ndarray:
+    """Share of the ICU admits of each day `k` ago in a non-ICU bed after the ICU today."""
+    if not np.ndim(after_icu_los) and after_icu_los == 0:
+        return np.zeros(1)
+    if np.ndim(icu_los):
+        discharges = discharge_pmf(icu_los)
+    else:
+        discharges = np.zeros(icu_los + 1)
+        discharges[icu_los] = 1.0
+    return np.convolve(discharges, census_weights(after_icu_los))
+
+
+def weighted_percentiles(values: np.ndarray, weights: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    cumulative /= cumulative[-1]
+    index = np.searchsorted(cumulative, np.asarray(percentiles) / 100.0)
+    return values[order][np.minimum(index, len(values) - 1)]
+
+
+class ParticleFilter:
+    """Particles of SIR state, beta and recent infections, with their log weights."""
+
+    def __init__(
+        self,
+        date: datetime.date,
+        state: Dict[str, np.ndarray],
+        settings: Dict,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.date = date
+        for name in STATE_ARRAYS:
+            setattr(self, name, np.asarray(state[name], dtype="float"))
+        self.position = int(state.get("position", 0))
+        self.settings = settings
+        self.weights = {key: np.asarray(w, dtype="float") for key, w in settings["weights"].items()}
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.log_evidence = float(settings.get("log_evidence", 0.0))
+
+    @classmethod
+    def from_model(
+        cls,
+        model: PennModel,
+        n_particles: int = 10000,
+        seed: Optional[int] = None,
+        beta_volatility: float = 0.05,
+        initial_spread: float = 0.1,
+        dispersion: float = 1.0,
+        resample_threshold: float = 0.5,
+    ) -> ParticleFilter:
+        """Particles spread around the state of `model` on `covid_census_date`.
+
+        Beta and infected are perturbed by log-normal noise of scale
+        `initial_spread`; each day, log beta takes a step of scale
+        `beta_volatility`. Particles are resampled when the effective sample
+        size falls below `resample_threshold` times their number.
+        """
+        p = model.p
+        rng = np.random.default_rng(seed)
+        weights = {key: census_weights(model.days[key]) for key in DISPOSITION_KEYS}
+        weights["non_icu_after_icu"] = after_icu_weights(model.days["icu"], model.days["non_icu_after_icu"])
+        n_history = max(len(w) for w in weights.values())
+
+        today = model.i_day
+        ever = model.raw["ever_infected"]
+        new = np.diff(ever[:today + 1], prepend=ever[0])
+        history = np.zeros(n_history)
+        recent = new[::-1][:n_history]
+        history[-np.arange(len(recent)) % n_history] = recent  # layout of `ages`, at position 0
+
+        infected = model.raw["infected"][today] * np.exp(initial_spread * rng.standard_normal(n_particles))
+        recovered = np.full(n_particles, model.raw["recovered"][today])
+        population = model.raw["susceptible"][today] + model.raw["infected"][today] + recovered[0]
+        beta = model.get_betas(p, np.array([0]))[0] * np.exp(initial_spread * rng.standard_normal(n_particles))
+
+        state = {
+            "s": population - infected - recovered,
+            "i": infected,
+            "r": recovered,
+            "beta": beta,
+            "history": np.broadcast_to(history, (n_particles, n_history)).copy(),
+            "log_weights": np.full(n_particles, -np.log(n_particles)),
+        }
+        settings = {
+            "rates": {key: model.rates[key] for key in DISPOSITION_KEYS},
+            "market_share": p.market_share,
+            "gamma": model.gamma,
+            "population": population,
+            "beta_volatility": beta_volatility,
+            "dispersion": dispersion,
+            "resample_threshold": resample_threshold,
+            "weights": {key: w.tolist() for key, w in weights.items()},
+        }
+        return cls(p.covid_census_date, state, settings, rng)
+
+    @property
+    def n_particles(self) -> int:
+        return len(self.s)
+
+    def ages(self) -> np.ndarray:
+        """Column of `history` holding the new infections of each day ago."""
+        return (self.position - np.arange(self.history.shape[1])) % self.history.shape[1]
+
+    def counts(self) -> Dict[str, np.ndarray]:
+        """Today's census and admits of every particle, keyed like `PennModel.raw`."""
+        history = self.history[:, self.ages()]
+        market_share = self.settings["market_share"]
+        rates = self.settings["rates"]
+
+        def census(key, rate):
+            weights = self.weights[key]
+            return history[:, :len(weights)] @ weights * rate * market_share
+
+        counts = {
+            "admits_" + key: history[:, 0] * rates[key] * market_share
+            for key in DISPOSITION_KEYS
+        }
+        counts.update({
+            "census_" + key: census(key, rates[key])
+            for key in DISPOSITION_KEYS
+        })
+        counts["census_non_icu"] = counts["census_non_icu"] + census("non_icu_after_icu", rates["icu"])
+        return counts
+
+    def advance(self):
+        """Move every particle one day ahead."""
+        volatility = self.settings["beta_volatility"]
+        gamma, n = self.settings["gamma"], self.settings["population"]
+        self.beta = self.beta * np.exp(volatility * self.rng.standard_normal(self.n_particles))
+
+        # The step of SimSirModelBase.sir, for every particle at once
+        s, i, r, beta = self.s, self.i, self.r, self.beta
+        s_n = (-beta * s * i) + s
+        i_n = (beta * s * i - gamma * i) + i
+        r_n = gamma * i + r
+        scale = n / (s_n + i_n + r_n)
+        s_n, i_n, r_n = s_n * scale, i_n * scale, r_n * scale
+
+        self.position = (self.position + 1) % self.history.shape[1]
+        self.history[:, self.position] = (i_n + r_n) - (i + r)
+        self.s, self.i, self.r = s_n, i_n, r_n
+        self.date = self.date + datetime.timedelta(days=1)
+
+    def update(self, date: datetime.date, observation: Dict[str, float]):
+        """Advance to `date` and assimilate its `observation`, keyed by actuals column."""
+        if date <= self.date:
+            raise ValueError(f"{date} needs to be after the filter date {self.date}.")
+        while self.date < date:
+            self.advance()
+
+        counts = self.counts()
+        log_likelihood = np.zeros(self.n_particles)
+        for column, value in observation.items():
+            if column not in CALIBRATION_SERIES or not np.isfinite(value):
+                continue
+            predicted = sum(counts[key] for key in CALIBRATION_SERIES[column])
+            variance = self.settings["dispersion"] * max(value, 1.0)
+            log_likelihood -= 0.5 * (predicted - value) ** 2 / variance
+
+        log_weights = self.log_weights + log_likelihood
+        total = logsumexp(log_weights)
+        self.log_evidence += float(total)
+        self.log_weights = log_weights - total
+        effective_sample_size = self.effective_sample_size()
+        if effective_sample_size < self.settings["resample_threshold"] * self.n_particles:
+            self.resample()
+        logger.info('Assimilated %s; effective sample size %.0f', date, effective_sample_size)
+
+    def assimilate(self, actuals: pd.DataFrame) -> int:
+        """Update with every row of `actuals` dated after the filter; returns how many."""
+        rows = actuals[actuals.date.dt.date > self.date].sort_values("date")
+        for row in rows.itertuples(index=False):
+            row = row._asdict()
+            self.update(row.pop("date").date(), row)
+        return len(rows)
+
+    def effective_sample_size(self) -> float:
+        return float(1.0 / np.exp(logsumexp(2.0 * self.log_weights)))
+
+    def resample(self):
+        """Systematic resampling to equal weights."""
+        cumulative = np.cumsum(np.exp(self.log_weights))
+        cumulative[-1] = 1.0
+        positions = (self.rng.random() + np.arange(self.n_particles)) / self.n_particles
+        index = np.searchsorted(cumulative, positions)
+        self.s, self.i, self.r, self.beta = (v[index] for v in (self.s, self.i, self.r, self.beta))
+        self.history = self.history[index]
+        self.log_weights = np.full(self.n_particles, -np.log(self.n_particles))
+
+    def summary(self, percentiles: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+        """Weighted percentiles of today's census, admits, beta and R_t."""
+        weights = np.exp(self.log_weights)
+        counts = self.counts()
+        values = {
+            **counts,
+            "census_total": counts["census_non_icu"] + counts["census_icu"],
+            "beta": self.beta,
+            "r_t": self.beta * self.s / self.settings["gamma"],
+        }
+        return pd.DataFrame(
+            [weighted_percentiles(v, weights, percentiles) for v in values.values()],
+            index=list(values),
+            columns=[f"p{q:g}" for q in percentiles],
+        )
+
+    def forecast(self, n_days: int, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, pd.DataFrame]:
+        """Percentile bands of census for the next `n_days`, from a resampled copy of the particles.
+
+        Betas keep their random walk, and this filter's random stream is
+        advanced.
+        """
+        particles = copy.deepcopy(self)
+        particles.resample()
+        values = {"census_" + key: [] for key in DISPOSITION_KEYS}
+        for _ in range(n_days + 1):
+            counts = particles.counts()
+            for key in values:
+                values[key].append(counts[key])
+            particles.advance()
+        values = {key: np.stack(v, axis=1) for key, v in values.items()}
+        values["census_total"] = values["census_non_icu"] + values["census_icu"]
+        day = np.arange(n_days + 1)
+        return percentile_bands(values, day, self.date, percentiles)
+
+    def save(self, path: str):
+        """Write the particles, settings and random state to a `.npz` file."""
+        settings = dict(self.settings, log_evidence=self.log_evidence)
+        np.savez_compressed(
+            path,
+            **{name: getattr(self, name) for name in STATE_ARRAYS},
+            position=self.position,
+            date=self.date.isoformat(),
+            settings=json.dumps(settings),
+            rng=json.dumps(self.rng.bit_generator.state),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> ParticleFilter:
+        """Filter saved by `save`, continuing its random stream."""
+        with np.load(path, allow_pickle=False) as saved:
+            state = {name: saved[name] for name in STATE_ARRAYS}
+            state["position"] = int(saved["position"])
+            date = datetime.date.fromisoformat(str(saved["date"]))
+            settings = json.loads(str(saved["settings"]))
+            rng = np.random.default_rng()
+            rng.bit_generator.state = json.loads(str(saved["rng"]))
+        return cls(date, state, settings, rng)
@@ -5,22 +5,88 @@ constants.py `change_date`,
 """
 from __future__ import annotations
 
+from collections import namedtuple
 import datetime
 from logging import getLogger
-from typing import Optional, Sequence, Tuple
+from time import perf_counter
+from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
-from .parameters import Parameters
-from .model_base import SimSirModelBase
+from scipy.optimize import minimize_scalar
+
+from .contact_schedule import contact_rates, schedule_days
+from .parameters import FitMethod, Parameters
+from .model_base import SimSirModelBase, per_scenario
+from .result_store import ResultStore
 
 
 logger = getLogger(__name__)
 
+# Dispositions that make up census_non_icu, the value fits are scored on.
+FIT_KEYS = ("non_icu", "icu", "non_icu_after_icu")
+
+# Bracket and tolerance for the doubling time search. The tolerance matches
+# the spacing left by the grid search after its four refinements.
+DOUBLING_TIME_BOUNDS = (1.0, 15.0)
+DOUBLING_TIME_TOLERANCE = (2.0 / 14.0) ** 4
+
+# Candidate i_days of the global search, and the half-width of the window
+# searched around a warm start's i_day.
+I_DAY_CANDIDATES = 90
+WARM_I_DAY_WINDOW = 5
+
+# A warm-started grid search begins with the grid of the second refinement,
+# centred on the previous doubling time, and refines it twice more. A
+# warm-started Brent search is bounded to the previous doubling time plus
+# or minus the Brent bracket.
+WARM_DOUBLING_TIME_BRACKET = 2.0 / 14.0
+WARM_DOUBLING_TIME_REFINEMENTS = 2
+WARM_BRENT_BRACKET = 0.5
+
+# Infected count below which an epidemic with no policy change left and a
+# shrinking infected count is burnt out. Its remaining days are filled in
+# by `burnout_tail` instead of simulated.
+BURNOUT_INFECTED = 1.0
+
+# What a fit cost: candidate projections, scenario-days simulated and
+# seconds, and whether the local search around a warm start sufficed.
+FitReport = namedtuple("FitReport", ("fitted", "method", "projections", "simulated_days", "seconds", "warm_started"))
+
+
+def burnout_tail(s, i, r, beta, gamma, n, n_days: int):
+    """SIR state for the next 0..n_days days of a burnt-out epidemic.
+
+    With so few infected, susceptibles barely change, so infected decay
+    geometrically by 1 + beta * s - gamma a day. Arguments are scalars or
+    hold one value per scenario; results are (day) or (day x scenario).
+    """
+    decay = 1.0 + beta * s - gamma
+    powers = decay ** np.arange(n_days + 1).reshape((-1,) + (1,) * np.ndim(decay))
+    i_t = i * powers
+    r_t = r + gamma * i * (1.0 - powers) / (1.0 - decay)
+    return n - i_t - r_t, i_t, r_t
+
 
 class PennModel(SimSirModelBase):
-    def __init__(self, p: Parameters):
+
+    # Market share, the non-ICU and ICU dispositions and the LOS distributions
+    # feed the census the fits are scored on, so they belong to the SIR stage here.
+    STAGE_FIELDS = {
+        **SimSirModelBase.STAGE_FIELDS,
+        "dispositions": ("dispositions", "ventilators"),
+        "admits": (),
+    }
+
+    def __init__(self, p: Parameters, warm_start: Optional[PennModel] = None):
+        """Fit and project `p`.
+
+        `warm_start` is a model built for similar parameters (say, before a
+        small edit of the census or contact rate): its fitted i_day or
+        doubling time starts a local search, and the global search runs
+        only when the local one ends on the edge of its bracket.
+        """
         super(PennModel, self).__init__(p)
 
         # An estimate of the number of infected people on the day that
@@ -37,46 +103,37 @@ class PennModel(SimSirModelBase):
         self.infected = infected
         self.recovered = p.recovered
 
+        self.projections = 0
+        self.simulated_days = 0
+        self.warm_started = False
+        fit_start = perf_counter()
+
         if p.doubling_time is not None:
             # Back-projecting to when the first hospitalized case would have been admitted
             logger.info('Using doubling_time: %s', p.doubling_time)
 
             intrinsic_growth_rate = self.get_growth_rate(p.doubling_time)
             self.beta = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
-            self.beta_t = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+            self.beta_t = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, self.get_final_contact_rate(p))
 
-            if p.mitigation_date is None:
+            if p.mitigation_date is None and p.contact_rate_schedule is None:
                 self.i_day = 0 # seed to the full length
                 temp_n_days = p.n_days
                 p.n_days = 1000
                 raw = self.run_projection(p, [(self.beta, p.n_days)])
                 self.i_day = i_day = int(self.get_argmin_ds(raw["census_non_icu"], p.covid_census_value))
                 p.n_days = temp_n_days
+                self.fit_report = self.get_fit_report("i_day", FitMethod.GRID, fit_start)
 
                 self.raw = self.run_projection(p, self.gen_policy(p))
 
                 logger.info('Set i_day = %s', i_day)
             else:
-                projections = {}
-                best_i_day = -1
-                best_i_day_loss = float('inf')
                 temp_n_days = p.n_days
                 p.n_days = 1000
-                for i_day in range(90):
-                    self.i_day = i_day
-                    raw = self.run_projection(p, self.gen_policy(p))
-
-
-                    # Don't fit against results that put the peak before the present day
-                    if raw["census_non_icu"].argmax() < i_day:
-                        continue
-
-                    loss = self.get_loss(raw["census_non_icu"][i_day], p.covid_census_value)
-                    if loss < best_i_day_loss:
-                        best_i_day_loss = loss
-                        best_i_day = i_day
+                self.i_day = self.get_fitted_i_day(p, self.get_warm_start(warm_start, "i_day"))
                 p.n_days = temp_n_days
-                self.i_day = best_i_day
+                self.fit_report = self.get_fit_report("i_day", FitMethod.GRID, fit_start)
                 raw = self.run_projection(p, self.gen_policy(p))
                 self.raw = raw
 
@@ -98,21 +155,17 @@ class PennModel(SimSirModelBase):
                 p.covid_census_value,
             )
 
-            # Make an initial coarse estimate
-            dts = np.linspace(1, 15, 15)
-            min_loss = self.get_argmin_doubling_time(p, dts)
-
-            # Refine the coarse estimate
-            for iteration in range(4):
-                dts = np.linspace(dts[min_loss-1], dts[min_loss+1], 15)
-                min_loss = self.get_argmin_doubling_time(p, dts)
-
-            p.doubling_time = dts[min_loss]
+            start = self.get_warm_start(warm_start, "doubling_time")
+            if p.fit_method == FitMethod.BRENT:
+                p.doubling_time = self.get_bounded_doubling_time(p, start)
+            else:
+                p.doubling_time = self.get_grid_doubling_time(p, start)
+            self.fit_report = self.get_fit_report("doubling_time", p.fit_method, fit_start)
 
-            logger.info('Estimated doubling_time: %s', p.doubling_time)
+            logger.info('Estimated doubling_time: %s; %s', p.doubling_time, self.fit_report)
             intrinsic_growth_rate = self.get_growth_rate(p.doubling_time)
             self.beta = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
-            self.beta_t = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+            self.beta_t = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, self.get_final_contact_rate(p))
             self.raw = self.run_projection(p, self.gen_policy(p))
 
             self.population = p.population
@@ -126,7 +179,7 @@ class PennModel(SimSirModelBase):
 
         self.raw["date"] = self.raw["day"].astype("timedelta64[D]") + np.datetime64(p.covid_census_date)
 
-        self.add_counts() # Adds admits, census, beds, ppe, and staffing dataframes.
+        self.add_counts() # Resets the admits, census, beds, ppe, and staffing dataframes.
 
         logger.info('len(np.arange(-i_day, n_days+1)): %s', len(np.arange(-self.i_day, p.n_days+1)))
         logger.info('len(raw): %s', len(self.raw))
@@ -149,32 +202,187 @@ class PennModel(SimSirModelBase):
         self.daily_growth_rate = self.get_growth_rate(p.doubling_time)
         self.daily_growth_rate_t = self.get_growth_rate(self.doubling_time_t)
 
-    def get_argmin_doubling_time(self, p: Parameters, dts):
-        losses = np.full(dts.shape[0], np.inf)
-        for i, i_dt in enumerate(dts):
-            intrinsic_growth_rate = self.get_growth_rate(i_dt)
-            self.beta = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
-            self.beta_t = self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+    def get_warm_start(self, warm_start: Optional[PennModel], fitted: str):
+        """The i_day or doubling time `warm_start` fitted, if it fitted `fitted`."""
+        if warm_start is None or warm_start.fit_report.fitted != fitted:
+            return None
+        if fitted == "i_day":
+            return warm_start.i_day if warm_start.i_day >= 0 else None
+        return warm_start.p.doubling_time
+
+    def get_fitted_i_day(self, p: Parameters, start: Optional[int] = None) -> int:
+        """i_day that best matches the census, searched near `start` first."""
+        if start is not None:
+            window = np.arange(
+                max(start - WARM_I_DAY_WINDOW, 0),
+                min(start + WARM_I_DAY_WINDOW + 1, I_DAY_CANDIDATES),
+            )
+            i_day = self.get_argmin_i_day(p, window)
+            on_edge = (
+                (i_day == window[0] and window[0] > 0)
+                or (i_day == window[-1] and window[-1] < I_DAY_CANDIDATES - 1)
+            )
+            if i_day >= 0 and not on_edge:
+                self.warm_started = True
+                return i_day
+        return self.get_argmin_i_day(p, np.arange(I_DAY_CANDIDATES))
 
-            raw = self.run_projection(p, self.gen_policy(p))
+    def get_grid_doubling_time(self, p: Parameters, start: Optional[float] = None) -> float:
+        """Doubling time that best matches the census, by grid search.
 
-            # Skip values the would put the fit past peak
-            peak_admits_day = raw["admits_non_icu"].argmax()
-            if peak_admits_day < 0:
-                continue
+        A coarse grid is refined four times around its best point. From a
+        warm `start`, the search skips the coarse grid and first refinement.
+        """
+        lower, upper = DOUBLING_TIME_BOUNDS
+        if start is not None and lower <= start - WARM_DOUBLING_TIME_BRACKET and start + WARM_DOUBLING_TIME_BRACKET <= upper:
+            dts = np.linspace(start - WARM_DOUBLING_TIME_BRACKET, start + WARM_DOUBLING_TIME_BRACKET, 15)
+            min_loss = self.get_argmin_doubling_time(p, dts)
+            if 0 < min_loss < len(dts) - 1:
+                for iteration in range(WARM_DOUBLING_TIME_REFINEMENTS):
+                    dts = np.linspace(dts[min_loss-1], dts[min_loss+1], 15)
+                    min_loss = self.get_argmin_doubling_time(p, dts)
+                self.warm_started = True
+                return dts[min_loss]
+
+        # Make an initial coarse estimate
+        dts = np.linspace(1, 15, 15)
+        min_loss = self.get_argmin_doubling_time(p, dts)
+
+        # Refine the coarse estimate
+        for iteration in range(4):
+            dts = np.linspace(dts[min_loss-1], dts[min_loss+1], 15)
+            min_loss = self.get_argmin_doubling_time(p, dts)
 
-            predicted = raw["census_non_icu"][self.i_day]
-            loss = self.get_loss(self.covid_census_value, predicted)
-            losses[i] = loss
+        return dts[min_loss]
 
-        min_loss = pd.Series(losses).argmin()
-        return min_loss
+    def get_argmin_doubling_time(self, p: Parameters, dts: np.ndarray) -> int:
+        """Index of the doubling time in `dts` that best matches the census.
 
-    def gen_policy(self, p: Parameters) -> Sequence[Tuple[float, int]]:
+        All candidates are projected in one batch.
+        """
+        beta, beta_t = self.get_beta_pair(p, dts)
+        days = np.arange(self.i_day + p.n_days) - self.i_day
+        raw = self.run_projection(p, self.get_betas(p, days, beta, beta_t), keys=FIT_KEYS)
+
+        predicted = raw["census_non_icu"][:, self.i_day]
+        losses = self.get_loss(self.covid_census_value, predicted)
+        return pd.Series(losses).argmin()
+
+    def get_bounded_doubling_time(self, p: Parameters, start: Optional[float] = None) -> float:
+        """Doubling time that best matches the census, by bounded Brent search.
+
+        Reaches the grid search tolerance with about a fifth of the
+        projections (and simulated days), one candidate at a time. From a
+        warm `start`, the search is first bounded to a bracket around it.
+        """
+        days = np.arange(self.i_day + p.n_days) - self.i_day
+
+        def loss(doubling_time):
+            beta, beta_t = self.get_beta_pair(p, doubling_time)
+            raw = self.run_projection(p, self.get_betas(p, days, beta, beta_t)[np.newaxis, :], keys=FIT_KEYS)
+            return self.get_loss(self.covid_census_value, raw["census_non_icu"][0, self.i_day])
+
+        if start is not None:
+            lower = max(start - WARM_BRENT_BRACKET, DOUBLING_TIME_BOUNDS[0])
+            upper = min(start + WARM_BRENT_BRACKET, DOUBLING_TIME_BOUNDS[1])
+            result = minimize_scalar(
+                loss,
+                bounds=(lower, upper),
+                method="bounded",
+                options={"xatol": DOUBLING_TIME_TOLERANCE},
+            )
+            on_edge = (
+                (result.x - lower < 2.0 * DOUBLING_TIME_TOLERANCE and lower > DOUBLING_TIME_BOUNDS[0])
+                or (upper - result.x < 2.0 * DOUBLING_TIME_TOLERANCE and upper < DOUBLING_TIME_BOUNDS[1])
+            )
+            if not on_edge:
+                self.warm_started = True
+                return float(result.x)
+
+        result = minimize_scalar(
+            loss,
+            bounds=DOUBLING_TIME_BOUNDS,
+            method="bounded",
+            options={"xatol": DOUBLING_TIME_TOLERANCE},
+        )
+        return float(result.x)
+
+    def get_beta_pair(self, p: Parameters, doubling_time):
+        """Beta before and after mitigation for one or many doubling times."""
+        intrinsic_growth_rate = self.get_growth_rate(doubling_time)
+        return (
+            self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0),
+            self.get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, self.get_final_contact_rate(p)),
+        )
+
+    def get_fit_report(self, fitted: str, method: str, fit_start: float) -> FitReport:
+        return FitReport(
+            fitted, method, self.projections, self.simulated_days, perf_counter() - fit_start, self.warm_started,
+        )
+
+    def get_argmin_i_day(self, p: Parameters, i_days: np.ndarray) -> int:
+        """Find the i_day whose projection best matches the current census.
+
+        Every candidate starts from the same seed state, so all of them are
+        projected in one batch aligned on the seed day: row `j` switches
+        policy according to `i_days[j]` and is scored at column `i_days[j]`.
+        Returns -1 when every candidate peaks before the present day.
+        """
+        n_steps = i_days.max() + p.n_days
+        days = np.arange(n_steps)[np.newaxis, :] - i_days[:, np.newaxis]
+        self.i_day = 0  # days are labelled from the seed day
+        raw = self.run_projection(p, self.get_betas(p, days), keys=FIT_KEYS)
+
+        census = raw["census_non_icu"]
+        rows = np.arange(len(i_days))
+
+        # Each candidate only simulates i_day + n_days days, so mask the
+        # columns past its horizon before locating the peak.
+        horizon = np.arange(n_steps + 1)[np.newaxis, :] <= (i_days + p.n_days)[:, np.newaxis]
+        peak_days = np.where(horizon, census, -np.inf).argmax(axis=1)
+
+        # Don't fit against results that put the peak before the present day
+        losses = np.where(
+            peak_days < i_days,
+            np.inf,
+            self.get_loss(census[rows, i_days], p.covid_census_value),
+        )
+        if not np.isfinite(losses).any():
+            return -1
+        return int(i_days[losses.argmin()])
+
+    def get_mitigation_day(self, p: Parameters) -> int:
         if p.mitigation_date is not None:
-            mitigation_day = -(p.covid_census_date - p.mitigation_date).days
-        else:
-            mitigation_day = 0
+            return -(p.covid_census_date - p.mitigation_date).days
+        return 0
+
+    def get_final_contact_rate(self, p: Parameters) -> float:
+        """Relative contact rate after the last change, which sets beta_t."""
+        if p.contact_rate_schedule is not None:
+            return p.contact_rate_schedule[-1].relative_contact_rate
+        return p.relative_contact_rate
+
+    def get_betas(self, p: Parameters, days: np.ndarray, beta=None, beta_t=None) -> np.ndarray:
+        """Beta in effect on each of `days`, counted from covid_census_date.
+
+        Equivalent to expanding `gen_policy` for any i_day, and accepts
+        arrays of any shape. Passing one `beta` and `beta_t` per scenario
+        gives a (scenario x day) schedule. With a contact rate schedule,
+        each day's beta is `beta` reduced by the rate then in effect, and
+        `beta_t` is not used.
+        """
+        beta = self.beta if beta is None else per_scenario(beta)
+        if p.contact_rate_schedule is not None:
+            rates = contact_rates(days, *schedule_days(p.contact_rate_schedule, p.covid_census_date))
+            return beta * (1.0 - rates)
+        beta_t = self.beta_t if beta_t is None else per_scenario(beta_t)
+        return np.where(days < self.get_mitigation_day(p), beta, beta_t)
+
+    def gen_policy(self, p: Parameters) -> Sequence[Tuple[float, int]]:
+        if p.contact_rate_schedule is not None:
+            return self.gen_schedule_policy(p)
+
+        mitigation_day = self.get_mitigation_day(p)
 
         total_days = self.i_day + p.n_days
 
@@ -189,19 +397,68 @@ class PennModel(SimSirModelBase):
             (self.beta_t, post_mitigation_days),
         ]
 
-    def run_projection(self, p: Parameters, policy: Sequence[Tuple[float, int]]):
-        raw = self.sim_sir(
-            self.susceptible,
-            self.infected,
-            p.recovered,
-            self.gamma,
-            -self.i_day,
-            policy
+    def gen_schedule_policy(self, p: Parameters) -> Sequence[Tuple[float, int]]:
+        """One (beta, n_days) policy per contact rate in effect during the projection."""
+        betas = self.get_betas(p, np.arange(-self.i_day, p.n_days))
+        starts = np.flatnonzero(np.diff(betas, prepend=np.nan))
+        lengths = np.diff(starts, append=len(betas))
+        return [
+            (float(betas[start]), int(n_days))
+            for start, n_days in zip(starts, lengths)
+        ]
+
+    def gen_betas(self, policy: Sequence[Tuple[float, int]]) -> np.ndarray:
+        """Expand a list of (beta, n_days) policies into one beta per simulated day."""
+        return np.repeat(
+            np.array([beta for beta, _ in policy], dtype="float"),
+            [n_days for _, n_days in policy],
         )
 
-        self.calculate_dispositions(raw, self.rates, p.market_share)
-        self.calculate_admits(raw, self.rates, p)
-        self.calculate_census(raw, self.days)
+    def run_projection(
+        self,
+        p: Parameters,
+        policy: Union[Sequence[Tuple[float, int]], np.ndarray],
+        keys: Optional[Sequence[str]] = None,
+    ):
+        """Simulate and post-process one projection.
+
+        `policy` is either a list of (beta, n_days) policies or a
+        (scenario x day) array of betas, in which case every scenario is
+        projected at once by `sim_sir_batch` and each array in the result
+        has a leading scenario axis. `keys` limits post-processing to those
+        dispositions; fits only need `FIT_KEYS`.
+        """
+        if isinstance(policy, np.ndarray):
+            self.projections += policy.shape[0]
+            self.simulated_days += policy.size
+            raw = self.sim_sir_batch(
+                self.susceptible,
+                self.infected,
+                p.recovered,
+                self.gamma,
+                -self.i_day,
+                policy
+            )
+        else:
+            self.projections += 1
+            self.simulated_days += sum(n_days for _, n_days in policy)
+            raw = ResultStore.from_arrays(self.sim_sir(
+                self.susceptible,
+                self.infected,
+                p.recovered,
+                self.gamma,
+                -self.i_day,
+                policy
+            ))
+
+        rates, days = self.rates, self.days
+        if keys is not None:
+            rates = {key: rates[key] for key in keys}
+            days = {key: days[key] for key in keys}
+
+        self.calculate_dispositions(raw, rates, p.market_share)
+        self.calculate_admits(raw, rates, p)
+        self.calculate_census(raw, days)
 
         return raw
 
@@ -235,6 +492,8 @@ class PennModel(SimSirModelBase):
 
     def get_growth_rate(self, doubling_time: Optional[float]) -> float:
         """Calculates average daily growth rate from doubling time."""
+        if np.ndim(doubling_time):
+            return np.array([self.get_growth_rate(dt) for dt in doubling_time])
         if doubling_time is None or doubling_time == 0.0:
             return 0.0
         return (2.0 ** (1.0 / doubling_time) - 1.0)
@@ -246,6 +505,10 @@ class PennModel(SimSirModelBase):
         """Simulate SIR model forward in time, returning a dictionary of daily arrays
         Parameter order has changed to allow multiple (beta, n_days)
         to reflect multiple changing social distancing policies.
+
+        Once the last policy is in effect and the epidemic is burnt out
+        (see `BURNOUT_INFECTED`), the remaining days are filled in by
+        `burnout_tail`.
         """
         s, i, r = (float(v) for v in (s, i, r))
         n = s + i + r
@@ -261,8 +524,16 @@ class PennModel(SimSirModelBase):
         r_a = np.empty(total_days, "float")
 
         index = 0
-        for beta, n_days in policies:
+        for policy, (beta, n_days) in enumerate(policies):
+            last_policy = policy == len(policies) - 1
             for _ in range(n_days):
+                if last_policy and i < BURNOUT_INFECTED and beta * s < gamma:
+                    d_a[index:] = np.arange(d, d + total_days - index)
+                    s_a[index:], i_a[index:], r_a[index:] = burnout_tail(s, i, r, beta, gamma, n, total_days - 1 - index)
+                    index = total_days - 1
+                    s, i, r = s_a[-1], i_a[-1], r_a[-1]
+                    d = d_a[-1]
+                    break
                 d_a[index] = d
                 s_a[index] = s
                 i_a[index] = i
@@ -284,3 +555,112 @@ class PennModel(SimSirModelBase):
             "ever_infected": i_a + r_a
         }
 
+
+    def sim_sir_batch(self, s, i, r, gamma, i_day: int, betas: np.ndarray):
+        """Simulate many SIR scenarios forward in time at once.
+
+        `betas` is a (scenario x day) array of the beta in effect on each
+        simulated day; `s`, `i`, `r` and `gamma` are scalars or hold one value
+        per scenario. Returns the same dictionary as `sim_sir`, except that
+        each compartment is a (scenario x day) array. `day` is shared.
+
+        Once every scenario's betas have stopped changing and every
+        epidemic is burnt out, the remaining days are filled in by
+        `burnout_tail`.
+        """
+        betas = np.atleast_2d(np.asarray(betas, dtype="float"))
+        n_scenarios, n_steps = betas.shape
+        s, i, r, gamma = (
+            np.broadcast_to(np.asarray(v, dtype="float"), (n_scenarios,)).copy()
+            for v in (s, i, r, gamma)
+        )
+        n = s + i + r
+
+        # Step day-major so each write is contiguous, then hand back
+        # (scenario x day) views.
+        betas = np.ascontiguousarray(betas.T)
+        s_a = np.empty((n_steps + 1, n_scenarios), "float")
+        i_a = np.empty((n_steps + 1, n_scenarios), "float")
+        r_a = np.empty((n_steps + 1, n_scenarios), "float")
+        s_a[0], i_a[0], r_a[0] = s, i, r
+
+        # First step from which no scenario's beta changes again
+        changes = np.flatnonzero((betas[1:] != betas[:-1]).any(axis=1))
+        steady = changes[-1] + 1 if len(changes) else 0
+
+        for index in range(n_steps):
+            if index >= steady and (i < BURNOUT_INFECTED).all() and (betas[index] * s < gamma).all():
+                s_a[index:], i_a[index:], r_a[index:] = burnout_tail(s, i, r, betas[index], gamma, n, n_steps - index)
+                break
+            s, i, r = self.sir(s, i, r, betas[index], gamma, n)
+            s_a[index + 1] = s
+            i_a[index + 1] = i
+            r_a[index + 1] = r
+
+        return {
+            "day": np.arange(i_day, i_day + n_steps + 1),
+            "susceptible": s_a.T,
+            "infected": i_a.T,
+            "recovered": r_a.T,
+            "ever_infected": (i_a + r_a).T,
+        }
+
+    def sim_sir_stochastic(self, s, i, r, gamma, i_day: int, betas: np.ndarray, rng: np.random.Generator):
+        """Simulate chain-binomial SIR replicates forward in time at once.
+
+        Each day, every susceptible is infected with probability
+        min(beta * infected, 1) and every infected recovers with probability
+        `gamma`, so event counts match `sir` in expectation. The state is
+        rounded to whole people. `betas` is a (replicate x day) array;
+        returns the same dictionary as `sim_sir_batch`.
+        """
+        betas = np.atleast_2d(np.asarray(betas, dtype="float"))
+        n_replicates, n_steps = betas.shape
+        s, i, r = (np.full(n_replicates, np.rint(v), dtype="int64") for v in (s, i, r))
+
+        betas = np.ascontiguousarray(betas.T)
+        s_a = np.empty((n_steps + 1, n_replicates), "int64")
+        i_a = np.empty((n_steps + 1, n_replicates), "int64")
+        r_a = np.empty((n_steps + 1, n_replicates), "int64")
+        s_a[0], i_a[0], r_a[0] = s, i, r
+        for index in range(n_steps):
+            infections = rng.binomial(s, np.minimum(betas[index] * i, 1.0))
+            recoveries = rng.binomial(i, gamma)
+            s = s - infections
+            i = i + infections - recoveries
+            r = r + recoveries
+            s_a[index + 1] = s
+            i_a[index + 1] = i
+            r_a[index + 1] = r
+
+        return {
+            "day": np.arange(i_day, i_day + n_steps + 1),
+            "susceptible": s_a.T.astype("float"),
+            "infected": i_a.T.astype("float"),
+            "recovered": r_a.T.astype("float"),
+            "ever_infected": (i_a + r_a).T.astype("float"),
+        }
+
+    def run_stochastic_projection(self, p: Parameters, n_replicates: int, seed=None):
+        """Post-processed chain-binomial replicates of this model's projection.
+
+        Replicates start from the model's seed day and state. `seed` is
+        anything `numpy.random.default_rng` accepts. Returns the same
+        dictionary as a batched `run_projection`.
+        """
+        start = perf_counter()
+        rng = np.random.default_rng(seed)
+        days = np.arange(self.i_day + p.n_days) - self.i_day
+        betas = np.broadcast_to(self.get_betas(p, days), (n_replicates, len(days)))
+        susceptible, infected, recovered = (self.raw[key][0] for key in self.keys)
+        raw = self.sim_sir_stochastic(susceptible, infected, recovered, self.gamma, -self.i_day, betas, rng)
+
+        self.calculate_dispositions(raw, self.rates, p.market_share)
+        self.calculate_admits(raw, self.rates, p)
+        self.calculate_census(raw, self.days)
+
+        seconds = perf_counter() - start
+        logger.info(
+            'Stochastic projection: %s replicates in %.3fs (%.0f replicates/s)',
+            n_replicates, seconds, n_replicates / seconds)
+        return raw
@@ -0,0 +1,206 @@
+"""Bayesian calibration of the Penn model to actuals.
+
+Samples the posterior of the inputs fitted by `calibration` (doubling time,
+contact rates and disposition rates) given the uploaded census and
+admissions actuals, with the affine-invariant ensemble sampler of Goodman
+and Weare (2010). The ensemble is split in two halves, each moved against
+the other, so every step projects all walkers in two batches.
+
+Each observation is normal with a variance of `dispersion` times its value
+(at least 1), like a count. Priors are uniform within the calibration
+bounds unless given, as frozen `scipy.stats` distributions by input name.
+The posterior predictive of census, beds and staffing is summarized in
+percentile bands, as for `ensemble.run_ensemble`.
+"""
+
+from collections import namedtuple
+import copy
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .calibration import Calibration, calibrate
+from .ensemble import PERCENTILES, percentile_bands
+from .parameters import Parameters
+from .penn_model import PennModel
+from .resources import ResourceKind, calculate_staffing, get_resources, resource_columns
+
+
+logger = getLogger(__name__)
+
+CENSUS_KEYS = ("non_icu", "icu", "ventilators")
+
+# Stretch move scale, the usual choice.
+STRETCH_SCALE = 2.0
+
+# `samples` are the kept (draw x input) positions, after burn-in and thinning.
+PosteriorResult = namedtuple("PosteriorResult", (
+    "names", "samples", "log_probability", "acceptance_fraction", "bands",
+    "n_walkers", "n_steps", "seed", "seconds",
+))
+
+
+class Posterior:
+    """Log posterior density of batches of parameter vectors."""
+
+    def __init__(
+        self,
+        calibration: Calibration,
+        priors: Optional[Dict[str, Any]] = None,
+        dispersion: float = 1.0,
+    ):
+        priors = priors or {}
+        unknown = set(priors) - set(calibration.names)
+        if unknown:
+            raise ValueError(f"Unknown posterior inputs: {sorted(unknown)}")
+        self.calibration = calibration
+        self.priors = [priors.get(name) for name in calibration.names]
+        self.variances = {
+            column: dispersion * np.maximum(values, 1.0)
+            for column, (_, values, _) in calibration.observations.items()
+        }
+
+    def log_prior(self, x: np.ndarray) -> np.ndarray:
+        lower, upper = self.calibration.bounds
+        inside = ((x >= lower) & (x <= upper)).all(axis=1)
+        log_prior = np.where(inside, 0.0, -np.inf)
+        for index, prior in enumerate(self.priors):
+            if prior is not None:
+                log_prior = log_prior + prior.logpdf(x[:, index])
+        return log_prior
+
+    def log_likelihood(self, x: np.ndarray) -> np.ndarray:
+        raw = self.calibration.project(x)
+        log_likelihood = np.zeros(len(x))
+        for column, (index, values, _) in self.calibration.observations.items():
+            residuals = self.calibration.fitted(raw, column)[:, index] - values
+            log_likelihood -= 0.5 * (residuals ** 2 / self.variances[column]).sum(axis=1)
+        return log_likelihood
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """Log posterior (up to a constant) of each row of `x`, one batched projection."""
+        log_probability = self.log_prior(x)
+        finite = np.isfinite(log_probability)
+        if finite.any():
+            log_probability[finite] += self.log_likelihood(x[finite])
+        return log_probability
+
+
+def stretch_move(
+    walkers: np.ndarray,
+    log_probability: np.ndarray,
+    posterior: Posterior,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Advance every walker one step in place; returns which proposals were accepted."""
+    n_walkers, n_inputs = walkers.shape
+    half = n_walkers // 2
+    accepted = np.zeros(n_walkers, dtype="bool")
+    for active, other in ((slice(0, half), slice(half, None)), (slice(half, None), slice(0, half))):
+        positions, partners = walkers[active], walkers[other]
+        n_active = len(positions)
+        z = ((STRETCH_SCALE - 1.0) * rng.random(n_active) + 1.0) ** 2 / STRETCH_SCALE
+        partners = partners[rng.integers(len(partners), size=n_active)]
+        proposals = partners + z[:, np.newaxis] * (positions - partners)
+        proposed = posterior(proposals)
+        log_ratio = (n_inputs - 1) * np.log(z) + proposed - log_probability[active]
+        accept = np.log(rng.random(n_active)) < log_ratio
+        positions[accept] = proposals[accept]
+        log_probability[active][accept] = proposed[accept]
+        accepted[active] = accept
+    return accepted
+
+
+def predictive_values(calibration: Calibration, samples: np.ndarray) -> Dict[str, np.ndarray]:
+    """(draw x day) census, beds and staff needed, projected from each sample."""
+    p, model = calibration.p, calibration.model
+    raw = calibration.project(samples)
+    census = {key: raw["census_" + key] for key in CENSUS_KEYS}
+    beds = model.calculate_beds(census, p)
+    resources = get_resources(p, ResourceKind.STAFF)
+    staffing = calculate_staffing(census["non_icu"], census["icu"], resources, p.shift_duration)
+    return {
+        **{"census_" + key: values for key, values in census.items()},
+        "census_total": census["non_icu"] + census["icu"],
+        **{"beds_" + key: values for key, values in beds.items()},
+        **{
+            "staffing_" + column: staffing[..., index]
+            for index, column in enumerate(resource_columns(resources))
+            if column.endswith("_total")
+        },
+    }
+
+
+def run_posterior(
+    p: Parameters,
+    actuals: pd.DataFrame,
+    rate_keys: Sequence[str] = ("non_icu",),
+    priors: Optional[Dict[str, Any]] = None,
+    dispersion: float = 1.0,
+    n_walkers: int = 32,
+    n_steps: int = 1000,
+    burn: int = 300,
+    thin: int = 10,
+    seed: int = 0,
+    percentiles: Sequence[float] = PERCENTILES,
+    model: Optional[PennModel] = None,
+) -> PosteriorResult:
+    """Posterior samples of the calibrated inputs and predictive percentile bands.
+
+    Walkers start in a small ball around the least-squares fit of
+    `calibration.calibrate`. The first `burn` steps are dropped and every
+    `thin`-th step of the rest is kept.
+    """
+    if n_steps <= burn:
+        raise ValueError(f"n_steps ({n_steps}) needs to be greater than burn ({burn}) to keep any samples.")
+    if thin < 1:
+        raise ValueError(f"thin ({thin}) needs to be a positive number of steps.")
+    start = perf_counter()
+    model = PennModel(copy.copy(p)) if model is None else model
+    fit = calibrate(p, actuals, rate_keys, model=model)
+    calibration = Calibration(model, actuals, rate_keys)
+    posterior = Posterior(calibration, priors, dispersion)
+
+    rng = np.random.default_rng(seed)
+    lower, upper = calibration.bounds
+    # Jitter scaled to each input's range, so inputs fitted at 0 still spread
+    walkers = fit.values + 1e-3 * (upper - lower) * rng.standard_normal((n_walkers, len(fit.values)))
+    walkers = np.clip(walkers, lower, upper)
+    log_probability = posterior(walkers)
+
+    samples, sample_log_probability = [], []
+    n_accepted = np.zeros(n_walkers)
+    for step in range(n_steps):
+        n_accepted += stretch_move(walkers, log_probability, posterior, rng)
+        if step >= burn and (step - burn) % thin == 0:
+            samples.append(walkers.copy())
+            sample_log_probability.append(log_probability.copy())
+    samples = np.concatenate(samples)
+
+    day = np.arange(calibration.n_steps + 1) - calibration.i_day
+    bands = percentile_bands(predictive_values(calibration, samples), day, p.covid_census_date, percentiles)
+
+    result = PosteriorResult(
+        calibration.names,
+        samples,
+        np.concatenate(sample_log_probability),
+        n_accepted / n_steps,
+        bands,
+        n_walkers,
+        n_steps,
+        seed,
+        perf_counter() - start,
+    )
+    logger.info(
+        'Posterior of %s from %s walkers x %s steps in %.2fs (%s projections), acceptance %.2f',
+        calibration.names,
+        n_walkers,
+        n_steps,
+        result.seconds,
+        calibration.projections,
+        result.acceptance_fraction.mean(),
+    )
+    return result
@@ -0,0 +1,121 @@
+"""Resource catalog for PPE and staffing projections.
+
+Each resource has a per-patient ratio for non-ICU and ICU patients. PPE
+ratios are items used per patient per day; staff ratios are patients per
+staff member, with 0 meaning the role is not staffed for that unit.
+"""
+
+from collections import namedtuple
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class ResourceKind:
+    PPE = "ppe"
+    STAFF = "staff"
+
+
+Resource = namedtuple("Resource", ("name", "label", "kind", "non_icu", "icu"))
+
+UNITS = ("non_icu", "icu", "total")
+
+
+def get_resources(p, kind: str) -> Sequence[Resource]:
+    """Resources of `kind` for `p`: its catalog, or one built from its ratio fields."""
+    if p.resources is not None:
+        return [r for r in p.resources if r.kind == kind]
+    if kind == ResourceKind.PPE:
+        return [
+            Resource("masks_n95", "Masks - N95", kind, p.masks_n95, p.masks_n95_icu),
+            Resource("masks_surgical", "Masks - Surgical", kind, p.masks_surgical, p.masks_surgical_icu),
+            Resource("face_shield", "Face Shields", kind, p.face_shield, p.face_shield_icu),
+            Resource("gloves", "Gloves", kind, p.gloves, p.gloves_icu),
+            Resource("gowns", "Gowns", kind, p.gowns, p.gowns_icu),
+            Resource("other_ppe", "Other PPE", kind, p.other_ppe, p.other_ppe_icu),
+        ]
+    return [
+        Resource("nurses", "Nurses", kind, p.nurses, p.nurses_icu),
+        Resource("physicians", "Physicians", kind, p.physicians, p.physicians_icu),
+        Resource(
+            "advanced_practice_providers", "Advanced Practice Providers", kind,
+            p.advanced_practice_providers, p.advanced_practice_providers_icu,
+        ),
+        Resource(
+            "healthcare_assistants", "Healthcare Assistants", kind,
+            p.healthcare_assistants, p.healthcare_assistants_icu,
+        ),
+        Resource("other_staff", "Other Staff", kind, p.other_staff, p.other_staff_icu),
+    ]
+
+
+def resource_columns(resources: Sequence[Resource]) -> Sequence[str]:
+    """Result columns: every resource's non-ICU count, then ICU, then total."""
+    return [
+        f"{r.name}_{unit}"
+        for unit in UNITS
+        for r in resources
+    ]
+
+
+def resource_labels(resources: Sequence[Resource]) -> Dict:
+    """Chart labels for `resources`, in the layout of `Parameters.ppe_labels`."""
+    return {
+        "total": "Total",
+        "non_icu": "Non-ICU",
+        "icu": "ICU",
+        **{
+            r.name: {
+                "label": r.label,
+                "col1_name": f"{r.name}_total",
+                "col2_name": f"{r.name}_non_icu",
+                "col3_name": f"{r.name}_icu",
+            }
+            for r in resources
+        },
+    }
+
+
+def get_ratios(resources: Sequence[Resource]) -> np.ndarray:
+    """(unit x resource) array of non-ICU and ICU ratios."""
+    return np.array(
+        [[r.non_icu for r in resources], [r.icu for r in resources]],
+        dtype="float",
+    ).reshape(2, len(resources))
+
+
+def calculate_ppe(non_icu: np.ndarray, icu: np.ndarray, resources: Sequence[Resource]) -> np.ndarray:
+    """PPE use per day, in `resource_columns` order along the last axis.
+
+    `non_icu` and `icu` are census arrays of shape (day) or (scenario x day).
+    """
+    census = np.stack([np.floor(non_icu), np.floor(icu)], axis=-1)
+    ratios = get_ratios(resources)
+    zeros = np.zeros_like(ratios[0])
+    weights = np.block([
+        [ratios[0], zeros, ratios[0]],
+        [zeros, ratios[1], ratios[1]],
+    ])
+    return census @ weights
+
+
+def calculate_staffing(
+    non_icu: np.ndarray,
+    icu: np.ndarray,
+    resources: Sequence[Resource],
+    shift_duration: float,
+) -> np.ndarray:
+    """Staff needed per day, in `resource_columns` order along the last axis.
+
+    `non_icu` and `icu` are census arrays of shape (day) or (scenario x day).
+    """
+    census = np.stack([np.floor(non_icu), np.floor(icu)], axis=-1)[..., np.newaxis]
+    ratios = get_ratios(resources)
+    shifts = 24.0 / shift_duration
+    with np.errstate(divide="ignore", invalid="ignore"):
+        staff = np.where(ratios != 0, np.ceil(np.ceil(census / ratios) * shifts), 0.0)
+    staff_non_icu, staff_icu = staff[..., 0, :], staff[..., 1, :]
+    return np.concatenate(
+        [staff_non_icu, staff_icu, np.ceil(staff_non_icu + staff_icu)],
+        axis=-1,
+    )
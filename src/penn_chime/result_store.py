@@ -0,0 +1,111 @@
+"""Columnar store for model results.
+
+A projection's float results are rows of one contiguous (column x day)
+array at fixed offsets, so result frames can be views of it instead of
+copies.
+"""
+
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+COMPARTMENTS = ("susceptible", "infected", "recovered", "ever_infected")
+
+# Row order within each disposition group. The admits and census frames
+# show every disposition in this order; the dispositions frame shows the
+# first three of EVER_KEYS.
+EVER_KEYS = ("non_icu", "icu", "ventilators", "non_icu_after_icu", "total")
+COUNT_KEYS = ("non_icu", "non_icu_after_icu", "icu", "ventilators", "total")
+
+RESULT_COLUMNS = (
+    COMPARTMENTS
+    + tuple("ever_" + key for key in EVER_KEYS)
+    + tuple("admits_" + key for key in COUNT_KEYS)
+    + tuple("census_" + key for key in COUNT_KEYS)
+)
+
+
+class ResultStore(MutableMapping):
+    """Mapping of result names to daily arrays, backed by one float array.
+
+    Names in `columns` are rows of `data` and read as zeros until written;
+    writing one copies the values into its row. Any other name (day, date)
+    is held as a separate array.
+    """
+
+    def __init__(self, day: np.ndarray, columns: Sequence[str] = RESULT_COLUMNS):
+        self.offsets = {column: offset for offset, column in enumerate(columns)}
+        self.data = np.zeros((len(columns), len(day)))
+        self.other = {"day": np.asarray(day)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], columns: Sequence[str] = RESULT_COLUMNS):
+        store = cls(arrays["day"], columns)
+        store.update(arrays)
+        return store
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        offset = self.offsets.get(key)
+        if offset is None:
+            return self.other[key]
+        return self.data[offset]
+
+    def __setitem__(self, key: str, value: np.ndarray):
+        offset = self.offsets.get(key)
+        if offset is None:
+            self.other[key] = value
+        else:
+            self.data[offset] = value
+
+    def __delitem__(self, key: str):
+        if key in self.offsets:
+            raise KeyError(f"Cannot delete result column {key!r}")
+        del self.other[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.offsets
+        yield from self.other
+
+    def __len__(self) -> int:
+        return len(self.offsets) + len(self.other)
+
+    def copy(self):
+        store = ResultStore.__new__(ResultStore)
+        store.offsets = self.offsets
+        store.data = self.data.copy()
+        store.other = dict(self.other)
+        return store
+
+    def block(self, columns: Sequence[str]) -> np.ndarray:
+        """Rows of `columns`; a view when they are consecutive in `data`."""
+        rows = [self.offsets[column] for column in columns]
+        start = rows[0]
+        if rows == list(range(start, start + len(rows))):
+            return self.data[start:start + len(rows)]
+        return self.data[rows]
+
+    def frame(
+        self,
+        columns: Sequence[str],
+        names: Optional[Sequence[str]] = None,
+        floor: bool = False,
+        date: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """Frame of day, date and `columns` (renamed to `names`).
+
+        The float columns share memory with `data` whenever `columns` are
+        consecutive and `floor` is off. `date` overrides the stored dates.
+        """
+        block = self.block(columns)
+        if floor:
+            block = np.floor(block)
+        df = pd.DataFrame(block.T, columns=list(names or columns), copy=False)
+        df.insert(0, "day", pd.Series(self.other["day"], copy=False))
+        if date is None:
+            date = self.other.get("date")
+        if date is not None:
+            df.insert(1, "date", pd.Series(date, copy=False))
+        return df
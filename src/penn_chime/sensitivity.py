@@ -0,0 +1,267 @@
+"""Global sensitivity analysis of model inputs.
+
+Inputs are Parameters fields (or disposition fields, such as "icu.rate")
+varied uniformly within bounds; the output is one sweep metric, such as
+"peak_census_icu". When every input is one the ensemble varies (doubling
+time, contact rate reduction, market share, disposition rates and lengths
+of stay), the design is fitted and projected in batches as ensemble
+replicates (`run_batch`); otherwise each point is built as a `PennModel`
+through `sweep.run_points`. Either can be spread over worker processes.
+
+Sobol indices use a scrambled Sobol' sequence in the Saltelli design,
+with N * (k + 2) evaluations for k inputs, the Saltelli (2010) first-order
+and Jansen total-order estimators. Morris screening uses r random
+trajectories of k + 1 points each on a p-level grid.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from time import perf_counter
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import qmc
+
+from .ensemble import ENSEMBLE_KEYS, get_inputs, project_values
+from .parameters import Parameters
+from .penn_model import PennModel
+from .sweep import CENSUS_KEYS, METRICS, SweepResult, run_points
+
+
+logger = getLogger(__name__)
+
+# Design inputs that can be projected in batches, by their ensemble input
+BATCH_INPUTS = {
+    "doubling_time": "doubling_time",
+    "relative_contact_rate": "relative_contact_rate",
+    "market_share": "market_share",
+    **{
+        f"{key}.{field}": f"{key}_{field}"
+        for key in ENSEMBLE_KEYS
+        for field in ("rate", "days")
+    },
+}
+
+SobolResult = namedtuple("SobolResult", ("names", "first_order", "total_order", "n_evaluations", "seconds"))
+MorrisResult = namedtuple("MorrisResult", ("names", "mu", "mu_star", "sigma", "n_evaluations", "seconds"))
+
+
+def scale(unit: np.ndarray, bounds: Dict[str, Tuple[float, float]]) -> Dict[str, np.ndarray]:
+    """Map (point x input) samples in the unit hypercube onto `bounds`."""
+    return {
+        name: low + unit[:, index] * (high - low)
+        for index, (name, (low, high)) in enumerate(bounds.items())
+    }
+
+
+def saltelli_design(n_samples: int, n_inputs: int, seed: Optional[int] = None) -> np.ndarray:
+    """Stacked A, B and AB_i unit samples, (N * (k + 2)) x k.
+
+    `n_samples` is rounded up to a power of two to keep the Sobol' sequence
+    balanced.
+    """
+    m = int(np.ceil(np.log2(max(n_samples, 2))))
+    base = qmc.Sobol(2 * n_inputs, scramble=True, seed=seed).random_base2(m)
+    a, b = base[:, :n_inputs], base[:, n_inputs:]
+    ab = np.repeat(a[np.newaxis], n_inputs, axis=0)
+    for index in range(n_inputs):
+        ab[index, :, index] = b[:, index]
+    return np.concatenate([a, b, ab.reshape(-1, n_inputs)])
+
+
+def sobol_indices(values: np.ndarray, n_inputs: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First and total-order indices from outputs of a `saltelli_design`."""
+    values = values.reshape(n_inputs + 2, -1)
+    f_a, f_b, f_ab = values[0], values[1], values[2:]
+    variance = np.var(np.concatenate([f_a, f_b]))
+    first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    total_order = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    return first_order, total_order
+
+
+def morris_design(
+    n_trajectories: int,
+    n_inputs: int,
+    levels: int = 4,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stacked unit trajectories, (r * (k + 1)) x k.
+
+    Also returns, for each step of each trajectory (r x k), the input it
+    moves and its signed step.
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    points = np.empty((n_trajectories, n_inputs + 1, n_inputs))
+    order = np.empty((n_trajectories, n_inputs), dtype="int")
+    steps = np.empty((n_trajectories, n_inputs))
+    for trajectory in range(n_trajectories):
+        x = rng.choice(grid, n_inputs)
+        points[trajectory, 0] = x
+        order[trajectory] = rng.permutation(n_inputs)
+        for step, index in enumerate(order[trajectory]):
+            signed = delta if x[index] + delta <= 1.0 else -delta
+            x = x.copy()
+            x[index] += signed
+            steps[trajectory, step] = signed
+            points[trajectory, step + 1] = x
+    return points.reshape(-1, n_inputs), order, steps
+
+
+def morris_effects(values: np.ndarray, order: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """(trajectory x input) elementary effects from outputs of a `morris_design`."""
+    n_trajectories, n_inputs = order.shape
+    values = values.reshape(n_trajectories, n_inputs + 1)
+    effects = np.empty((n_trajectories, n_inputs))
+    rows = np.arange(n_trajectories)[:, np.newaxis]
+    effects[rows, order] = np.diff(values, axis=1) / steps
+    return effects
+
+
+def batch_peak_census(key: str) -> Callable:
+    def metric(day, counts) -> np.ndarray:
+        return counts["census_" + key].max(axis=1)
+    return metric
+
+
+def batch_peak_day(key: str) -> Callable:
+    def metric(day, counts) -> np.ndarray:
+        return day[counts["census_" + key].argmax(axis=1)]
+    return metric
+
+
+def batch_first_breach_day(key: str) -> Callable:
+    """As `sweep.first_breach_day`, for (point x day) `counts`."""
+    def metric(day, counts) -> np.ndarray:
+        breached = (counts["shortfall_" + key] > 0.0) & (day >= 0)
+        return np.where(breached.any(axis=1), day[breached.argmax(axis=1)], np.nan)
+    return metric
+
+
+BATCH_METRICS = {
+    **{"peak_census_" + key: batch_peak_census(key) for key in CENSUS_KEYS},
+    **{"peak_day_" + key: batch_peak_day(key) for key in CENSUS_KEYS},
+    **{"first_breach_day_" + key: batch_first_breach_day(key) for key in CENSUS_KEYS},
+}
+
+
+def can_batch(p: Parameters, names: Sequence[str]) -> bool:
+    """Whether points varying `names` of `p` can be projected by `run_batch`.
+
+    The ensemble keeps the model's doubling time, so it must not be fitted
+    to date_first_hospitalized, and fits i_day as the model does only
+    with a mitigation date or schedule. A contact rate schedule replaces
+    relative_contact_rate.
+    """
+    return (
+        set(names) <= set(BATCH_INPUTS)
+        and p.doubling_time is not None
+        and (p.mitigation_date is not None or p.contact_rate_schedule is not None)
+        and (p.contact_rate_schedule is None or "relative_contact_rate" not in names)
+    )
+
+
+def evaluate_batch(model: PennModel, grid: Dict[str, np.ndarray], metrics: Sequence[str]) -> np.ndarray:
+    """(metric x point) array of `metrics` for every point of `grid`, projected in one batch."""
+    n_points = len(next(iter(grid.values())))
+    values = {
+        key: np.full(n_points, value, dtype="float")
+        for key, value in get_inputs(model.p, {}).items()
+    }
+    for name, column in grid.items():
+        values[BATCH_INPUTS[name]] = np.asarray(column, dtype="float")
+    for key in ENSEMBLE_KEYS:
+        values[key + "_days"] = np.rint(values[key + "_days"]).astype("int")
+
+    counts = project_values(model, values, n_points)
+    day = np.arange(-model.i_day, model.p.n_days + 1)
+    return np.array([BATCH_METRICS[metric](day, counts) for metric in metrics])
+
+
+def run_batch(
+    p: Parameters,
+    grid: Dict[str, np.ndarray],
+    metrics: Sequence[str],
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+) -> SweepResult:
+    """As `sweep.run_points` for inputs that `can_batch`, projecting chunks of points at once.
+
+    Every point is fitted to the current census as its own `PennModel`
+    would be.
+    """
+    start = perf_counter()
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown sweep metrics: {sorted(unknown)}")
+    model = PennModel(p)
+    n_points = len(next(iter(grid.values())))
+    chunks = [
+        {name: column[offset:offset + chunk_size] for name, column in grid.items()}
+        for offset in range(0, n_points, chunk_size)
+    ]
+    args = ([model] * len(chunks), chunks, [metrics] * len(chunks))
+    if workers is None or workers <= 1:
+        values = np.concatenate(list(map(evaluate_batch, *args)), axis=1)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            values = np.concatenate(list(executor.map(evaluate_batch, *args)), axis=1)
+
+    result = SweepResult(grid, tuple(metrics), values, perf_counter() - start)
+    logger.info('Batched sweep of %s points in %.2fs', n_points, result.seconds)
+    return result
+
+
+def evaluate_design(
+    p: Parameters,
+    grid: Dict[str, np.ndarray],
+    metric: str,
+    workers: Optional[int] = None,
+) -> SweepResult:
+    """`metric` at every point of a design, in batches when its inputs allow."""
+    if can_batch(p, grid):
+        return run_batch(p, grid, [metric], workers=workers)
+    return run_points(p, grid, [metric], workers=workers)
+
+
+def sobol_analysis(
+    p: Parameters,
+    bounds: Dict[str, Tuple[float, float]],
+    metric: str = "peak_census_icu",
+    n_samples: int = 256,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> SobolResult:
+    """Sobol first and total-order indices of `metric` for each input in `bounds`."""
+    unit = saltelli_design(n_samples, len(bounds), seed)
+    sweep = evaluate_design(p, scale(unit, bounds), metric, workers)
+    first_order, total_order = sobol_indices(sweep.values[0], len(bounds))
+    return SobolResult(tuple(bounds), first_order, total_order, len(unit), sweep.seconds)
+
+
+def morris_analysis(
+    p: Parameters,
+    bounds: Dict[str, Tuple[float, float]],
+    metric: str = "peak_census_icu",
+    n_trajectories: int = 20,
+    levels: int = 4,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> MorrisResult:
+    """Morris mean, mean absolute and standard deviation of elementary effects.
+
+    Effects are per unit of each input's range in `bounds`.
+    """
+    unit, order, steps = morris_design(n_trajectories, len(bounds), levels, seed)
+    sweep = evaluate_design(p, scale(unit, bounds), metric, workers)
+    effects = morris_effects(sweep.values[0], order, steps)
+    return MorrisResult(
+        tuple(bounds),
+        effects.mean(axis=0),
+        np.abs(effects).mean(axis=0),
+        effects.std(axis=0, ddof=1),
+        len(unit),
+        sweep.seconds,
+    )
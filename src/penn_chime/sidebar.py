@@ -6,7 +6,8 @@ from .hc_param_import_export import (
     constants_from_uploaded_file
 )
 from .hc_actuals import parse_actuals
-from .parameters import ForecastMethod, ForecastedMetric, Mode, Parameters, Disposition
+from .contact_schedule import read_contact_rate_schedule
+from .parameters import FitMethod, ForecastMethod, ForecastedMetric, Mode, Parameters, Disposition
 from .constants import EPSILON
 
 
@@ -119,6 +120,12 @@ def display_sidebar(d: Parameters) -> Parameters:
             )
             first_hospitalized_date_known = True
             doubling_time = None
+            fit_method_options = [FitMethod.GRID, FitMethod.BRENT]
+            fit_method = st.sidebar.radio(
+                "Doubling time search",
+                fit_method_options,
+                index=fit_method_options.index(d.fit_method),
+            )
         else:
             doubling_time = st.sidebar.number_input(
                 "Doubling time in days (before social distancing)",
@@ -129,6 +136,7 @@ def display_sidebar(d: Parameters) -> Parameters:
             )
             first_hospitalized_date_known = False
             date_first_hospitalized = None
+            fit_method = d.fit_method
 
         mitigation_date = None
         relative_contact_rate = EPSILON
@@ -145,15 +153,18 @@ def display_sidebar(d: Parameters) -> Parameters:
                 value=d.relative_contact_rate * 100.,
                 step=1.0,
             ) / 100.
+        contact_rate_schedule = display_contact_rate_schedule_section(d)
     else:
         covid_census_value = d.covid_census_value
         covid_census_date = d.covid_census_date
         first_hospitalized_date_known = d.first_hospitalized_date_known
         date_first_hospitalized = d.date_first_hospitalized
         doubling_time = d.doubling_time
+        fit_method = d.fit_method
         social_distancing_is_implemented = d.social_distancing_is_implemented
         mitigation_date = d.mitigation_date
         relative_contact_rate = d.relative_contact_rate
+        contact_rate_schedule = d.contact_rate_schedule
 
 
     st.sidebar.markdown(
@@ -254,6 +265,7 @@ def display_sidebar(d: Parameters) -> Parameters:
         relative_contact_rate=relative_contact_rate,
         mitigation_date=mitigation_date,
         social_distancing_is_implemented=social_distancing_is_implemented,
+        contact_rate_schedule=contact_rate_schedule,
         ventilators=Disposition(ventilators_rate, ventilators_days),
         date_first_hospitalized=date_first_hospitalized,
         doubling_time=doubling_time,
@@ -268,6 +280,7 @@ def display_sidebar(d: Parameters) -> Parameters:
         app_mode=mode,
         forecast_method=forecast_method,
         forecasted_metric=forecasted_metric,
+        fit_method=fit_method,
     )
     if uploaded_file is not None:
         # Make sure that we set values that came in through a scenario file that
@@ -288,6 +301,21 @@ def display_sidebar(d: Parameters) -> Parameters:
     return parameters, actuals, mode
 
 
+def display_contact_rate_schedule_section(d: Parameters):
+    """A contact rate schedule from an uploaded CSV, else the scenario's schedule."""
+    uploaded_schedule = st.sidebar.file_uploader(
+        "Load Contact Rate Schedule (CSV with date and relative_contact_rate columns, replaces the two inputs above)",
+        type=['csv'],
+    )
+    if not uploaded_schedule:
+        return d.contact_rate_schedule
+    try:
+        return read_contact_rate_schedule(uploaded_schedule)
+    except ValueError as error:
+        st.sidebar.markdown(str(error))
+        return d.contact_rate_schedule
+
+
 def display_actuals_section():
     actuals = None
     # If you put this in a checkbox then 
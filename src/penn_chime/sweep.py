@@ -0,0 +1,181 @@
+"""Parameter sweeps.
+
+A sweep builds the grid of every combination of the given Parameters
+values (or takes any list of points), projects each point with `PennModel`
+in worker processes, and keeps only summary metrics per point. Metrics are
+stored columnar (metric x point), optionally in a `.npy` file opened as a
+memory map, so sweeps of 10^5 points need little memory.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from itertools import product
+from logging import getLogger
+from time import perf_counter
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .parameters import Parameters
+from .penn_model import PennModel
+
+
+logger = getLogger(__name__)
+
+CENSUS_KEYS = ("non_icu", "icu", "ventilators")
+
+# Days are counted from covid_census_date.
+SweepResult = namedtuple("SweepResult", ("grid", "metrics", "values", "seconds"))
+
+
+def peak_census(key: str) -> Callable:
+    def metric(model) -> float:
+        return model.raw["census_" + key].max()
+    return metric
+
+
+def peak_day(key: str) -> Callable:
+    def metric(model) -> float:
+        return model.raw["day"][model.raw["census_" + key].argmax()]
+    return metric
+
+
+def first_breach_day(key: str) -> Callable:
+    """First day, from today on, when the census exceeds capacity (NaN if never)."""
+    def metric(model) -> float:
+        beds = model.calculate_beds({k: model.raw["census_" + k] for k in CENSUS_KEYS}, model.p)
+        breached = (beds[key] < 0) & (model.raw["day"] >= 0)
+        if not breached.any():
+            return np.nan
+        return model.raw["day"][breached.argmax()]
+    return metric
+
+
+METRICS = {
+    **{"peak_census_" + key: peak_census(key) for key in CENSUS_KEYS},
+    **{"peak_day_" + key: peak_day(key) for key in CENSUS_KEYS},
+    **{"first_breach_day_" + key: first_breach_day(key) for key in CENSUS_KEYS},
+}
+
+DEFAULT_METRICS = tuple(METRICS)
+
+
+def build_grid(axes: Dict[str, Sequence]) -> Dict[str, np.ndarray]:
+    """Every combination of `axes` values, one flat array per Parameters field.
+
+    The last axis varies fastest.
+    """
+    names = list(axes)
+    points = list(product(*(axes[name] for name in names)))
+    return {
+        name: np.array([point[index] for point in points])
+        for index, name in enumerate(names)
+    }
+
+
+def set_parameter(p: Parameters, name: str, value):
+    """Set Parameters field `name`, or one field of a disposition such as "icu.rate"."""
+    if "." not in name:
+        setattr(p, name, value)
+        return
+    field, attribute = name.split(".")
+    old = getattr(p, field)
+    if isinstance(getattr(old, attribute), int):
+        value = int(round(value))
+    new = old._replace(**{attribute: value})
+    setattr(p, field, new)
+    p.dispositions = {
+        key: new if disposition is old else disposition
+        for key, disposition in p.dispositions.items()
+    }
+
+
+def evaluate_points(
+    p: Parameters,
+    grid: Dict[str, np.ndarray],
+    metrics: Sequence[str],
+) -> np.ndarray:
+    """(metric x point) array of `metrics` for every point of `grid`."""
+    n_points = len(next(iter(grid.values())))
+    values = np.empty((len(metrics), n_points))
+    for index in range(n_points):
+        point = copy.copy(p)
+        for name, column in grid.items():
+            set_parameter(point, name, column[index].item())
+        model = PennModel(point)
+        for row, metric in enumerate(metrics):
+            values[row, index] = METRICS[metric](model)
+    return values
+
+
+def run_sweep(
+    p: Parameters,
+    axes: Dict[str, Sequence],
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    path: Optional[str] = None,
+    chunk_size: int = 256,
+    workers: Optional[int] = None,
+) -> SweepResult:
+    """Summary `metrics` of `p` with every combination of the `axes` values.
+
+    See `run_points` for the remaining arguments.
+    """
+    return run_points(p, build_grid(axes), metrics, path, chunk_size, workers)
+
+
+def run_points(
+    p: Parameters,
+    grid: Dict[str, np.ndarray],
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    path: Optional[str] = None,
+    chunk_size: int = 256,
+    workers: Optional[int] = None,
+) -> SweepResult:
+    """Summary `metrics` of `p` with the values of every point of `grid`.
+
+    `grid` holds one equally long array per Parameters field (or
+    disposition field, such as "icu.rate"). Points are evaluated in chunks
+    of `chunk_size`, by `workers` processes (default: in this process).
+    With `path`, values are written to that `.npy` file through a memory
+    map instead of held in memory.
+    """
+    start = perf_counter()
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown sweep metrics: {sorted(unknown)}")
+    n_points = len(next(iter(grid.values())))
+    shape = (len(metrics), n_points)
+    if path is None:
+        values = np.empty(shape)
+    else:
+        values = np.lib.format.open_memmap(path, mode="w+", dtype="float", shape=shape)
+
+    offsets = range(0, n_points, chunk_size)
+    chunks = [
+        {name: column[offset:offset + chunk_size] for name, column in grid.items()}
+        for offset in offsets
+    ]
+    args = ([p] * len(chunks), chunks, [metrics] * len(chunks))
+    if workers is None or workers <= 1:
+        for offset, chunk_values in zip(offsets, map(evaluate_points, *args)):
+            values[:, offset:offset + chunk_size] = chunk_values
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for offset, chunk_values in zip(offsets, executor.map(evaluate_points, *args)):
+                values[:, offset:offset + chunk_size] = chunk_values
+    if path is not None:
+        values.flush()
+
+    result = SweepResult(grid, tuple(metrics), values, perf_counter() - start)
+    logger.info('Sweep of %s points in %.2fs', n_points, result.seconds)
+    return result
+
+
+def sweep_frame(result: SweepResult) -> pd.DataFrame:
+    """One row per point: the swept fields followed by the metrics."""
+    return pd.DataFrame({
+        **result.grid,
+        **dict(zip(result.metrics, result.values)),
+    })
@@ -1,6 +1,6 @@
 """the callable validator design pattern"""
 
-from .validators import Bounded, OptionalBounded, Rate, Date, OptionalDate
+from .validators import Bounded, OptionalBounded, Rate, Date, OptionalDate, OptionalDistributions, OptionalSchedule
 
 EPSILON = 1.e-7
 
@@ -10,5 +10,7 @@ Positive = Bounded(lower_bound=-EPSILON)
 Rate = Rate()  # type: ignore
 Date = Date()  # type: ignore
 OptionalDate = OptionalDate()  # type: ignore
+OptionalDistributions = OptionalDistributions()  # type: ignore
+OptionalSchedule = OptionalSchedule()  # type: ignore
 # # rolling a custom validator for doubling time in case DS wants to add upper bound
 # DoublingTime = OptionalBounded(lower_bound=0-EPSILON, upper_bound=None)
@@ -67,3 +67,32 @@ class OptionalDate(Date):
         if value is None:
             return None
         super().validate(value)
+
+class OptionalDistributions(Validator):
+    """None or a dict of probability vectors (non-negative, positive sum)."""
+    def __init__(self) -> None:
+        pass
+
+    def validate(self, value):
+        if value is None:
+            return None
+        for key, pmf in value.items():
+            if len(pmf) == 0 or min(pmf) < 0 or sum(pmf) <= 0:
+                raise ValueError(f"{key} needs to be a list of non-negative probabilities with a positive sum.")
+
+class OptionalSchedule(Validator):
+    """None or a list of (date, rate) changes with increasing dates and rates in (0,1)."""
+    def __init__(self) -> None:
+        pass
+
+    def validate(self, value):
+        if value is None:
+            return None
+        if len(value) == 0:
+            raise ValueError("A contact rate schedule needs at least one change.")
+        dates = [date for date, _ in value]
+        if any(later <= earlier for earlier, later in zip(dates, dates[1:])):
+            raise ValueError(f"{dates} need to be increasing dates.")
+        for _, rate in value:
+            if rate < 0 or rate > 1:
+                raise ValueError(f"{rate} needs to be a rate (i.e. in (0,1)).")
@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+from src.penn_chime.parameters import Parameters, Disposition
+from src.penn_chime.penn_model import PennModel
+
+
+@pytest.fixture
+def penn_param():
+    return Parameters(
+        population=3600000,
+        covid_census_value=69,
+        covid_census_date=date(2020, 4, 20),
+        current_date=date(2020, 4, 20),
+        mitigation_date=date(2020, 3, 23),
+        total_covid_beds=300,
+        icu_covid_beds=30,
+        covid_ventilators=10,
+        doubling_time=5.0,
+        non_icu=Disposition(0.025, 7),
+        icu=Disposition(0.0075, 9),
+        non_icu_after_icu=Disposition(0.0, 4),
+        ventilators=Disposition(0.005, 10),
+        infectious_days=10,
+        market_share=0.15,
+        n_days=30,
+        relative_contact_rate=0.45,
+    )
+
+
+@pytest.fixture
+def penn_model(penn_param):
+    return PennModel(penn_param)
@@ -0,0 +1,56 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.penn_chime.calibration import Calibration, calibrate
+from src.penn_chime.contact_schedule import ContactRateChange
+from src.penn_chime.penn_model import PennModel
+
+
+def synthetic_actuals(model, truth, days=21):
+    """Actuals for the last `days` days, projected from the vector `truth`."""
+    calibration = Calibration(model, pd.DataFrame({"date": [pd.Timestamp(model.p.covid_census_date)], "total_census_actual": [1.0]}))
+    raw = calibration.project(np.array(truth))
+    rows = slice(model.i_day - days + 1, model.i_day + 1)
+    return pd.DataFrame({
+        "date": pd.date_range(end=model.p.covid_census_date, periods=days),
+        "total_census_actual": (raw["census_non_icu"][0] + raw["census_icu"][0])[rows],
+        "total_admissions_actual": (raw["admits_non_icu"][0] + raw["admits_icu"][0])[rows],
+    })
+
+
+def test_calibrate_recovers_parameters(penn_param):
+    model = PennModel(penn_param)
+    actuals = synthetic_actuals(model, [4.2, 0.6, 0.03])
+
+    result = calibrate(penn_param, actuals, model=model)
+
+    assert result.success
+    assert result.names == ("doubling_time", "contact_rate_0", "non_icu.rate")
+    assert np.allclose(result.values, [4.2, 0.6, 0.03], rtol=1e-4)
+    assert result.rmse["total_census_actual"] < 1e-3
+    assert result.projections < 25 * result.evaluations
+    assert result.parameters.relative_contact_rate == pytest.approx(0.6, rel=1e-4)
+    assert result.parameters.dispositions["total"].rate == pytest.approx(0.03, rel=1e-4)
+    assert list(result.fit_df.dropna().date) == list(actuals.date)
+
+
+def test_calibrate_contact_rate_schedule(penn_param):
+    penn_param.contact_rate_schedule = [
+        ContactRateChange(date(2020, 3, 16), 0.2),
+        ContactRateChange(date(2020, 3, 30), 0.45),
+    ]
+    model = PennModel(penn_param)
+    actuals = synthetic_actuals(model, [4.5, 0.3, 0.5, 0.025], days=42)
+
+    result = calibrate(penn_param, actuals, model=model)
+
+    assert np.allclose(result.values, [4.5, 0.3, 0.5, 0.025], rtol=1e-3)
+    assert [change.relative_contact_rate for change in result.parameters.contact_rate_schedule] == pytest.approx([0.3, 0.5], rel=1e-3)
+
+
+def test_calibrate_needs_actuals_columns(penn_param):
+    with pytest.raises(ValueError):
+        calibrate(penn_param, pd.DataFrame({"date": [pd.Timestamp("2020-04-20")], "daily_regional_infections": [10]}))
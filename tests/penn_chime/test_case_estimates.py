@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.penn_chime.case_estimates import case_estimates, preprocess_cases
+from src.penn_chime.empirical_sir import add_empirical_sir
+
+
+def county_cases(n_days=80, seed=0):
+    rng = np.random.default_rng(seed)
+    day = np.arange(n_days)
+    daily = rng.poisson(5.0 * np.exp(0.08 * day) / (1.0 + np.exp(0.08 * (day - 50))))
+    return pd.DataFrame({
+        "date": pd.date_range("2020-03-10", periods=n_days),
+        "cumCases": np.cumsum(daily) + 3,
+        "pop": 1000000,
+        "cases": daily,
+        "rgn": "PA:Philadelphia",
+    })
+
+
+def test_preprocess_cases():
+    data = pd.DataFrame({
+        "date": pd.to_datetime(["2020-03-01", "2020-03-02", "2020-03-04", "2020-03-05"]),
+        "cumCases": [2, 5, 4, 9],
+        "pop": 100,
+        "cases": 0,
+    })
+    result = preprocess_cases(data)
+
+    assert list(result.columns) == list(data.columns)
+    assert result.date.tolist() == list(pd.date_range("2020-03-01", "2020-03-05"))
+    # The day with negative cases is dropped, then filled with no cases
+    assert result.cases.tolist() == [2, 3, 0, 0, 5]
+    assert result.cumCases.tolist() == [2, 5, 5, 5, 10]
+    assert (result["pop"] == 100).all()
+
+
+def test_case_estimates():
+    data = county_cases()
+    result = case_estimates(data.drop(index=[10, 11]), n_days=30)
+
+    assert result.date.tolist() == list(pd.date_range("2020-03-10", periods=110))
+    assert (result.rgn == "PA:Philadelphia").all()
+    assert result.cases.iloc[:80].notna().all() and result.cases.iloc[80:].isna().all()
+    for metric in ("Rt", "dbT"):
+        assert result[metric].notna().any()
+        for method in ("lin", "spln", "ets", "loess"):
+            assert result[f"{metric}_prd_{method}"].iloc[80:].notna().all()
+    assert "mthd" not in result.columns
+
+    projection = add_empirical_sir(result, 1000000, 10, "Rt", "ets")
+    assert projection.n.iloc[80:].notna().all()
+
+
+def test_case_estimates_reports_failures():
+    with pytest.raises(ValueError, match="R\\(t\\) couldn't be calculated"):
+        case_estimates(county_cases().iloc[:4], n_days=30)
@@ -0,0 +1,48 @@
+from datetime import date
+import io
+
+import numpy as np
+import pytest
+
+from src.penn_chime.contact_schedule import (
+    ContactRateChange,
+    contact_rates,
+    read_contact_rate_schedule,
+    schedule_days,
+)
+
+
+def test_read_contact_rate_schedule():
+    file = io.StringIO(
+        "date,relative_contact_rate,mobility\n"
+        "2020-03-18,0.3,0.7\n"
+        "2020-03-16,0.2,0.8\n"
+        "2020-03-17,0.2,0.8\n"
+        "2020-03-19,0.3,0.7\n"
+        "2020-03-20,0.45,0.55\n"
+    )
+
+    assert read_contact_rate_schedule(file) == [
+        ContactRateChange(date(2020, 3, 16), 0.2),
+        ContactRateChange(date(2020, 3, 18), 0.3),
+        ContactRateChange(date(2020, 3, 20), 0.45),
+    ]
+
+
+@pytest.mark.parametrize("csv", [
+    "date,rate\n2020-03-16,0.2\n",
+    "date,relative_contact_rate\n2020-03-16,1.2\n",
+    "date,relative_contact_rate\n2020-03-16,0.2\n2020-03-16,0.3\n",
+])
+def test_read_contact_rate_schedule_rejects(csv):
+    with pytest.raises(ValueError):
+        read_contact_rate_schedule(io.StringIO(csv))
+
+
+def test_contact_rates():
+    schedule = [ContactRateChange(date(2020, 3, 16), 0.2), ContactRateChange(date(2020, 3, 23), 0.45)]
+    change_days, rates = schedule_days(schedule, date(2020, 3, 20))
+
+    assert list(change_days) == [-4, 3]
+    days = np.array([[-5, -4, 2], [3, 4, 50]])
+    assert np.array_equal(contact_rates(days, change_days, rates), [[0.0, 0.2, 0.2], [0.45, 0.45, 0.45]])
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.penn_chime.empirical_sir import (
+    add_empirical_sir,
+    empirical_sir,
+    growth_betas,
+    sir_label,
+)
+
+
+POPULATION = 1000000
+INFECTIOUS_DAYS = 10
+
+
+def loop_sir(cases, growth, population, infectious_days, metric, use_actuals):
+    """Row-by-row `.fncSIR`, with R's 1-based indices."""
+    cases = [np.nan] + list(cases)
+    if all(np.isnan(cases[1:])):
+        cases[1] = 1.0
+    cum = [np.nan] + list(np.cumsum(cases[1:]))
+    g = 1.0 / infectious_days
+    n_rows = len(cases) - 1
+    s, i, r, t, n, rst = ([np.nan] * (n_rows + 1) for _ in range(6))
+    s[1], i[1], r[1], t[1], n[1] = population - cum[1], cases[1], 0.0, 1.0, cases[1]
+    rst = [0] * (n_rows + 1)
+    b = [np.nan] + list(growth_betas(growth, metric, g, s[1]))
+    for k in range(2, n_rows + 1):
+        p = k - 1
+        s[k] = -b[k] * s[p] * i[p] + s[p]
+        i[k] = ((b[k] * s[p] * i[p]) - (g * i[p])) + i[p]
+        r[k] = (g * i[p]) + r[p]
+        if use_actuals and not np.isnan(cases[k]):
+            i[k] = sum(cases[max(k - min(k, infectious_days - 1), 1):k + 1])
+            r[k] = cum[k - infectious_days] if k > infectious_days else 0.0
+            s[k] = population - (i[k] + r[k])
+            rst[k] = 1
+        t[k] = i[k] + r[k]
+        n[k] = t[k] - t[k - 1]
+    return {"b": b[1:], "s": s[1:], "i": i[1:], "r": r[1:], "n": n[1:], "rst": rst[1:]}
+
+
+def sample(n_actual=40, n_forecast=30, seed=0):
+    rng = np.random.default_rng(seed)
+    cases = np.concatenate([rng.poisson(np.linspace(5, 80, n_actual)), np.full(n_forecast, np.nan)])
+    doubling_time = np.linspace(3.0, 12.0, n_actual + n_forecast)
+    return cases.astype("float"), doubling_time
+
+
+@pytest.mark.parametrize("metric", ["dbT", "Rt"])
+@pytest.mark.parametrize("use_actuals", [True, False])
+def test_empirical_sir_matches_loop(metric, use_actuals):
+    cases, growth = sample()
+    if metric == "Rt":
+        growth = 3.0 / growth
+    expected = loop_sir(cases, growth, POPULATION, INFECTIOUS_DAYS, metric, use_actuals)
+    result = empirical_sir(cases, growth, POPULATION, INFECTIOUS_DAYS, metric, use_actuals)
+    for key, values in expected.items():
+        np.testing.assert_allclose(result[key], values, rtol=1e-12, err_msg=key)
+
+
+def test_empirical_sir_resets_to_actuals():
+    cases, growth = sample()
+    result = empirical_sir(cases, growth, POPULATION, INFECTIOUS_DAYS)
+
+    assert result["rst"][0] == 0
+    assert (result["rst"][1:40] == 1).all()
+    assert (result["rst"][40:] == 0).all()
+    assert result["i"][25] == cases[16:26].sum()
+    assert result["r"][25] == cases[:16].sum()
+    assert result["s"][25] == POPULATION - cases[:26].sum()
+
+
+def test_empirical_sir_without_cases():
+    """The fabricated Penn replication of jason_model.R: doubling time and R(t) agree."""
+    cases = np.full(100, np.nan)
+    by_doubling_time = empirical_sir(cases, np.full(100, 2.862244897959184), POPULATION, INFECTIOUS_DAYS, "dbT")
+    by_rt = empirical_sir(cases, np.full(100, 3.740096), POPULATION, INFECTIOUS_DAYS, "Rt")
+
+    assert (by_doubling_time["rst"] == 0).all()
+    assert by_doubling_time["i"][0] == 1.0
+    np.testing.assert_allclose(by_doubling_time["i"], by_rt["i"], rtol=1e-4)
+
+
+def test_add_empirical_sir():
+    cases, growth = sample()
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-03-01", periods=len(cases)),
+        "cases": cases,
+        "dbT": np.where(np.isnan(cases), np.nan, growth),
+        "dbT_prd_ets": growth,
+        "dbT_prd_lin": growth * 2.0,
+        "n": 0.0,
+    }).iloc[::-1]
+
+    result = add_empirical_sir(df, POPULATION, INFECTIOUS_DAYS, "dbT", "ets")
+    expected = empirical_sir(cases, growth, POPULATION, INFECTIOUS_DAYS)
+
+    assert (result.date.diff().dropna() > pd.Timedelta(0)).all()
+    np.testing.assert_allclose(result.n, expected["n"])
+    assert (result.mSIR == "Doubling Time, ETS, Actual Reset").all()
+    assert not np.allclose(add_empirical_sir(df, POPULATION, INFECTIOUS_DAYS, "dbT", "lin").n, result.n)
+    with pytest.raises(ValueError):
+        add_empirical_sir(df, POPULATION, INFECTIOUS_DAYS, "Rt", "ets")
+
+
+def test_sir_label():
+    assert sir_label("Rt", "spln", False) == "Reproduction Number, Log-Spline, Theoretic"
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from src.penn_chime.contact_schedule import ContactRateChange
+from src.penn_chime.ensemble import run_ensemble
+from src.penn_chime.penn_model import PennModel
+
+
+def test_point_estimates_reproduce_model(penn_param):
+    model = PennModel(penn_param)
+    result = run_ensemble(penn_param, {}, n_replicates=10, chunk_size=4, model=model)
+
+    census = result.bands["census_icu"]
+    assert census.date.equals(model.census_df.date)
+    assert np.allclose(census.p5, model.census_df.icu, rtol=1e-6)
+    assert np.allclose(census.p95, model.census_df.icu, rtol=1e-6)
+    shortfall = result.bands["shortfall_icu"]
+    assert np.allclose(shortfall.p50, np.maximum(-model.beds_df.icu, 0.0), rtol=1e-6, atol=1e-3)
+
+
+def test_point_estimates_reproduce_resurgent_model(penn_param):
+    # The census falls today but rises past its first peak later on
+    penn_param.n_days = 60
+    penn_param.relative_contact_rate = 0.59
+    penn_param.market_share = 0.12
+    model = PennModel(penn_param)
+    result = run_ensemble(penn_param, {}, n_replicates=2, model=model)
+
+    assert np.allclose(result.bands["census_non_icu"].p50, model.census_df.non_icu, rtol=1e-6)
+
+
+def test_ensemble_is_seeded(penn_param):
+    distributions = {
+        "doubling_time": stats.uniform(3.0, 3.0),
+        "relative_contact_rate": stats.beta(6, 10),
+        "icu_days": stats.norm(9.0, 2.0),
+    }
+    model = PennModel(penn_param)
+    first = run_ensemble(penn_param, distributions, n_replicates=300, chunk_size=100, seed=7, model=model)
+    again = run_ensemble(penn_param, distributions, n_replicates=300, chunk_size=100, seed=7, model=model)
+    other = run_ensemble(penn_param, distributions, n_replicates=300, chunk_size=100, seed=8, model=model)
+
+    assert first.bands["census_icu"].equals(again.bands["census_icu"])
+    assert not first.bands["census_icu"].equals(other.bands["census_icu"])
+    band = first.bands["census_icu"]
+    assert (band.p5 <= band.p50).all() and (band.p50 <= band.p95).all()
+    assert (band.p95 > band.p5).any()
+
+
+def test_unknown_ensemble_input(penn_param):
+    with pytest.raises(ValueError):
+        run_ensemble(penn_param, {"gamma": 0.1}, n_replicates=1)
+
+
+def test_ensemble_draws_are_bounded(penn_param):
+    model = PennModel(penn_param)
+    clipped = run_ensemble(penn_param, {"market_share": 1.5, "icu_rate": -0.1}, n_replicates=4, model=model)
+    bounds = run_ensemble(penn_param, {"market_share": 1.0, "icu_rate": 0.0}, n_replicates=4, model=model)
+
+    assert clipped.bands["census_non_icu"].equals(bounds.bands["census_non_icu"])
+    assert (clipped.bands["census_icu"].p95 == 0.0).all()
+    with pytest.raises(ValueError):
+        run_ensemble(penn_param, {"doubling_time": stats.norm(2.0, 3.0)}, n_replicates=100, model=model)
+
+
+def test_replicates_match_current_census(penn_param):
+    penn_param.n_days = 60
+    distributions = {
+        "doubling_time": stats.uniform(3.0, 4.0),
+        "relative_contact_rate": stats.beta(6, 10),
+        "market_share": stats.uniform(0.1, 0.2),
+        "non_icu_rate": stats.uniform(0.02, 0.04),
+    }
+    result = run_ensemble(penn_param, distributions, n_replicates=200, seed=3, model=PennModel(penn_param))
+
+    today = result.bands["census_non_icu"].query("day == 0").iloc[0]
+    assert today.p5 <= penn_param.covid_census_value <= today.p95
+    assert today.p95 - today.p5 < 0.5 * penn_param.covid_census_value
+
+
+def test_contact_rate_schedule_is_not_sampled(penn_param):
+    penn_param.contact_rate_schedule = [ContactRateChange(penn_param.covid_census_date, 0.5)]
+    with pytest.raises(ValueError):
+        run_ensemble(penn_param, {"relative_contact_rate": stats.beta(6, 10)}, n_replicates=1)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.interpolate import CubicSpline
+
+from src.penn_chime.forecasting import (
+    add_forecasts,
+    clamp_forecast,
+    ets_forecast,
+    loess_forecast,
+    natural_spline_basis,
+    natural_spline_fit,
+)
+
+
+def test_natural_spline_fit_interpolates_like_a_natural_spline():
+    x = np.arange(8, dtype="float")
+    y = np.sin(x)
+    inside = np.linspace(0.0, 7.0, 50)
+    np.testing.assert_allclose(natural_spline_fit(x, y, inside, 7), CubicSpline(x, y, bc_type="natural")(inside), atol=1e-9)
+
+
+def test_natural_spline_basis_is_linear_outside_its_knots():
+    knots = np.array([1.0, 2.5, 4.0, 6.0])
+    outside = np.array([6.0, 7.0, 8.0, 9.0])
+    basis = natural_spline_basis(outside, knots)
+    np.testing.assert_allclose(np.diff(basis, n=2, axis=0), 0.0, atol=1e-9)
+
+
+def test_loess_forecast_matches_local_fits():
+    rng = np.random.default_rng(0)
+    x = np.arange(1.0, 31.0)
+    y = np.log(x) + 0.1 * rng.standard_normal(len(x))
+    new_x = np.arange(1.0, 41.0)
+    result = loess_forecast(x, y, new_x)
+
+    for x0, value in zip(new_x, result):
+        distance = np.abs(x - x0)
+        weights = (1.0 - (distance / (2.0 * distance.max())) ** 3) ** 3
+        expected = np.polyval(np.polyfit(x - x0, y, 2, w=np.sqrt(weights)), 0.0)
+        assert value == pytest.approx(expected, rel=1e-8)
+
+
+def test_ets_forecast_of_a_damped_trend():
+    y = 5.0 + 2.0 * np.arange(30)
+    fitted, forecast = ets_forecast(y, 10)
+
+    assert len(fitted) == 30 and len(forecast) == 10
+    np.testing.assert_allclose(fitted[5:], y[5:], rtol=0.05)
+    steps = np.diff(np.concatenate([[y[-1]], forecast]))
+    assert (steps > 0).all() and (np.diff(steps) <= 1e-9).all()
+    assert forecast[-1] < y[-1] + 2.0 * 10
+
+
+def test_clamp_forecast():
+    x = np.arange(20.0)
+    rising = 1.0 + 0.5 * x
+    capped = clamp_forecast(x, rising, 6.0, upper=True)
+    assert (capped <= 6.0).all()
+    assert (capped[-5:] == 6.0).all()
+    np.testing.assert_array_equal(clamp_forecast(x, rising, 20.0, upper=True), rising)
+
+    falling = 3.0 - 0.2 * x
+    floored = clamp_forecast(x, falling, 0.5, upper=False)
+    assert (floored >= 0.5).all()
+    assert floored[-1] == 0.5
+
+
+def test_add_forecasts():
+    n_days = 40
+    data = pd.DataFrame({
+        "rgn": "region",
+        "date": pd.date_range("2020-03-01", periods=n_days),
+        "cumCases": np.arange(n_days) * 5.0,
+        "dbT": np.linspace(2.0, 8.0, n_days),
+    })
+    result = add_forecasts(data, "dbT", horizon=30)
+
+    columns = ["dbT_prd_lin", "dbT_prd_spln", "dbT_prd_ets", "dbT_prd_loess"]
+    assert list(result.columns) == list(data.columns) + columns
+    assert len(result) == n_days + 30
+    assert (result.rgn == "region").all()
+    assert result.dbT.iloc[n_days:].isna().all()
+    assert not result[columns].isna().any().any()
+    # Fitted only from the day with 20 cumulative cases; linear data is extended linearly
+    np.testing.assert_allclose(result.dbT_prd_lin, np.linspace(2.0, 8.0, n_days)[0] + np.arange(70) * 6.0 / 39.0)
+    assert (result[columns].iloc[n_days - 1:] <= 16.0 + 1e-9).all().all()
+    assert (result[columns].iloc[n_days - 1:] >= 0.5 - 1e-9).all().all()
+
+    through_date = add_forecasts(data, "dbT", horizon=pd.Timestamp("2020-04-19"))
+    assert through_date.date.max() == pd.Timestamp("2020-04-19")
+
+    with pytest.raises(ValueError):
+        add_forecasts(data.assign(cumCases=1.0), "dbT")
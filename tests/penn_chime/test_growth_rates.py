@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import gamma
+
+from src.penn_chime.growth_rates import (
+    add_doubling_time,
+    add_rt,
+    cori_rt,
+    discrete_serial_interval,
+    dynamic_doubling_time,
+    impute_doubling_times,
+)
+
+
+def loop_rt(incidence, mean_si=7.5, std_si=3.4):
+    """`estimate_R(method="parametric_si")` with its default weekly windows, day by day."""
+    n_days = len(incidence)
+    weights = discrete_serial_interval(np.arange(n_days), mean_si, std_si)
+    lam = [np.nan] + [sum(weights[k] * incidence[t - k] for k in range(t + 1)) for t in range(1, n_days)]
+    result = np.full((3, n_days), np.nan)
+    for start in range(1, n_days - 6):
+        end = start + 6
+        shape = 1.0 + sum(incidence[start:end + 1])
+        scale = 1.0 / (1.0 / 5.0 + sum(lam[start:end + 1]))
+        result[:, start] = gamma.ppf([0.5, 0.025, 0.975], shape, scale=scale)
+    return result
+
+
+def test_discrete_serial_interval():
+    k = np.arange(200)
+    weights = discrete_serial_interval(k, 7.5, 3.4)
+
+    assert weights[0] == 0.0
+    assert weights.sum() == pytest.approx(1.0)
+    assert (weights * k).sum() == pytest.approx(7.5)
+
+
+def test_cori_rt_matches_loop():
+    rng = np.random.default_rng(0)
+    incidence = rng.poisson(np.linspace(3, 60, 45)).astype("float")
+    rt = cori_rt(incidence)
+    expected = loop_rt(incidence)
+    for index, column in enumerate(("Rt", "RtLCL", "RtUCL")):
+        np.testing.assert_allclose(rt[column][0], expected[index], rtol=1e-10)
+    assert np.isnan(rt["Rt"][0, 0]) and np.isnan(rt["Rt"][0, -6:]).all()
+
+
+def test_cori_rt_of_steady_growth():
+    """With many cases R approaches the Euler-Lotka value of the growth rate."""
+    growth_rate = 0.05
+    k = np.arange(120)
+    incidence = 1000.0 * np.exp(growth_rate * k)
+    rt = cori_rt(incidence)["Rt"][0]
+    weights = discrete_serial_interval(k, 7.5, 3.4)
+    expected = 1.0 / (weights * np.exp(-growth_rate * k)).sum()
+    assert rt[80] == pytest.approx(expected, rel=1e-3)
+
+
+def test_cori_rt_batch_matches_single_regions():
+    rng = np.random.default_rng(1)
+    first = rng.poisson(20.0, 40).astype("float")
+    second = rng.poisson(50.0, 30).astype("float")
+    incidence = np.zeros((2, 40))
+    incidence[0] = first
+    incidence[1, :30] = second
+    batch = cori_rt(incidence, lengths=[40, 30])
+
+    np.testing.assert_allclose(batch["Rt"][0], cori_rt(first)["Rt"][0])
+    np.testing.assert_allclose(batch["Rt"][1, :30], cori_rt(second)["Rt"][0])
+    assert np.isnan(batch["Rt"][1, 30:]).all()
+
+
+def test_add_rt_by_region():
+    rng = np.random.default_rng(2)
+    frames = []
+    for name, n_days, leading_zeros in (("a", 40, 5), ("b", 25, 0)):
+        cases = rng.poisson(30.0, n_days).astype("float")
+        cases[:leading_zeros] = 0.0
+        frames.append(pd.DataFrame({
+            "rgn": name,
+            "date": pd.date_range("2020-03-01", periods=n_days),
+            "cases": cases,
+        }))
+    data = pd.concat(frames, ignore_index=True)
+    data.loc[len(data)] = ["b", pd.Timestamp("2020-03-26"), np.nan]
+
+    result = add_rt(data, region="rgn")
+
+    assert list(result.columns) == ["rgn", "date", "cases", "Rt", "RtLCL", "RtUCL"]
+    assert len(result) == len(data)
+    a = result[result.rgn == "a"]
+    expected = loop_rt(a.cases.to_numpy()[5:])[0]
+    np.testing.assert_allclose(a.Rt.to_numpy()[5:], expected)
+    assert a.Rt.iloc[:6].isna().all()
+    assert result.Rt.iloc[-1:].isna().all()
+    b = result[result.rgn == "b"].dropna(subset=["cases"])
+    np.testing.assert_allclose(b.Rt.to_numpy(), loop_rt(b.cases.to_numpy())[0])
+
+
+def easylinear(x, log_y, h=5, quota=0.95):
+    """`fit_easylinear` with a regression per window; None when it would fail."""
+    n = len(x)
+    windows = []
+    for start in range(n - h):
+        if log_y[start] != log_y[start + h - 1]:
+            windows.append((start, np.polyfit(x[start:start + h], log_y[start:start + h], 1)[0]))
+    if len(windows) < 2:
+        return None
+    best = max(slope for _, slope in windows)
+    candidates = [start for start, slope in windows if slope >= quota * best]
+    return min(candidates), max(candidates) + h
+
+
+def loop_doubling_time(cumulative):
+    """The segment loop of `.fncDynDblTim`, before clamping, with a regression per fit."""
+    n = len(cumulative)
+    x = np.arange(n, dtype="float")
+    log_y = np.log(cumulative)
+    growth_rate = np.full(n, np.nan)
+    segment = np.zeros(n, dtype="int")
+    while np.isnan(growth_rate).sum() >= 2:
+        runs, start = [], None
+        for day in range(n + 1):
+            if day < n and np.isnan(growth_rate[day]):
+                start = day if start is None else start
+            elif start is not None:
+                runs.append((start, day))
+                start = None
+        start, stop = max(reversed(runs), key=lambda run: run[1] - run[0])
+        if stop - start < 2:
+            break
+        span = easylinear(x[start:stop], log_y[start:stop])
+        first, last = (start + span[0], start + span[1]) if span else (start, stop)
+        growth_rate[first:last] = np.polyfit(x[first:last], log_y[first:last], 1)[0]
+        segment[first:last] = segment.max() + 1
+    return segment, growth_rate
+
+
+def cumulative_cases(seed=3):
+    rng = np.random.default_rng(seed)
+    growth_rate = np.concatenate([np.full(15, 0.25), np.full(20, 0.1), np.full(25, 0.03)])
+    expected = 10.0 * np.exp(np.cumsum(growth_rate))
+    return np.maximum.accumulate(np.round(expected * np.exp(0.05 * rng.standard_normal(len(expected)))))
+
+
+def test_dynamic_doubling_time_matches_loop():
+    cumulative = cumulative_cases()
+    dates = pd.date_range("2020-03-01", periods=len(cumulative))
+    result = dynamic_doubling_time(dates, cumulative)
+    segment, growth_rate = loop_doubling_time(cumulative)
+
+    np.testing.assert_array_equal(result["seg"], segment)
+    np.testing.assert_allclose(result["gRt"], growth_rate, rtol=1e-9)
+    assert set(result["mthd"]) <= {"auto", "lm", "fixed", "fixOutlier", "impute"}
+    assert not np.isnan(result["dbT"]).any()
+    assert (result["dbT"] >= 1.0).all()
+
+    # Intercepts are against days since 1970, as R dates
+    fitted = ~np.isnan(result["gRt"])
+    epoch_days = (dates - pd.Timestamp("1970-01-01")).days.to_numpy()
+    np.testing.assert_allclose(
+        (result["b0"] + result["gRt"] * epoch_days)[fitted],
+        np.log(cumulative)[fitted],
+        atol=0.3,
+    )
+
+
+def test_dynamic_doubling_time_with_plateaus_matches_loop():
+    rng = np.random.default_rng(5)
+    daily = rng.poisson(12.0, 150) * (rng.uniform(size=150) > 0.4)
+    daily[40:55] = 0
+    cumulative = np.cumsum(daily) + 1.0
+    result = dynamic_doubling_time(pd.date_range("2020-03-01", periods=150), cumulative)
+    segment, growth_rate = loop_doubling_time(cumulative)
+
+    np.testing.assert_array_equal(result["seg"], segment)
+    # Flat segments have a slope of 0, up to rounding in the loop's fits
+    np.testing.assert_allclose(result["gRt"], growth_rate, rtol=1e-9, atol=1e-12)
+
+
+def test_dynamic_doubling_time_clamps():
+    # Doubling every half day, then no new cases at all
+    cumulative = np.concatenate([2.0 ** (np.arange(10) * 2.0), np.full(10, 2.0 ** 18)])
+    result = dynamic_doubling_time(pd.date_range("2020-03-01", periods=20), cumulative)
+
+    assert (result["dbT"][:8] == 1.0).all()
+    assert (result["mthd"][:8] == "fixed").all()
+    assert np.isfinite(result["dbT"]).all()
+
+
+def test_dynamic_doubling_time_needs_cumulative_cases():
+    with pytest.raises(ValueError):
+        dynamic_doubling_time(pd.date_range("2020-03-01", periods=3), np.array([1.0, 3.0, 2.0]))
+
+
+def test_impute_doubling_times():
+    imputed = impute_doubling_times(np.array([np.nan, 4.0, np.nan, np.nan, 8.0, np.nan]))
+    np.testing.assert_allclose(imputed, [4.0, 4.0, 6.0, 7.0, 8.0, 8.0])
+
+
+def test_add_doubling_time_by_region():
+    frames = [
+        pd.DataFrame({"rgn": name, "date": pd.date_range("2020-03-01", periods=60), "cumCases": cumulative_cases(seed)})
+        for name, seed in (("a", 3), ("b", 4))
+    ]
+    data = pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=0)
+    result = add_doubling_time(data, region="rgn")
+
+    assert list(result.columns) == ["rgn", "date", "cumCases", "seg", "b0", "gRt", "dbT", "mthd"]
+    b = result[result.rgn == "b"].sort_values("date")
+    expected = dynamic_doubling_time(b.date, b.cumCases.to_numpy())
+    np.testing.assert_allclose(b.dbT, expected["dbT"])
+
+
+def test_add_doubling_time_skips_days_without_cases():
+    cumulative = cumulative_cases(5)
+    data = pd.DataFrame({
+        "rgn": ["a"] * 65 + ["b"] * 3,
+        "date": list(pd.date_range("2020-02-25", periods=65)) + list(pd.date_range("2020-03-01", periods=3)),
+        "cumCases": np.concatenate([np.zeros(5), cumulative, np.zeros(3)]),
+    })
+    result = add_doubling_time(data, region="rgn")
+
+    assert result.dbT.iloc[:5].isna().all() and result.dbT.iloc[65:].isna().all()
+    expected = dynamic_doubling_time(data.date.iloc[5:65], cumulative)
+    np.testing.assert_allclose(result.dbT.iloc[5:65], expected["dbT"])
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.penn_chime.length_of_stay import FFT_MIN_DAYS, convolve_days, census_from_admits, survival
+from src.penn_chime.validators import OptionalDistributions
+
+
+def test_survival():
+    assert survival([0.0, 0.0, 0.0, 1.0]).tolist() == [1.0, 1.0, 1.0]
+    assert survival([0.0, 2.0, 2.0]).tolist() == [1.0, 0.5]
+
+
+@pytest.mark.parametrize("kernel_days", [5, FFT_MIN_DAYS + 10])
+def test_convolve_days_batched(kernel_days):
+    rng = np.random.default_rng(1)
+    values = rng.uniform(0.0, 50.0, (3, 200))
+    kernel = rng.uniform(0.0, 1.0, kernel_days)
+
+    result = convolve_days(values, kernel)
+
+    assert result.shape == (3, 200)
+    for row in range(3):
+        assert np.allclose(result[row], np.convolve(values[row], kernel)[:200])
+
+
+def test_census_from_admits_matches_fixed_length_of_stay():
+    admits = np.random.default_rng(2).uniform(0.0, 10.0, 60)
+    admits[0] = 0.0
+
+    census = census_from_admits(admits, [0.0] * 9 + [1.0])
+
+    cumsum = np.concatenate([np.zeros(9), np.cumsum(admits)])
+    assert np.allclose(census, cumsum[9:] - cumsum[:-9])
+
+
+def test_los_distributions_are_validated():
+    assert OptionalDistributions(value=None) is None
+    with pytest.raises(ValueError):
+        OptionalDistributions(value={"icu": [0.5, -0.1]})
@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+
+from src.penn_chime.model_cache import ModelCache, parameters_key
+from src.penn_chime.settings import get_defaults
+
+
+def make_param(**kwargs):
+    p = get_defaults()
+    p.covid_census_date = date(2020, 4, 20)
+    p.mitigation_date = date(2020, 3, 23)
+    for key, value in kwargs.items():
+        setattr(p, key, value)
+    return p
+
+
+def test_parameters_key_ignores_presentation():
+    key = parameters_key(make_param())
+
+    assert parameters_key(make_param(author="Someone Else", show_ppe_section=True)) == key
+    assert parameters_key(make_param(market_share=0.2)) != key
+    assert parameters_key(make_param(mitigation_date=date(2020, 3, 24))) != key
+
+
+def test_model_cache_lru():
+    cache = ModelCache(max_entries=1)
+
+    first = cache.get_model(make_param())
+    assert cache.get_model(make_param()) is first
+    cache.get_model(make_param(market_share=0.2))
+    assert cache.get_model(make_param()) is not first
+
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 3
+    assert cache.stats["evictions"] == 2
+
+
+def test_model_cache_disk(tmp_path):
+    p = make_param(doubling_time=None, date_first_hospitalized=date(2020, 3, 7))
+    model = ModelCache(directory=str(tmp_path)).get_model(p)
+
+    restarted = ModelCache(directory=str(tmp_path))
+    p = make_param(doubling_time=None, date_first_hospitalized=date(2020, 3, 7))
+    cached = restarted.get_model(p)
+
+    assert restarted.stats["disk_hits"] == 1
+    assert p.doubling_time == model.p.doubling_time
+    assert cached.census_df.equals(model.census_df)
+
+
+def test_model_cache_disk_bound(tmp_path):
+    cache = ModelCache(directory=str(tmp_path), max_bytes=1)
+    cache.get_model(make_param())
+
+    assert list(tmp_path.iterdir()) == []
+    assert cache.stats["evictions"] == 1
+
+
+def test_model_cache_restages_downstream_changes():
+    cache = ModelCache()
+    model = cache.get_model(make_param(masks_n95=5))
+    model.census_df
+    restaged = cache.get_model(make_param(masks_n95=9))
+    fresh = ModelCache().get_model(make_param(masks_n95=9))
+
+    assert cache.stats["stage_hits"] == 1
+    assert restaged.census_df is model.census_df
+    assert restaged.raw is model.raw
+    assert restaged.ppe_df.equals(fresh.ppe_df)
+
+
+def test_model_cache_warm_starts_fits():
+    cache = ModelCache()
+
+    cold = cache.get_model(make_param(covid_census_value=69))
+    other = cache.get_model(make_param(covid_census_value=72, population=2000000))
+    warm = cache.get_model(make_param(covid_census_value=72))
+
+    assert not cold.fit_report.warm_started
+    assert not other.fit_report.warm_started
+    assert warm.fit_report.warm_started
+    assert warm.fit_report.projections < cold.fit_report.projections
+
+
+def test_cached_frames_survive_rendering():
+    """The data export is built twice from one cached model, as on a rerun."""
+    pytest.importorskip("streamlit")
+    from src.penn_chime.body_charts import build_data_and_params
+
+    p = make_param()
+    model = ModelCache().get_model(p)
+    frames = [model.census_df.copy(), model.ppe_df.copy(), model.staffing_df.copy()]
+
+    def render():
+        return build_data_and_params(
+            projection_admits=model.admits_df,
+            census_df=model.census_df,
+            beds_df=model.beds_df,
+            ppe_df=model.ppe_df,
+            staffing_df=model.staffing_df,
+            model=model,
+            parameters=p,
+        )
+
+    first = render().drop(columns="DateGenerated")
+    second = render().drop(columns="DateGenerated")
+
+    assert first.equals(second)
+    for frame, cached in zip(frames, [model.census_df, model.ppe_df, model.staffing_df]):
+        assert cached.equals(frame)
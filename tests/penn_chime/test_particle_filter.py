@@ -0,0 +1,55 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.penn_chime.particle_filter import ParticleFilter
+
+
+def test_particles_follow_model(penn_model):
+    particles = ParticleFilter.from_model(penn_model, 100, seed=0, beta_volatility=0.0, initial_spread=0.0)
+
+    for day in range(12):
+        counts = particles.counts()
+        for key in ("census_non_icu", "census_icu", "census_ventilators", "admits_icu"):
+            assert np.allclose(counts[key], penn_model.raw[key][penn_model.i_day + day]), (key, day)
+        particles.advance()
+
+
+def test_assimilate_and_resume(penn_model, tmp_path):
+    particles = ParticleFilter.from_model(penn_model, 5000, seed=0)
+    census = penn_model.raw["census_non_icu"] + penn_model.raw["census_icu"]
+    actuals = pd.DataFrame({
+        "date": pd.date_range("2020-04-21", periods=8),
+        "total_census_actual": 1.3 * census[penn_model.i_day + 1:penn_model.i_day + 9],
+    })
+
+    assert particles.assimilate(actuals.iloc[:7]) == 7
+    assert particles.assimilate(actuals.iloc[:7]) == 0
+    # Census follows the higher actuals, lagged by the length of stay
+    filtered = particles.summary().loc["census_total", "p50"]
+    assert filtered > 1.15 * census[penn_model.i_day + 7]
+    assert abs(filtered - 1.3 * census[penn_model.i_day + 7]) < 0.1 * filtered
+
+    path = str(tmp_path / "particles.npz")
+    particles.save(path)
+    resumed = ParticleFilter.load(path)
+    assert resumed.date == date(2020, 4, 27)
+    particles.assimilate(actuals)
+    resumed.assimilate(actuals)
+    assert np.array_equal(particles.beta, resumed.beta)
+    assert particles.log_evidence == resumed.log_evidence
+
+    with pytest.raises(ValueError):
+        particles.update(date(2020, 4, 28), {"total_census_actual": 1.0})
+
+
+def test_forecast(penn_model):
+    particles = ParticleFilter.from_model(penn_model, 2000, seed=0)
+
+    band = particles.forecast(10)["census_total"]
+
+    assert list(band.day) == list(range(11))
+    assert (band.p5 <= band.p95).all()
+    assert band.p95.iloc[-1] > band.p5.iloc[-1]
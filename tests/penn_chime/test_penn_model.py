@@ -0,0 +1,261 @@
+import copy
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.penn_chime.contact_schedule import ContactRateChange
+from src.penn_chime.model_base import ScenarioDays
+from src.penn_chime.parameters import FitMethod
+from src.penn_chime import penn_model as penn_model_module
+from src.penn_chime.penn_model import DOUBLING_TIME_TOLERANCE, PennModel
+from src.penn_chime.resources import Resource, ResourceKind
+
+
+def test_sim_sir_batch_matches_sim_sir(penn_model, penn_param):
+    policy = penn_model.gen_policy(penn_param)
+    single = penn_model.run_projection(penn_param, policy)
+
+    betas = penn_model.gen_betas(policy)
+    batch = penn_model.run_projection(penn_param, np.vstack([betas, betas * 1.1, betas * 0.9]))
+
+    assert batch["census_non_icu"].shape == (3, len(single["day"]))
+    for key, values in single.items():
+        first = batch[key] if batch[key].ndim == 1 else batch[key][0]
+        assert np.array_equal(values, first), key
+
+    # Faster spread raises the peak census
+    peaks = batch["census_non_icu"].max(axis=-1)
+    assert peaks[1] > peaks[0] > peaks[2]
+
+
+def test_sim_sir_batch_per_scenario_state(penn_model):
+    betas = np.full((2, 40), 2e-8)
+    raw = penn_model.sim_sir_batch([1e6, 2e6], [10.0, 20.0], 0.0, 0.1, -10, betas)
+
+    assert list(raw["day"][[0, -1]]) == [-10, 30]
+    population = raw["susceptible"] + raw["infected"] + raw["recovered"]
+    assert np.allclose(population[0], 1e6 + 10.0)
+    assert np.allclose(population[1], 2e6 + 20.0)
+
+
+@pytest.mark.parametrize("late_beta", [2e-8, 2e-7])
+def test_burnout_tail_matches_simulation(penn_model, monkeypatch, late_beta):
+    # A late rise in contact rate after burnout must still be simulated
+    policies = [(3e-7, 20), (5e-8, 300), (late_beta, 700)]
+    betas = penn_model.gen_betas(policies)
+    betas = np.vstack([betas, betas * 0.9])
+    single = penn_model.sim_sir(1e6, 10.0, 0.0, 0.1, -20, policies)
+    batch = penn_model.sim_sir_batch(1e6, 10.0, 0.0, 0.1, -20, betas)
+
+    monkeypatch.setattr(penn_model_module, "BURNOUT_INFECTED", -1.0)
+    full_single = penn_model.sim_sir(1e6, 10.0, 0.0, 0.1, -20, policies)
+    full_batch = penn_model.sim_sir_batch(1e6, 10.0, 0.0, 0.1, -20, betas)
+
+    assert np.array_equal(single["day"], full_single["day"])
+    for key in ("susceptible", "infected", "recovered", "ever_infected"):
+        assert np.allclose(single[key], full_single[key], rtol=1e-9, atol=1e-5), key
+        assert np.allclose(batch[key], full_batch[key], rtol=1e-9, atol=1e-5), key
+    # The late rise brings a second wave
+    assert (single["infected"].argmax() > 320) == (late_beta == 2e-7)
+
+
+def test_get_argmin_i_day_matches_sequential_search(penn_model, penn_param):
+    penn_param.n_days = 1000
+    best_i_day, best_loss = -1, float("inf")
+    for i_day in range(90):
+        penn_model.i_day = i_day
+        raw = penn_model.run_projection(penn_param, penn_model.gen_policy(penn_param))
+        if raw["census_non_icu"].argmax() < i_day:
+            continue
+        loss = penn_model.get_loss(raw["census_non_icu"][i_day], penn_param.covid_census_value)
+        if loss < best_loss:
+            best_i_day, best_loss = i_day, loss
+
+    assert penn_model.get_argmin_i_day(penn_param, np.arange(90)) == best_i_day
+
+
+@pytest.mark.parametrize("fit_method", [FitMethod.GRID, FitMethod.BRENT])
+def test_fit_doubling_time(penn_param, fit_method):
+    penn_param.doubling_time = None
+    penn_param.date_first_hospitalized = date(2020, 3, 7)
+    penn_param.fit_method = fit_method
+
+    model = PennModel(penn_param)
+
+    assert abs(penn_param.doubling_time - 4.0725) < 1e-3
+    assert model.fit_report.fitted == "doubling_time"
+    assert model.fit_report.method == fit_method
+    assert model.fit_report.projections == (75 if fit_method == FitMethod.GRID else 14)
+    assert model.fit_report.seconds > 0.0
+
+
+SCHEDULE = [
+    ContactRateChange(date(2020, 3, 16), 0.2),
+    ContactRateChange(date(2020, 3, 23), 0.45),
+    ContactRateChange(date(2020, 5, 1), 0.3),
+    ContactRateChange(date(2020, 5, 10), 0.1),
+]
+
+
+def test_one_change_schedule_matches_mitigation_date(penn_model, penn_param):
+    penn_param.contact_rate_schedule = [ContactRateChange(date(2020, 3, 23), 0.45)]
+    model = PennModel(penn_param)
+
+    assert model.i_day == penn_model.i_day
+    assert np.array_equal(model.raw["census_non_icu"], penn_model.raw["census_non_icu"])
+
+
+def test_contact_rate_schedule(penn_param):
+    penn_param.contact_rate_schedule = SCHEDULE
+    model = PennModel(penn_param)
+
+    policy = model.gen_policy(penn_param)
+    assert [n_days for _, n_days in policy] == [model.i_day - 35, 7, 39, 9, 10]
+    assert np.allclose([beta for beta, _ in policy], model.beta * np.array([1.0, 0.8, 0.55, 0.7, 0.9]))
+    assert model.beta_t == pytest.approx(model.beta * 0.9)
+
+    # The batched fit and the policy list project the same schedule
+    days = np.arange(-model.i_day, penn_param.n_days)
+    single = model.run_projection(penn_param, policy)
+    batch = model.run_projection(penn_param, model.get_betas(penn_param, days)[np.newaxis, :])
+    assert np.allclose(batch["census_non_icu"][0], single["census_non_icu"])
+
+
+def test_fit_doubling_time_with_schedule(penn_param):
+    penn_param.doubling_time = None
+    penn_param.date_first_hospitalized = date(2020, 3, 7)
+    penn_param.contact_rate_schedule = SCHEDULE
+
+    model = PennModel(penn_param)
+
+    assert model.fit_report.projections == 75
+    census = model.raw["census_non_icu"][model.i_day]
+    assert abs(census - penn_param.covid_census_value) < 1.0
+
+
+@pytest.mark.parametrize("census_value", [72, 300])
+def test_warm_started_i_day(penn_model, penn_param, census_value):
+    penn_param.covid_census_value = census_value
+    cold = PennModel(penn_param)
+    warm = PennModel(penn_param, warm_start=penn_model)
+
+    assert warm.i_day == cold.i_day
+    # A large edit moves the fit out of the local window, and the global search runs
+    assert warm.fit_report.warm_started == (census_value == 72)
+    if warm.fit_report.warm_started:
+        assert warm.fit_report.projections < cold.fit_report.projections / 5
+
+
+@pytest.mark.parametrize("fit_method", [FitMethod.GRID, FitMethod.BRENT])
+def test_warm_started_doubling_time(penn_param, fit_method):
+    penn_param.doubling_time = None
+    penn_param.date_first_hospitalized = date(2020, 3, 7)
+    penn_param.fit_method = fit_method
+    previous = PennModel(copy.copy(penn_param))
+
+    penn_param.covid_census_value = 72
+    cold = PennModel(copy.copy(penn_param))
+    warm = PennModel(copy.copy(penn_param), warm_start=previous)
+
+    assert warm.fit_report.warm_started
+    assert abs(warm.p.doubling_time - cold.p.doubling_time) < 2 * DOUBLING_TIME_TOLERANCE
+    assert warm.fit_report.projections < cold.fit_report.projections
+
+
+def test_calculate_beds_borrows_like_row_loop(penn_model, penn_param):
+    rng = np.random.default_rng(0)
+    census = {
+        "non_icu": rng.uniform(0.0, 600.0, (4, 50)),
+        "icu": rng.uniform(0.0, 60.0, (4, 50)),
+        "ventilators": rng.uniform(0.0, 20.0, (4, 50)),
+    }
+    beds = penn_model.calculate_beds(census, penn_param)
+
+    assert beds["non_icu"].shape == (4, 50)
+    non_icu = penn_param.total_covid_beds - penn_param.icu_covid_beds - census["non_icu"]
+    icu = penn_param.icu_covid_beds - census["icu"]
+    for row in range(4):
+        for day in range(50):
+            a, b = non_icu[row, day], icu[row, day]
+            if a < 0 and b > 0:
+                a, b = a + min(-a, b), b - min(-a, b)
+            elif a > 0 and b < 0:
+                a, b = a - min(-b, a), b + min(-b, a)
+            assert beds["non_icu"][row, day] == a
+            assert beds["icu"][row, day] == b
+
+
+def test_frames_are_built_on_first_access(penn_model):
+    assert "ppe_df" not in vars(penn_model)
+
+    ppe_df = penn_model.ppe_df
+    assert penn_model.ppe_df is ppe_df
+    assert "staffing_df" not in vars(penn_model)
+
+    penn_model.add_counts(("ppe",))
+    assert penn_model.ppe_df is not ppe_df
+    assert penn_model.ppe_df.equals(ppe_df)
+
+
+def test_result_frames_are_views_of_raw(penn_model):
+    for column in ("non_icu", "icu", "total"):
+        assert np.shares_memory(penn_model.census_df[column].to_numpy(), penn_model.raw.data)
+        assert np.shares_memory(penn_model.admits_df[column].to_numpy(), penn_model.raw.data)
+
+
+def test_resource_catalog(penn_param):
+    penn_param.resources = [
+        Resource("respirators", "Respirators", ResourceKind.PPE, 2, 3),
+        Resource("nurses", "Nurses", ResourceKind.STAFF, 6, 2),
+    ]
+    model = PennModel(penn_param)
+
+    assert list(model.ppe_df.columns) == [
+        "day", "date", "respirators_non_icu", "respirators_icu", "respirators_total"]
+    assert list(model.staffing_df.columns) == ["day", "date", "nurses_non_icu", "nurses_icu", "nurses_total"]
+    assert np.array_equal(model.ppe_df.respirators_icu, 3 * np.floor(model.census_df.icu))
+
+
+def test_los_distributions(penn_model, penn_param):
+    penn_param.los_distributions = {
+        key: [0.0] * d.days + [1.0]
+        for key, d in penn_param.dispositions.items()
+    }
+    point_mass = PennModel(penn_param)
+
+    assert point_mass.i_day == penn_model.i_day
+    assert np.allclose(point_mass.raw.data, penn_model.raw.data)
+
+    penn_param.los_distributions = {"icu": [0.0] * 5 + [0.25] * 4 + [0.0] * 80}
+    spread = PennModel(penn_param)
+    assert spread.census_df.icu.sum() < penn_model.census_df.icu.sum()
+
+    penn_param.los_distributions = {"intensive_care": [0.0, 1.0]}
+    with pytest.raises(ValueError):
+        PennModel(penn_param)
+
+
+def test_calculate_census_per_scenario_days(penn_model):
+    admits = np.random.default_rng(3).uniform(0.0, 5.0, (3, 40))
+    lengths_of_stay = {"non_icu": 1, "icu": ScenarioDays([2.0, 9.0, 14.0]), "non_icu_after_icu": 0}
+    batch = {"day": np.arange(40), "admits_non_icu": admits, "admits_icu": admits}
+    penn_model.calculate_census(batch, lengths_of_stay)
+
+    for row, los in enumerate((2, 9, 14)):
+        single = {"day": np.arange(40), "admits_non_icu": admits[row], "admits_icu": admits[row]}
+        penn_model.calculate_census(single, {**lengths_of_stay, "icu": los})
+        assert np.array_equal(batch["census_icu"][row], single["census_icu"])
+
+
+def test_run_stochastic_projection(penn_model, penn_param):
+    raw = penn_model.run_stochastic_projection(penn_param, 2000, seed=11)
+    again = penn_model.run_stochastic_projection(penn_param, 2000, seed=11)
+
+    assert raw["census_icu"].shape == (2000, len(penn_model.raw["day"]))
+    assert np.array_equal(raw["census_icu"], again["census_icu"])
+    population = raw["susceptible"] + raw["infected"] + raw["recovered"]
+    assert (population == population[:, :1]).all()
+    # Event counts match the deterministic model in expectation
+    assert np.allclose(raw["census_icu"].mean(axis=0), penn_model.raw["census_icu"], rtol=0.05, atol=0.5)
+    assert raw["census_icu"][:, -1].std() > 0.0
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.penn_chime.calibration import Calibration
+from src.penn_chime.penn_model import PennModel
+from src.penn_chime.posterior import run_posterior, stretch_move
+
+
+def synthetic_actuals(model, truth, days):
+    """Census for the last `days` days, projected from the vector `truth`."""
+    calibration = Calibration(model, pd.DataFrame({"date": [pd.Timestamp(model.p.covid_census_date)], "total_census_actual": [1.0]}))
+    raw = calibration.project(np.array(truth))
+    rows = slice(model.i_day - days + 1, model.i_day + 1)
+    return pd.DataFrame({
+        "date": pd.date_range(end=model.p.covid_census_date, periods=days),
+        "total_census_actual": (raw["census_non_icu"][0] + raw["census_icu"][0])[rows],
+    })
+
+
+def test_stretch_move_samples_gaussian():
+    rng = np.random.default_rng(3)
+    scale = np.array([1.0, 10.0])
+
+    def posterior(x):
+        return -0.5 * ((x / scale) ** 2).sum(axis=1)
+
+    walkers = rng.standard_normal((20, 2))
+    log_probability = posterior(walkers)
+    samples = []
+    for step in range(3000):
+        stretch_move(walkers, log_probability, posterior, rng)
+        if step >= 500:
+            samples.append(walkers.copy())
+    samples = np.concatenate(samples)
+
+    assert np.allclose(log_probability, posterior(walkers))
+    assert np.allclose(samples.mean(axis=0), 0.0, atol=0.2 * scale)
+    assert np.allclose(samples.std(axis=0), scale, rtol=0.1)
+
+
+def test_run_posterior(penn_param):
+    model = PennModel(penn_param)
+    actuals = synthetic_actuals(model, [4.2, 0.6, 0.03], days=28)
+    actuals["total_census_actual"] = np.random.default_rng(1).poisson(actuals["total_census_actual"])
+
+    result = run_posterior(penn_param, actuals, n_walkers=16, n_steps=300, burn=100, thin=5, seed=7, model=model)
+    again = run_posterior(penn_param, actuals, n_walkers=16, n_steps=300, burn=100, thin=5, seed=7, model=model)
+
+    assert result.samples.shape == (16 * 40, 3)
+    assert np.array_equal(result.samples, again.samples)
+    assert 0.1 < result.acceptance_fraction.mean() < 0.9
+    assert abs(np.median(result.samples[:, 1]) - 0.6) < 0.05
+    band = result.bands["census_total"]
+    assert len(band) == model.i_day + penn_param.n_days + 1
+    assert (band.p5 <= band.p50).all() and (band.p50 <= band.p95).all()
+    assert "staffing_nurses_total" in result.bands and "beds_icu" in result.bands
+
+
+@pytest.mark.parametrize("n_steps, burn, thin", [(100, 100, 5), (300, 100, 0)])
+def test_run_posterior_needs_samples(penn_param, n_steps, burn, thin):
+    actuals = synthetic_actuals(PennModel(penn_param), [4.2, 0.6, 0.03], days=28)
+    with pytest.raises(ValueError):
+        run_posterior(penn_param, actuals, n_steps=n_steps, burn=burn, thin=thin)
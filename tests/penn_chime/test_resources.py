@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.penn_chime.resources import (
+    Resource, ResourceKind, calculate_ppe, calculate_staffing, resource_columns, resource_labels,
+)
+
+
+RESOURCES = [
+    Resource("nurses", "Nurses", ResourceKind.STAFF, 6, 2),
+    Resource("chaplains", "Chaplains", ResourceKind.STAFF, 0, 20),
+]
+
+
+def test_calculate_ppe():
+    gloves = Resource("gloves", "Gloves", ResourceKind.PPE, 10, 4)
+    ppe = calculate_ppe(np.array([2.5, 7.0]), np.array([1.9, 3.0]), [gloves])
+
+    assert resource_columns([gloves]) == ["gloves_non_icu", "gloves_icu", "gloves_total"]
+    assert ppe.tolist() == [[20.0, 4.0, 24.0], [70.0, 12.0, 82.0]]
+
+
+def test_calculate_staffing():
+    non_icu = np.array([[13.0, 0.0], [6.5, 60.0]])
+    icu = np.array([[3.0, 0.0], [41.0, 1.0]])
+    staffing = calculate_staffing(non_icu, icu, RESOURCES, 12)
+
+    assert staffing.shape == (2, 2, 6)
+    # nurses_non_icu, chaplains_non_icu, nurses_icu, chaplains_icu, nurses_total, chaplains_total
+    assert staffing[0, 0].tolist() == [6.0, 0.0, 4.0, 2.0, 10.0, 2.0]
+    assert staffing[1, 0].tolist() == [2.0, 0.0, 42.0, 6.0, 44.0, 6.0]
+    assert staffing[0, 1].tolist() == [0.0] * 6
+
+
+def test_resource_labels():
+    labels = resource_labels(RESOURCES)
+
+    assert list(labels)[3:] == ["nurses", "chaplains"]
+    assert labels["chaplains"]["col3_name"] == "chaplains_icu"
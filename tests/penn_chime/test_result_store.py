@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.penn_chime.result_store import ResultStore
+
+
+def test_result_store_mapping():
+    store = ResultStore.from_arrays({
+        "day": np.arange(-2, 3),
+        "susceptible": np.full(5, 100.0),
+        "infected": np.arange(5.0),
+    }, ("susceptible", "infected", "recovered"))
+    store["label"] = "extra"
+
+    assert list(store) == ["susceptible", "infected", "recovered", "day", "label"]
+    assert store.data.shape == (3, 5)
+    assert np.array_equal(store["recovered"], np.zeros(5))
+    assert np.shares_memory(store["infected"], store.data)
+
+    copied = store.copy()
+    copied["infected"] = 1.0
+    assert store["infected"][0] == 0.0
+
+    with pytest.raises(KeyError):
+        del store["infected"]
+
+
+def test_result_store_frame_views():
+    store = ResultStore.from_arrays({
+        "day": np.arange(4),
+        "susceptible": np.full(4, 9.5),
+        "infected": np.full(4, 0.5),
+    }, ("susceptible", "infected", "recovered"))
+
+    df = store.frame(["susceptible", "infected"], ["s", "i"])
+    assert list(df.columns) == ["day", "s", "i"]
+    assert np.shares_memory(df["s"].to_numpy(), store.data)
+
+    floor_df = store.frame(["infected", "susceptible"], floor=True)
+    assert list(floor_df.columns) == ["day", "infected", "susceptible"]
+    assert list(floor_df["susceptible"]) == [9.0] * 4
@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.penn_chime.sensitivity import (
+    can_batch, morris_analysis, morris_design, morris_effects, run_batch, saltelli_design, scale,
+    sobol_analysis, sobol_indices,
+)
+from src.penn_chime.sweep import DEFAULT_METRICS, run_points
+
+
+def ishigami(x):
+    x = np.pi * (2.0 * x - 1.0)
+    return np.sin(x[:, 0]) + 7.0 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+def test_sobol_indices_ishigami():
+    unit = saltelli_design(4096, 3, seed=0)
+    first_order, total_order = sobol_indices(ishigami(unit), 3)
+
+    assert unit.shape == (4096 * 5, 3)
+    assert np.allclose(first_order, [0.314, 0.442, 0.0], atol=0.03)
+    assert np.allclose(total_order, [0.558, 0.442, 0.244], atol=0.03)
+
+
+def test_morris_effects_linear():
+    unit, order, steps = morris_design(10, 3, seed=0)
+    effects = morris_effects(unit @ np.array([3.0, -1.0, 0.0]), order, steps)
+
+    assert unit.shape == (10 * 4, 3)
+    assert ((unit >= 0.0) & (unit <= 1.0)).all()
+    assert np.allclose(effects, [[3.0, -1.0, 0.0]] * 10)
+
+
+def test_sensitivity_of_peak_icu_census(penn_param):
+    p = penn_param
+    p.n_days = 60
+    bounds = {"icu.rate": (0.005, 0.01), "relative_contact_rate": (0.3, 0.6), "gloves": (5, 15)}
+
+    sobol = sobol_analysis(p, bounds, n_samples=16, seed=0)
+    assert sobol.n_evaluations == 16 * 5
+    assert sobol.total_order[0] > 0.01 and sobol.total_order[1] > 0.01
+    assert abs(sobol.total_order[2]) < 1e-12
+
+    morris = morris_analysis(p, bounds, n_trajectories=4, seed=0)
+    assert morris.n_evaluations == 4 * 4
+    assert morris.mu[0] > 0.0 > morris.mu[1]
+    assert morris.mu_star[2] == 0.0
+
+
+def test_batched_design_matches_points(penn_param):
+    p = penn_param
+    p.n_days = 60
+    bounds = {
+        "doubling_time": (3.0, 6.0),
+        "relative_contact_rate": (0.3, 0.6),
+        "market_share": (0.1, 0.3),
+        "icu.rate": (0.005, 0.01),
+        "icu.days": (5, 12),
+    }
+    grid = scale(saltelli_design(8, len(bounds), seed=0), bounds)
+
+    assert can_batch(p, grid) and not can_batch(p, ["gloves"])
+    batched = run_batch(p, grid, DEFAULT_METRICS, chunk_size=16)
+    points = run_points(p, grid, DEFAULT_METRICS)
+    np.testing.assert_allclose(batched.values, points.values, rtol=1e-9)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.penn_chime.penn_model import PennModel
+from src.penn_chime.sweep import build_grid, run_sweep, sweep_frame
+
+
+def test_build_grid():
+    grid = build_grid({"doubling_time": [4.0, 5.0], "market_share": [0.1, 0.2, 0.3]})
+
+    assert grid["doubling_time"].tolist() == [4.0] * 3 + [5.0] * 3
+    assert grid["market_share"].tolist() == [0.1, 0.2, 0.3] * 2
+
+
+def test_run_sweep(penn_param, tmp_path):
+    axes = {"relative_contact_rate": [0.3, 0.5], "doubling_time": [4.0, 6.0]}
+    path = str(tmp_path / "sweep.npy")
+    penn_param.n_days = 60
+    penn_param.total_covid_beds = 100
+    result = run_sweep(penn_param, axes, path=path, chunk_size=3, workers=2)
+
+    stored = np.load(path)
+    assert stored.shape == (len(result.metrics), 4)
+    df = sweep_frame(result)
+    assert df.relative_contact_rate.tolist() == [0.3, 0.3, 0.5, 0.5]
+
+    penn_param.relative_contact_rate = 0.5
+    penn_param.doubling_time = 6.0
+    model = PennModel(penn_param)
+    last = df.iloc[-1]
+    assert last.peak_census_icu == model.census_df.icu.max()
+    assert last.peak_day_icu == model.census_df.day[model.census_df.icu.argmax()]
+    breach = model.census_df[(model.beds_df.icu < 0) & (model.census_df.day >= 0)]
+    assert last.first_breach_day_icu == breach.day.iloc[0]
+    # A faster, less mitigated spread peaks higher
+    assert df.peak_census_icu.iloc[1] > df.peak_census_icu.iloc[2]
+
+
+def test_unknown_sweep_metric(penn_param):
+    with pytest.raises(ValueError):
+        run_sweep(penn_param, {"market_share": [0.1]}, metrics=["peak_sunshine"])